@@ -0,0 +1,104 @@
+"""Measure the encode and decode times and encoded size of a day partition
+of events and a day's metadata with each of the historical codecs.
+
+Builds a synthetic night for a camera with many channels, and metadata with
+a row of mixed columns for each seq_num, as the metadata files have. Codecs
+whose packages aren't installed are skipped.
+
+Usage::
+
+    python benchmarks/codec_benchmark.py --channels 40 --seqs 1000
+"""
+
+import argparse
+import random
+from itertools import product
+from time import perf_counter
+from typing import Any, Callable
+
+from lsst.ts.rubintv.background.blob_codecs import (
+    COMPRESSORS,
+    SERIALIZERS,
+    HistoricalCodec,
+)
+from lsst.ts.rubintv.models.models import Event
+
+
+def make_events(num_channels: int, num_seqs: int) -> list[Event]:
+    day_obs = "2025-01-01"
+    return [
+        Event(
+            f"lsstcam/{day_obs}/channel_{chan:02}/{seq:06}/"
+            f"lsstcam_channel_{chan:02}_{day_obs}_{seq:06}.png",
+            f"{random.getrandbits(128):032x}",
+        )
+        for chan in range(num_channels)
+        for seq in range(1, num_seqs + 1)
+    ]
+
+
+def make_metadata(num_seqs: int) -> dict[str, dict[str, Any]]:
+    return {
+        str(seq): {
+            "Exposure time": random.choice([15.0, 30.0]),
+            "Filter": random.choice("ugrizy"),
+            "Airmass": round(random.uniform(1, 2), 4),
+            "Seeing": round(random.uniform(0.5, 2), 3),
+            "RA": random.uniform(0, 360),
+            "Dec": random.uniform(-90, 10),
+            "Observation reason": random.choice(["science", "focus", "flat"]),
+            "Target": f"field_{random.randrange(1000)}",
+            "Image type": "science",
+            "Quality flag": None,
+        }
+        for seq in range(1, num_seqs + 1)
+    }
+
+
+def timed(func: Callable[[], Any], repeat: int) -> tuple[Any, float]:
+    """Return the result and the fastest time of several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        best = min(best, perf_counter() - start)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--seqs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    events = make_events(args.channels, args.seqs)
+    metadata = make_metadata(args.seqs)
+    print(f"{len(events)} events and {len(metadata)} metadata rows")
+    print(
+        f"{'codec':>16} {'':>9} {'encode (ms)':>12} {'decode (ms)':>12}"
+        f" {'size (kB)':>10}"
+    )
+    for serializer, compressor in product(SERIALIZERS, COMPRESSORS):
+        name = f"{serializer}+{compressor}"
+        try:
+            codec = HistoricalCodec(name)
+        except ImportError as e:
+            print(f"{name:>16} skipped: {e}")
+            continue
+        for label, encode, decode, data in (
+            ("events", codec.encode_events, codec.decode_events, events),
+            ("metadata", codec.encode, codec.decode, metadata),
+        ):
+            blob, encode_time = timed(lambda: encode(data), args.repeat)
+            decoded, decode_time = timed(lambda: decode(blob), args.repeat)
+            assert decoded == data
+            print(
+                f"{name:>16} {label:>9} {encode_time * 1000:>12.1f}"
+                f" {decode_time * 1000:>12.1f} {len(blob) / 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Measure the memory held per event by the compact `Event` compared with the
+dataclass events used before.
+
+Builds a synthetic history of several cameras over several years, with
+realistic keys, and measures with tracemalloc the memory allocated to hold
+all the events of each kind. The size of the pickled day partitions, as
+kept in the historical store, is compared too.
+
+Usage::
+
+    python benchmarks/event_memory_benchmark.py --events 3000000
+"""
+
+import argparse
+import gc
+import pickle
+import re
+import tracemalloc
+import zlib
+from datetime import date, timedelta
+from itertools import groupby
+from time import perf_counter
+from typing import Any, Callable
+
+from lsst.ts.rubintv.models.models import Event
+from pydantic.dataclasses import dataclass
+
+CAMERAS = ("lsstcam", "lsstcomcam", "auxtel", "allsky")
+CHANNELS = (
+    "calexp_mosaic",
+    "focal_plane_mosaic",
+    "event_timeline",
+    "monitor",
+    "mount",
+    "imexam",
+)
+
+
+@dataclass
+class LegacyEvent:
+    """The event as it was before it was made compact."""
+
+    key: str
+    hash: str = ""
+    camera_name: str = ""
+    day_obs: str = ""
+    channel_name: str = ""
+    seq_num: int | str = ""
+    filename: str = ""
+    ext: str = ""
+
+    def __post_init__(self) -> None:
+        name_re = re.compile(r"(\w+)\/([\d-]+)\/(\w+)\/(\d{6}|final)\/([\w-]+)\.(\w+)$")
+        match = name_re.match(self.key)
+        assert match is not None
+        camera, day_obs, channel, seq_num, filename, ext = match.groups()
+        self.camera_name = camera
+        self.day_obs = day_obs
+        self.channel_name = channel
+        self.seq_num = seq_num if seq_num == "final" else int(seq_num)
+        self.filename = filename + "." + ext
+        self.ext = ext
+
+
+def make_objects(num_events: int) -> list[dict[str, str]]:
+    """Return bucket listing entries for about ``num_events`` events."""
+    seqs_per_day = 200
+    per_day = len(CAMERAS) * len(CHANNELS) * seqs_per_day
+    num_days = max(num_events // per_day, 1)
+    start = date(2022, 1, 1)
+    objects = []
+    for n in range(num_days):
+        day_obs = (start + timedelta(days=n)).isoformat()
+        for camera in CAMERAS:
+            for channel in CHANNELS:
+                for seq in range(1, seqs_per_day + 1):
+                    key = (
+                        f"{camera}/{day_obs}/{channel}/{seq:06}/"
+                        f"{camera}_{channel}_{day_obs}_{seq:06}.png"
+                    )
+                    objects.append({"key": key, "hash": f"{n:08x}{seq:024x}"})
+    return objects
+
+
+def measure(build: Callable[[], list[Any]]) -> tuple[list[Any], int, float]:
+    """Return what's built, the memory it holds and the time taken."""
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    built = build()
+    took = perf_counter() - start
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, held, took
+
+
+def partitions_size(events: list[Any]) -> int:
+    """Return the total size of the compressed day partitions."""
+    return sum(
+        len(zlib.compress(pickle.dumps(list(day_events))))
+        for _, day_events in groupby(events, key=lambda e: (e.camera_name, e.day_obs))
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    objects = make_objects(args.events)
+    print(f"{len(objects)} events")
+
+    legacy, legacy_bytes, legacy_time = measure(
+        lambda: [LegacyEvent(**o) for o in objects]
+    )
+    legacy_size = partitions_size(legacy)
+    del legacy
+    compact, compact_bytes, compact_time = measure(
+        lambda: [Event(**o) for o in objects]
+    )
+    compact_size = partitions_size(compact)
+    assert compact[0].key == objects[0]["key"]
+
+    num = len(objects)
+    print(f"{'':>24} {'dataclass':>12} {'compact':>12}")
+    print(
+        f"{'bytes per event':>24} {legacy_bytes / num:>12.0f}"
+        f" {compact_bytes / num:>12.0f}"
+    )
+    print(
+        f"{'total (MB)':>24} {legacy_bytes / 1e6:>12.1f} {compact_bytes / 1e6:>12.1f}"
+    )
+    print(
+        f"{'partitions (MB)':>24} {legacy_size / 1e6:>12.1f}"
+        f" {compact_size / 1e6:>12.1f}"
+    )
+    print(f"{'build (s)':>24} {legacy_time:>12.2f} {compact_time:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Compare storing a camera's historical events as one compressed blob with
+storing them in per-day partitions.
+
+Builds a synthetic camera with several years of events and times reading
+one day's events, the most recent event for a channel and the channel names
+for one seq_num from each layout, as the historical poller does for a page
+load. The single blob layout is how events were stored before partitioning.
+
+Usage::
+
+    python benchmarks/historical_partitions_benchmark.py --years 3 --seqs 200
+"""
+
+import argparse
+import pickle
+import random
+import zlib
+from datetime import date, timedelta
+from statistics import median
+from time import perf_counter
+from typing import Callable
+
+from lsst.ts.rubintv.background.historicaldata import HistoricalStore
+from lsst.ts.rubintv.models.models import Event
+
+CAMERA = "lsstcam"
+LOC_CAM = f"summit/{CAMERA}"
+CHANNELS = ("calexp_mosaic", "focal_plane_mosaic", "event_timeline")
+
+
+def make_events(years: int, seqs: int) -> list[Event]:
+    start = date(2025, 1, 1)
+    events = []
+    for n in range(365 * years):
+        day_obs = (start + timedelta(days=n)).isoformat()
+        for seq in range(1, seqs + 1):
+            for chan in CHANNELS:
+                key = f"{CAMERA}/{day_obs}/{chan}/{seq:06}/{CAMERA}_{chan}_{seq}.png"
+                events.append(Event(key=key, hash="96795bc45767b5a35a82b4ca08a7b312"))
+    return events
+
+
+def time_it(func: Callable[[], object], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seqs", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    events = make_events(args.years, args.seqs)
+    days = sorted({e.day_obs for e in events})
+    day_obs = random.choice(days)
+    print(f"{len(events)} events over {len(days)} days, reading {day_obs}")
+
+    start = perf_counter()
+    blob = zlib.compress(pickle.dumps(events))
+    blob_build = perf_counter() - start
+
+    store = HistoricalStore()
+    start = perf_counter()
+    store.store_events(events, "summit")
+    store.compress_events()
+    partitioned_build = perf_counter() - start
+    partitioned_size = sum(len(p) for p in store.compressed_events[LOC_CAM].values())
+
+    def blob_day() -> list[Event]:
+        return [e for e in pickle.loads(zlib.decompress(blob)) if e.day_obs == day_obs]
+
+    def partitioned_day() -> list[Event]:
+        return store.get_day_events(LOC_CAM, day_obs)
+
+    def blob_latest() -> Event:
+        return max(
+            e
+            for e in pickle.loads(zlib.decompress(blob))
+            if e.channel_name == CHANNELS[0]
+        )
+
+    def partitioned_latest() -> Event | None:
+        for day in reversed(store.get_days(LOC_CAM)):
+            chan_events = [
+                e
+                for e in store.get_day_events(LOC_CAM, day)
+                if e.channel_name == CHANNELS[0]
+            ]
+            if chan_events:
+                return max(chan_events)
+        return None
+
+    def blob_seq() -> list[str]:
+        return [
+            e.channel_name
+            for e in pickle.loads(zlib.decompress(blob))
+            if e.day_obs == day_obs and e.seq_num == 1
+        ]
+
+    def partitioned_seq() -> list[str]:
+        return [
+            e.channel_name
+            for e in store.get_day_events(LOC_CAM, day_obs)
+            if e.seq_num == 1
+        ]
+
+    assert blob_day() == partitioned_day()
+    assert blob_latest() == partitioned_latest()
+    assert blob_seq() == partitioned_seq()
+
+    print(f"{'':>20} {'one blob':>12} {'per day':>12}")
+    print(f"{'size (MB)':>20} {len(blob) / 1e6:>12.2f} {partitioned_size / 1e6:>12.2f}")
+    print(f"{'build (s)':>20} {blob_build:>12.2f} {partitioned_build:>12.2f}")
+    for name, blob_func, partitioned_func in (
+        ("day's events (ms)", blob_day, partitioned_day),
+        ("latest event (ms)", blob_latest, partitioned_latest),
+        ("seq channels (ms)", blob_seq, partitioned_seq),
+    ):
+        blob_time = time_it(blob_func, args.repeats) * 1000
+        partitioned_time = time_it(partitioned_func, args.repeats) * 1000
+        print(f"{name:>20} {blob_time:>12.1f} {partitioned_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Measure how fast bucket listings are converted to events, constructing each
+`Event` from its key compared with the bulk key parser.
+
+Builds synthetic listings with realistic keys, a few of them unparseable,
+and times converting each to events one `Event` at a time, with the bulk
+parser in the server process and with the bulk parser across a process pool.
+
+Usage::
+
+    python benchmarks/key_parsing_benchmark.py --sizes 100000 1000000 10000000
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Callable
+
+from event_memory_benchmark import make_objects
+from lsst.ts.rubintv.models.key_parser import (
+    KeyParseFailures,
+    parse_event_objects,
+    parse_event_objects_pooled,
+)
+from lsst.ts.rubintv.models.models import Event
+
+
+def per_event(objects: list[dict[str, str]]) -> list[Event]:
+    """Convert as was done before the bulk parser."""
+    events = []
+    for obj in objects:
+        try:
+            events.append(Event(**obj))
+        except ValueError:
+            pass
+    return events
+
+
+def timed(convert: Callable[[], Any]) -> tuple[Any, float]:
+    start = perf_counter()
+    result = convert()
+    return result, perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'keys':>10} {'per event (s)':>14} {'bulk (s)':>10} {'pooled (s)':>11}")
+    with ProcessPoolExecutor(args.processes) as pool:
+        for size in args.sizes:
+            objects = make_objects(size)
+            # one key in a thousand can't be parsed
+            for obj in objects[::1000]:
+                obj["key"] = obj["key"].replace(".png", "")
+            expected, per_event_time = timed(lambda: per_event(objects))
+            events, bulk_time = timed(
+                lambda: parse_event_objects(objects, KeyParseFailures())
+            )
+            assert events == expected
+            pooled, pooled_time = timed(
+                lambda: asyncio.run(
+                    parse_event_objects_pooled(
+                        objects, pool, failures=KeyParseFailures()
+                    )
+                )
+            )
+            assert len(pooled) == len(expected)
+            print(
+                f"{len(objects):>10} {per_event_time:>14.2f} {bulk_time:>10.2f}"
+                f" {pooled_time:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure the cost of one websocket notification as the client count grows.
+
+Compares encoding the message once per client, as notifications used to be
+sent, with encoding it once and sharing the frame across all clients.
+The websockets are stand-ins that discard what they're sent, so the timings
+are of the server-side encoding and fan-out only.
+
+Usage::
+
+    python benchmarks/notification_fanout_benchmark.py --rows 2000
+"""
+
+import argparse
+import asyncio
+import uuid
+from statistics import median
+from time import perf_counter
+
+from lsst.ts.rubintv.handlers import websocket_notifiers
+from lsst.ts.rubintv.handlers.websockets_clients import clients, websocket_to_client
+from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
+from lsst.ts.rubintv.models.models import ServiceTypes as Service
+
+CLIENT_COUNTS = (1, 10, 50, 100, 500)
+
+
+class NullWebSocket:
+    async def send_text(self, data: str) -> None:
+        pass
+
+
+def make_table(num_rows: int) -> dict[int, dict[str, dict]]:
+    channels = ("calexp_mosaic", "focal_plane_mosaic", "event_timeline", "movie")
+    return {
+        seq: {
+            chan: {
+                "key": f"lsstcam/2025-01-01/{chan}/{seq:06}/lsstcam_{chan}_{seq}.png",
+                "hash": "96795bc45767b5a35a82b4ca08a7b312",
+                "camera_name": "lsstcam",
+                "day_obs": "2025-01-01",
+                "channel_name": chan,
+                "seq_num": seq,
+                "filename": f"lsstcam_{chan}_{seq}.png",
+                "ext": "png",
+            }
+            for chan in channels
+        }
+        for seq in range(num_rows, 0, -1)
+    }
+
+
+async def encode_per_client(websockets: list, payload: dict) -> None:
+    """The previous behaviour: every client's task encodes the payload."""
+
+    async def send(websocket: NullWebSocket) -> None:
+        frame = await websocket_notifiers.encode_notification(
+            Service.CAMERA, MessageType.CAMERA_TABLE, payload
+        )
+        await websocket.send_text(frame)
+
+    await asyncio.gather(*(send(ws) for ws in websockets))
+
+
+async def encode_once(client_ids: list[uuid.UUID], payload: dict) -> None:
+    await websocket_notifiers.notify_clients(
+        client_ids, Service.CAMERA, MessageType.CAMERA_TABLE, payload
+    )
+
+
+async def time_it(coro_factory, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        await coro_factory()
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+async def run(args: argparse.Namespace) -> None:
+    payload = make_table(args.rows)
+    print(f"table of {args.rows} rows, median of {args.repeats} notifications")
+    print(f"{'clients':>8} {'per client (ms)':>16} {'encode once (ms)':>17}")
+    for num_clients in CLIENT_COUNTS:
+        clients.clear()
+        websocket_to_client.clear()
+        websockets = [NullWebSocket() for _ in range(num_clients)]
+        client_ids = []
+        for websocket in websockets:
+            client_id = uuid.uuid4()
+            clients[client_id] = websocket  # type: ignore[assignment]
+            client_ids.append(client_id)
+
+        per_client = await time_it(
+            lambda: encode_per_client(websockets, payload), args.repeats
+        )
+        once = await time_it(lambda: encode_once(client_ids, payload), args.repeats)
+        print(f"{num_clients:>8} {per_client * 1000:>16.1f} {once * 1000:>17.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Compare the boto3 and aio S3 client backends against a local moto server.
+
+Runs batches of concurrent listings and object fetches through each backend
+and reports the wall time per batch. Requires ``moto[server]`` and
+``aiobotocore``.
+
+Usage::
+
+    python benchmarks/s3_backends_benchmark.py --objects 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from statistics import median
+from time import perf_counter
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+PROFILE = "benchmark"
+BUCKET = "rubintv-benchmark"
+
+
+def start_server(port: int) -> ThreadedMotoServer:
+    server = ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    return server
+
+
+def write_credentials() -> str:
+    creds = tempfile.NamedTemporaryFile("w", suffix=".ini", delete=False)
+    creds.write(
+        f"[{PROFILE}]\naws_access_key_id = testing\naws_secret_access_key = testing\n"
+    )
+    creds.close()
+    return creds.name
+
+
+def populate_bucket(endpoint_url: str, num_objects: int) -> list[str]:
+    s3 = boto3.Session(profile_name=PROFILE).client(
+        "s3", region_name="us-east-1", endpoint_url=endpoint_url
+    )
+    s3.create_bucket(Bucket=BUCKET)
+    md = json.dumps({str(i): {"exposure_time": 30.0} for i in range(100)})
+    keys = []
+    for i in range(num_objects):
+        key = f"lsstcam/2025-01-01/calexp_mosaic/{i:06}/lsstcam_{i:06}.json"
+        s3.put_object(Bucket=BUCKET, Key=key, Body=md)
+        keys.append(key)
+    return keys
+
+
+async def time_batches(coro_factory, concurrency: int, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = perf_counter()
+        await asyncio.gather(*(coro_factory(i) for i in range(concurrency)))
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+async def run(args: argparse.Namespace, endpoint_url: str, keys: list[str]) -> None:
+    from lsst.ts.rubintv.models.models import S3Backend
+    from lsst.ts.rubintv.s3_connection_pool import (
+        get_shared_s3_client,
+        shutdown_s3_clients,
+    )
+
+    print(
+        f"{args.objects} objects, {args.concurrency} concurrent requests, "
+        f"median of {args.repeats} batches"
+    )
+    print(f"{'backend':>8} {'list (s)':>10} {'get (s)':>10}")
+    for backend in S3Backend:
+        client = get_shared_s3_client(PROFILE, BUCKET, endpoint_url, backend)
+
+        def list_prefix(i: int):  # noqa: ANN202
+            return client.async_list_objects(
+                f"lsstcam/2025-01-01/calexp_mosaic/{i % 10}"
+            )
+
+        def get_object(i: int):  # noqa: ANN202
+            return client.async_get_object(keys[i % len(keys)])
+
+        # warm up connections before timing
+        await time_batches(get_object, args.concurrency, 1)
+        list_time = await time_batches(list_prefix, args.concurrency, args.repeats)
+        get_time = await time_batches(get_object, args.concurrency, args.repeats)
+        print(f"{backend.value:>8} {list_time:>10.3f} {get_time:>10.3f}")
+    await shutdown_s3_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--port", type=int, default=5123)
+    args = parser.parse_args()
+
+    endpoint_url = f"http://127.0.0.1:{args.port}"
+    os.environ["AWS_SHARED_CREDENTIALS_FILE"] = write_credentials()
+    # S3Client ignores per-location endpoints in "testing" mode, so point the
+    # app config at the moto server before the package is imported.
+    os.environ["S3_ENDPOINT_URL"] = endpoint_url
+
+    server = start_server(args.port)
+    try:
+        keys = populate_bucket(endpoint_url, args.objects)
+        asyncio.run(run(args, endpoint_url, keys))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
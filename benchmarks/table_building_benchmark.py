@@ -0,0 +1,95 @@
+"""Measure how long building a camera's table of events takes, scanning the
+events once per channel as was done before compared with grouping them in
+one pass, and adding a poll's new events to a table compared with building
+the whole table again.
+
+Builds a synthetic night for a camera with many channels, as LSSTCam has,
+with an event in every channel for every seq_num.
+
+Usage::
+
+    python benchmarks/table_building_benchmark.py --channels 40 --seqs 10000
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+from typing import Any, Callable
+
+from lsst.ts.rubintv.models.models import Channel, Event
+from lsst.ts.rubintv.models.models_helpers import (
+    add_events_to_table,
+    make_table_from_event_list,
+)
+
+
+def make_table_per_channel(
+    events: list[Event], channels: list[Channel]
+) -> dict[int, dict[str, dict]]:
+    """Build the table as was done before the single-pass builder."""
+    d: dict[int, dict[str, dict]] = {}
+    for chan in channels:
+        chan_events = [e for e in events if e.channel_name == chan.name]
+        if chan_events:
+            for e in chan_events:
+                if not isinstance(e.seq_num, int):
+                    continue
+                if e.seq_num in d:
+                    d[e.seq_num].update({chan.name: e.to_dict()})
+                else:
+                    d.update({e.seq_num: {chan.name: e.to_dict()}})
+    table = {k: v for k, v in sorted(d.items(), reverse=True)}
+    return table
+
+
+def timed(build: Callable[[], Any]) -> tuple[Any, float]:
+    start = perf_counter()
+    result = build()
+    return result, perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--seqs", type=int, default=10_000)
+    parser.add_argument(
+        "--new-seqs", type=int, default=5, help="seq_nums new in each poll"
+    )
+    args = parser.parse_args()
+
+    channels = [
+        Channel(name=f"channel_{n:02}", title=f"Channel {n}")
+        for n in range(args.channels)
+    ]
+    # listings are in key order, so by channel and then seq_num
+    events = [
+        Event(f"lsstcam/2025-01-01/{chan.name}/{seq:06}/lsstcam_{seq}.png")
+        for chan in channels
+        for seq in range(1, args.seqs + 1)
+    ]
+    print(f"{len(events)} events, {args.channels} channels, {args.seqs} seq_nums")
+
+    legacy, legacy_time = timed(lambda: make_table_per_channel(events, channels))
+    table, table_time = timed(
+        lambda: asyncio.run(make_table_from_event_list(events, channels))
+    )
+    assert table == legacy and list(table) == list(legacy)
+    print(f"{'per channel scans (s)':>28} {legacy_time:>8.2f}")
+    print(f"{'single pass (s)':>28} {table_time:>8.2f}")
+
+    # a poll that brings the next few seq_nums in every channel
+    old_seqs = set(range(1, args.seqs - args.new_seqs + 1))
+    earlier = [e for e in events if e.seq_num in old_seqs]
+    new = [e for e in events if e.seq_num not in old_seqs]
+    partial = asyncio.run(make_table_from_event_list(earlier, channels))
+    _, rebuild_time = timed(
+        lambda: asyncio.run(make_table_from_event_list(events, channels))
+    )
+    (added, _), add_time = timed(lambda: add_events_to_table(partial, new, channels))
+    assert added == table and list(added) == list(table)
+    print(f"{'poll, rebuilt (ms)':>28} {rebuild_time * 1000:>8.1f}")
+    print(f"{'poll, added (ms)':>28} {add_time * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""An asyncio-native alternative to `S3Client`.
+
+Built on aiobotocore, which is an optional dependency. Requests are made on
+the event loop over a shared aiohttp connection pool, so the number of
+concurrent listings and object fetches is bounded by the pool size rather
+than by a thread count.
+"""
+
+import asyncio
+import json
+from contextlib import AsyncExitStack
+from typing import Any
+
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+from fastapi.exceptions import HTTPException
+from lsst.ts.rubintv.config import config as app_config
+from lsst.ts.rubintv.config import rubintv_logger
+
+try:
+    from aiobotocore.session import AioSession
+except ImportError:  # pragma: no cover
+    AioSession = None
+
+logger = rubintv_logger()
+
+__all__ = ["AioS3Client"]
+
+
+class AioS3Client:
+    """Asyncio S3 client for a single bucket with the same async surface as
+    `S3Client`.
+
+    The underlying aiobotocore client is bound to the event loop it was
+    created on, so it is created lazily on first use and recreated if used
+    from a different loop.
+
+    Parameters
+    ----------
+    profile_name : `str`
+        AWS profile name for authentication.
+    bucket_name : `str`
+        S3 bucket name.
+    endpoint_url : `str` | `None`
+        S3 endpoint URL, None for the default from the app config.
+    max_connections : `int` | `None`
+        Maximum number of concurrent requests (and pooled connections).
+        Defaults to ``config.s3_aio_max_connections``.
+
+    Raises
+    ------
+    `ImportError`
+        If aiobotocore is not installed.
+    """
+
+    def __init__(
+        self,
+        profile_name: str,
+        bucket_name: str,
+        endpoint_url: str | None = None,
+        max_connections: int | None = None,
+    ) -> None:
+        if AioSession is None:
+            raise ImportError("aiobotocore is required for the 'aio' S3 backend")
+        if max_connections is None:
+            max_connections = app_config.s3_aio_max_connections
+        self._config = BotoConfig(
+            retries={"max_attempts": 10, "mode": "standard"},
+            max_pool_connections=max_connections,
+        )
+        if app_config.s3_endpoint_url == "testing":
+            endpoint_url = None
+        elif endpoint_url is None:
+            endpoint_url = app_config.s3_endpoint_url
+        self._session = AioSession(profile=profile_name)
+        self._bucket_name = bucket_name
+        self._endpoint_url = endpoint_url
+        self._max_connections = max_connections
+
+        self._client_task: asyncio.Task | None = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._in_flight = 0
+
+    async def _create_client(self) -> Any:
+        exit_stack = AsyncExitStack()
+        client = await exit_stack.enter_async_context(
+            self._session.create_client(
+                "s3",
+                region_name="us-east-1",
+                endpoint_url=self._endpoint_url,
+                config=self._config,
+            )
+        )
+        self._exit_stack = exit_stack
+        return client
+
+    async def _get_client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        task = self._client_task
+        if (
+            task is None
+            or task.get_loop() is not loop
+            or (task.done() and task.exception() is not None)
+        ):
+            # Concurrent first callers all wait on the same creation task.
+            task = self._client_task = loop.create_task(self._create_client())
+        return await task
+
+    def executor_stats(self) -> dict[str, int]:
+        """Return the connection limit and the number of requests in flight.
+
+        Requests never queue for a thread, so ``"queued"`` is always zero;
+        it is included to match `S3Client.executor_stats`.
+
+        Returns
+        -------
+        `dict` [`str`, `int`]
+            Keys are ``"max_workers"``, ``"queued"`` and ``"in_flight"``.
+        """
+        return {
+            "max_workers": self._max_connections,
+            "queued": 0,
+            "in_flight": self._in_flight,
+        }
+
+    async def close(self) -> None:
+        """Close the connection pool, if it was created on this loop."""
+        task, exit_stack = self._client_task, self._exit_stack
+        self._client_task = None
+        self._exit_stack = None
+        if task is None or exit_stack is None:
+            return
+        if task.get_loop() is asyncio.get_running_loop():
+            await exit_stack.aclose()
+
+    def shutdown(self) -> None:
+        """Drop the client, closing its connection pool in the background if
+        the loop it was created on is still running.
+        """
+        task = self._client_task
+        if task is not None and not task.get_loop().is_closed():
+            task.get_loop().create_task(self.close())
+        else:
+            self._client_task = None
+            self._exit_stack = None
+
+    async def async_list_objects(
+        self, prefix: str, start_after: str | None = None
+    ) -> list[dict[str, str]]:
+        client = await self._get_client()
+        objects = []
+        kwargs = {"StartAfter": start_after} if start_after else {}
+        self._in_flight += 1
+        try:
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(
+                Bucket=self._bucket_name, Prefix=prefix, **kwargs
+            ):
+                for content in page.get("Contents", []):
+                    objects.append(
+                        {"key": content["Key"], "hash": content["ETag"].strip('"')}
+                    )
+        except ClientError as e:
+            logger.error(
+                f"Error listing objects in bucket: {self._bucket_name} at "
+                f"{self._endpoint_url} with prefix: {prefix}",
+                error=e,
+            )
+        finally:
+            self._in_flight -= 1
+        return objects
+
+    async def async_get_object(self, key: str) -> dict[str, Any]:
+        return await self._get_object(key)
+
+    async def async_get_object_or_raise(self, key: str) -> dict[str, Any]:
+        """Return the contents of a JSON object, or an empty dict if there's
+        no such key.
+
+        Unlike `async_get_object`, other errors are raised so that the
+        download can be retried.
+
+        Raises
+        ------
+        `ClientError`
+            If the object couldn't be fetched for any reason but that it
+            doesn't exist.
+        """
+        return await self._get_object(key, raise_errors=True)
+
+    async def _get_object(self, key: str, raise_errors: bool = False) -> dict[str, Any]:
+        client = await self._get_client()
+        self._in_flight += 1
+        try:
+            obj = await client.get_object(Bucket=self._bucket_name, Key=key)
+            async with obj["Body"] as stream:
+                data = json.loads(await stream.read())
+            assert isinstance(data, dict)
+            for k in data.keys():
+                assert isinstance(k, str)
+            return data
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                logger.info("Object for key: {key} not found.", key=key)
+            elif raise_errors:
+                raise
+            return {}
+        finally:
+            self._in_flight -= 1
+
+    async def async_get_raw_object(self, key: str) -> Any:
+        """Return the streaming body of an object.
+
+        The body's ``iter_chunks()`` is an async iterator.
+        """
+        client = await self._get_client()
+        try:
+            obj = await client.get_object(Bucket=self._bucket_name, Key=key)
+        except ClientError:
+            raise HTTPException(status_code=404, detail=f"No such file for: {key}")
+        return obj["Body"]
+
+    async def async_get_movie(
+        self, key: str, headers: dict[str, str] | None = None
+    ) -> Any:
+        client = await self._get_client()
+        try:
+            data = await client.get_object(
+                Bucket=self._bucket_name, Key=key, **(headers or {})
+            )
+        except ClientError:
+            raise HTTPException(status_code=404, detail=f"No such file for: {key}")
+        return data
@@ -1,51 +1,101 @@
+from bisect import bisect_left, bisect_right, insort
+
 from lsst.ts.rubintv.config import rubintv_logger
 from lsst.ts.rubintv.models.models import Event
 
 logger = rubintv_logger()
 
 
-async def get_next_previous_from_table(
-    table: dict[int, dict[str, dict]], event: Event
-) -> tuple[dict | None, ...]:
-    """Takes an Event and a table of Event dicts keyed by seq. num and channel
-    name and returns the next and previous event dicts.
-
-    Parameters
-    ----------
-    table : dict[int, dict[str, dict]]
-        The table of Event dicts.
-    event : Event
-        The given event to find previous/next events to.
+class NextPrevIndex:
+    """Each channel's seq_nums in order, with their event dicts, for finding
+    the events before and after a given event by bisection.
 
-    Returns
-    -------
-    nxt_prv: tuple[dict | None, ...]
-        A tuple of two elements containing the next and previous events to the
-        given event, or None in either place if there is no such event.
+    The index mirrors a day's table of event dicts, keyed by seq_num and
+    channel name, and is kept up to date as events are added and removed,
+    so that looking up the next and previous events doesn't go through the
+    whole table.
     """
-    chan = event.channel_name
-    chan_table = {}
 
-    # reduces table to event's channel single
-    for seq, channels in table.items():
-        if chan in channels:
-            chan_table[seq] = table[seq][chan]
-    if chan_table == {}:
-        return (None, None)
+    def __init__(self) -> None:
+        # channel name -> (sorted seq_nums, seq_num -> event dict)
+        self._channels: dict[str, tuple[list[int], dict[int, dict]]] = {}
+
+    @classmethod
+    def from_table(cls, table: dict[int, dict[str, dict]]) -> "NextPrevIndex":
+        """Return an index of a table of event dicts, keyed by seq_num and
+        channel name.
+        """
+        index = cls()
+        chan_events: dict[str, dict[int, dict]] = {}
+        for seq, channels in table.items():
+            for chan, event_dict in channels.items():
+                chan_events.setdefault(chan, {})[seq] = event_dict
+        index._channels = {
+            chan: (sorted(events), events) for chan, events in chan_events.items()
+        }
+        return index
+
+    def add(self, channel_name: str, seq_num: int, event_dict: dict) -> None:
+        """Add a channel's event dict, or replace the one for its seq_num."""
+        seqs, events = self._channels.setdefault(channel_name, ([], {}))
+        if seq_num not in events:
+            insort(seqs, seq_num)
+        events[seq_num] = event_dict
 
-    # creates a 'None' padded list of seq. nums
-    all_seqs = sorted(set(chan_table.keys() | {event.seq_num_force_int()}))
-    padded_seqs = [None, *all_seqs, None]
+    def remove(self, channel_name: str, seq_num: int) -> None:
+        """Remove a channel's event dict, if there is one for the seq_num."""
+        if channel_name not in self._channels:
+            return
+        seqs, events = self._channels[channel_name]
+        if events.pop(seq_num, None) is None:
+            return
+        del seqs[bisect_left(seqs, seq_num)]
+        if not seqs:
+            del self._channels[channel_name]
 
-    # find the index of event's seq num in that padded list
-    index = padded_seqs.index(event.seq_num_force_int())
+    def next_prev(self, event: Event) -> tuple[dict | None, ...]:
+        """Return the event dicts of the next and previous events in the
+        given event's channel, which need not be in the index itself.
 
-    next_seq = padded_seqs[index + 1]
-    prev_seq = padded_seqs[index - 1]
+        Parameters
+        ----------
+        event : `Event`
+            The event to find the next and previous events to.
 
-    nxt_prv = (
-        chan_table.get(next_seq),  # type: ignore
-        chan_table.get(prev_seq),  # type: ignore
-    )
+        Returns
+        -------
+        `tuple` [`dict` | `None`, ...]
+            The next and previous event dicts, or None in either place if
+            there is no such event.
+        """
+        if event.channel_name not in self._channels:
+            return (None, None)
+        seqs, events = self._channels[event.channel_name]
+        seq_num = event.seq_num_force_int()
+        nxt = bisect_right(seqs, seq_num)
+        prv = bisect_left(seqs, seq_num) - 1
+        return (
+            events[seqs[nxt]] if nxt < len(seqs) else None,
+            events[seqs[prv]] if prv >= 0 else None,
+        )
 
-    return nxt_prv
+
+def make_dict_patch(old: dict, new: dict) -> dict:
+    """Return the entries of ``new`` that are new or differ from those in
+    ``old``, with None for keys that are no longer present.
+
+    Parameters
+    ----------
+    old : `dict`
+        The previous version of a dict.
+    new : `dict`
+        The current version.
+
+    Returns
+    -------
+    `dict`
+        A patch that, applied to ``old``, gives ``new``.
+    """
+    patch = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    patch.update({k: None for k in old.keys() - new.keys()})
+    return patch
@@ -0,0 +1,152 @@
+"""Codecs for the blobs the historical data is kept in.
+
+A codec is named as ``"{serializer}+{compressor}"``. Events and metadata are
+serialized with one of:
+
+- ``pickle``
+- ``orjson``, which writes NaN and infinite floats as null.
+- ``msgpack``
+
+and the result compressed with one of ``zlib``, ``zstd``, ``lz4`` or
+``none``. Other than pickle and zlib, these need optional packages:
+orjson, msgpack, zstandard (unless Python's own ``compression.zstd`` is
+there) and lz4.
+
+Events are serialized as the tuples they pickle as, rather than as dicts,
+which keeps them small and quick to rebuild.
+"""
+
+import pickle
+import zlib
+from functools import cache
+from typing import Any, Callable
+
+from lsst.ts.rubintv.config import config
+from lsst.ts.rubintv.models.models import Event
+
+__all__ = ["HistoricalCodec", "get_historical_codec"]
+
+SERIALIZERS = ("pickle", "orjson", "msgpack")
+COMPRESSORS = ("zlib", "zstd", "lz4", "none")
+
+
+def _serializer(name: str) -> tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    match name:
+        case "pickle":
+            return (
+                lambda data: pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),
+                pickle.loads,
+            )
+        case "orjson":
+            try:
+                import orjson
+            except ImportError:
+                raise ImportError("orjson is required for the 'orjson' serializer")
+            return orjson.dumps, orjson.loads
+        case "msgpack":
+            try:
+                import msgpack
+            except ImportError:
+                raise ImportError("msgpack is required for the 'msgpack' serializer")
+            return msgpack.packb, msgpack.unpackb
+    raise ValueError(f"Unknown serializer: {name}, expected one of {SERIALIZERS}")
+
+
+def _compressor(name: str) -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    match name:
+        case "zlib":
+            return zlib.compress, zlib.decompress
+        case "zstd":
+            try:
+                from compression import zstd  # type: ignore[import-not-found]
+
+                return zstd.compress, zstd.decompress
+            except ImportError:
+                pass
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("zstandard is required for the 'zstd' compressor")
+            # the module's functions make a (de)compressor for each call, as
+            # sharing one between threads isn't safe
+            return zstandard.compress, zstandard.decompress
+        case "lz4":
+            try:
+                import lz4.frame
+            except ImportError:
+                raise ImportError("lz4 is required for the 'lz4' compressor")
+            return lz4.frame.compress, lz4.frame.decompress
+        case "none":
+            return bytes, bytes
+    raise ValueError(f"Unknown compressor: {name}, expected one of {COMPRESSORS}")
+
+
+class HistoricalCodec:
+    """Encodes events and metadata to compressed bytes and decodes them.
+
+    Parameters
+    ----------
+    name : `str`
+        The codec, as ``"{serializer}+{compressor}"``.
+
+    Raises
+    ------
+    ValueError
+        If the serializer or compressor isn't known.
+    ImportError
+        If the package the serializer or compressor needs isn't installed.
+    """
+
+    def __init__(self, name: str) -> None:
+        serializer, _, compressor = name.partition("+")
+        self.name = name
+        self._dumps, self._loads = _serializer(serializer)
+        self._compress, self._decompress = _compressor(compressor)
+        self._pickles = serializer == "pickle"
+        self._tag = name.encode() + b"|"
+
+    def encode(self, data: Any) -> bytes:
+        """Return a metadata dict, or other JSON-like data, encoded."""
+        return self._compress(self._dumps(data))
+
+    def decode(self, blob: bytes) -> Any:
+        """Return the data that was encoded with `encode`."""
+        return self._loads(self._decompress(blob))
+
+    def encode_events(self, events: list[Event]) -> bytes:
+        """Return a list of events encoded."""
+        if self._pickles:
+            return self.encode(events)
+        return self.encode([event.__getstate__() for event in events])
+
+    def decode_events(self, blob: bytes) -> list[Event]:
+        """Return the events that were encoded with `encode_events`."""
+        if self._pickles:
+            return self.decode(blob)
+        new = Event.__new__
+        events = []
+        for state in self.decode(blob):
+            event = new(Event)
+            event.__setstate__(state)
+            events.append(event)
+        return events
+
+    def encode_tagged(self, data: Any) -> bytes:
+        """Return data encoded as by `encode`, prefixed with the codec's name,
+        for blobs that outlive the process.
+        """
+        return self._tag + self.encode(data)
+
+    def decode_tagged(self, blob: bytes) -> Any | None:
+        """Return the data that was encoded with `encode_tagged`, or None if
+        it was encoded by another codec.
+        """
+        if not blob.startswith(self._tag):
+            return None
+        return self.decode(blob.removeprefix(self._tag))
+
+
+@cache
+def get_historical_codec() -> HistoricalCodec:
+    """Return the codec set by ``config.historical_codec``."""
+    return HistoricalCodec(config.historical_codec)
@@ -1,10 +1,18 @@
 import gc
 from asyncio import Event as AsyncioEvent
-from asyncio import sleep
+from asyncio import Semaphore, gather, sleep
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
 from time import time
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, Iterable
 
-from lsst.ts.rubintv.background.background_helpers import get_next_previous_from_table
+from lsst.ts.rubintv.aio_s3client import AioS3Client
+from lsst.ts.rubintv.background.background_helpers import (
+    NextPrevIndex,
+    make_dict_patch,
+)
 from lsst.ts.rubintv.config import rubintv_logger
 from lsst.ts.rubintv.handlers.websocket_notifiers import notify_ws_clients
 from lsst.ts.rubintv.models.models import (
@@ -18,6 +26,7 @@ from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
 from lsst.ts.rubintv.models.models import ServiceTypes as Service
 from lsst.ts.rubintv.models.models import get_current_day_obs
 from lsst.ts.rubintv.models.models_helpers import (
+    add_events_to_table,
     all_objects_to_events,
     make_table_from_event_list,
     objects_to_ngt_report_data,
@@ -28,6 +37,71 @@ from lsst.ts.rubintv.s3client import S3Client
 logger = rubintv_logger()
 
 
+@dataclass
+class EventsDelta:
+    """The change in a camera's events between two polls.
+
+    ``table_rows`` is filled in as the delta is applied to the camera's
+    table, with the new contents of each row that changed, or None for rows
+    that were removed.
+    """
+
+    added: list[Event] = field(default_factory=list)
+    changed: list[Event] = field(default_factory=list)
+    removed: list[Event] = field(default_factory=list)
+    table_rows: dict[int, dict[str, dict] | None] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def touched(self) -> list[Event]:
+        """Return the added, changed and removed events."""
+        return [*self.added, *self.changed, *self.removed]
+
+
+@dataclass
+class ListingDelta:
+    """The change in a camera's listing between two polls."""
+
+    # objects that are new or have a new ETag, sorted by key
+    updated: list[dict[str, str]] = field(default_factory=list)
+    # keys that are no longer listed
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.updated or self.removed)
+
+
+@dataclass
+class DayHandoff:
+    """A day's data, already parsed by the `CurrentPoller`, to hand on to
+    the `HistoricalPoller` when the day rolls over.
+    """
+
+    day_obs: date
+    # loc_cam -> key-ordered events
+    events: dict[str, list[Event]] = field(default_factory=dict)
+    # loc_cam -> (listing entry, contents) of the metadata file
+    metadata: dict[str, tuple[dict[str, str], dict]] = field(default_factory=dict)
+
+
+def _insert_sorted(events: list[Event], event: Event) -> None:
+    """Insert an event into a key-ordered list, replacing any event with the
+    same key.
+    """
+    index = bisect_left(events, event.key, key=lambda e: e.key)
+    if index < len(events) and events[index].key == event.key:
+        events[index] = event
+    else:
+        events.insert(index, event)
+
+
+def _remove_sorted(events: list[Event], key: str) -> None:
+    index = bisect_left(events, key, key=lambda e: e.key)
+    if index < len(events) and events[index].key == key:
+        del events[index]
+
+
 class CurrentPoller:
     """Polls and holds state of the current day obs data in the s3 bucket and
     notifies the websocket server of changes.
@@ -36,18 +110,55 @@ class CurrentPoller:
     # min time between polls
     MIN_INTERVAL = 1
     RUNNING_LOG_PERIOD = 10  # loops
+    # Polls between full listings of each camera's prefix. In between, only
+    # keys newer than those already seen are listed, so objects overwritten
+    # in place (or deleted) are only picked up by the full listing.
+    FULL_LISTING_PERIOD = 60  # loops
+    # Polls for which a channel directory that changed is listed on every
+    # poll, before it's listed with the quiet ones.
+    ACTIVE_PERIOD = 30  # loops
+    # Polls over which each quiet channel directory is listed once, a few of
+    # them on each poll. This trades latency for fewer requests: new keys in
+    # a quiet channel that sorts before the last key seen can take up to
+    # this many polls (about 10 s at MIN_INTERVAL) to be picked up. Keys in
+    # the channel that sorts last, or in any after it, are picked up on the
+    # next poll, and the channel is then listed on every poll.
+    QUIET_LISTING_PERIOD = 10  # loops
 
     def __init__(
         self,
         locations: list[Location],
         first_pass_event: AsyncioEvent | None = None,
         test_mode: bool = False,
+        on_day_rollover: Callable[[DayHandoff], Awaitable[None]] | None = None,
     ) -> None:
-        self._s3clients: dict[str, S3Client] = {}
-        self._objects: dict[str, list] = {}
+        self._s3clients: dict[str, S3Client | AioS3Client] = {}
+        # loc_cam -> sub-prefix -> key -> hash, for incremental listing
+        self._listings: dict[str, dict[str, dict[str, str]]] = {}
+        self._listing_prefixes: dict[str, str] = {}
+        # loc_cam -> sub-prefix -> the poll it last changed in
+        self._active_sub_prefixes: dict[str, dict[str, int]] = {}
+        self._list_requests = 0
+        self._count_polls = 0
+        self._poll_semaphores: dict[str, Semaphore] = {}
+        # "{loc_cam} {message type}" -> version of the data clients hold.
+        # Versions aren't reset with the day's data so that they only ever
+        # increase.
+        self._versions: dict[str, int] = {}
+        self._camera_times: dict[str, float] = {}
         self._events: dict[str, list[Event]] = {}
+        # loc_cam -> key -> hash of the channel objects processed so far
+        self._object_hashes: dict[str, dict[str, str]] = {}
+        # loc_cam -> channel -> key-ordered events
+        self._channel_events: dict[str, dict[str, list[Event]]] = {}
         self._metadata: dict[str, dict] = {}
+        # listing entry ({"key", "hash"}) of the last metadata file fetched
+        self._metadata_objs: dict[str, dict[str, str]] = {}
+        self._metadata_fetched = 0
+        self._metadata_skipped = 0
         self._table: dict[str, dict[int, dict[str, dict]]] = {}
+        # loc_cam -> the table's seq_nums in order for each channel
+        self._next_prev: dict[str, NextPrevIndex] = {}
         self._per_day: dict[str, dict[str, dict]] = {}
         self._yesterday_prefixes: dict[str, list[str]] = {}
         self._most_recent_events: dict[str, Event] = {}
@@ -59,19 +170,30 @@ class CurrentPoller:
 
         self.completed_first_poll = False
         self.completed_first_poll_event = first_pass_event
+        self.on_day_rollover = on_day_rollover
 
         self.locations = locations
         self._current_day_obs = get_current_day_obs()
         for location in locations:
             self._s3clients[location.name] = get_shared_s3_client(
-                location.profile_name, location.bucket_name, location.endpoint_url
+                location.profile_name,
+                location.bucket_name,
+                location.endpoint_url,
+                location.s3_backend,
             )
+            self._poll_semaphores[location.name] = Semaphore(location.poll_concurrency)
 
     async def clear_todays_data(self) -> None:
-        self._objects = {}
+        self._listings = {}
+        self._listing_prefixes = {}
+        self._active_sub_prefixes = {}
         self._events = {}
+        self._object_hashes = {}
+        self._channel_events = {}
         self._metadata = {}
+        self._metadata_objs = {}
         self._table = {}
+        self._next_prev = {}
         self._per_day = {}
         self._most_recent_events = {}
         self._nr_metadata = {}
@@ -80,6 +202,20 @@ class CurrentPoller:
         gc.collect()
         logger.debug("Cleared today's data and triggered garbage collection")
 
+    def make_day_handoff(self) -> DayHandoff:
+        """Return the day's parsed events and metadata, for the historical
+        store to take on without listing and parsing them again.
+        """
+        return DayHandoff(
+            day_obs=self._current_day_obs,
+            events=dict(self._events),
+            metadata={
+                loc_cam: (self._metadata_objs[loc_cam], data)
+                for loc_cam, data in self._metadata.items()
+                if loc_cam in self._metadata_objs
+            },
+        )
+
     async def check_for_empty_per_day_channels(self) -> None:
         """Creates a store of channel prefixes for per-day data that's not
         been received over the course of a day's polling. The prefixes use the
@@ -106,39 +242,25 @@ class CurrentPoller:
                     loc_prefixes.append(prefix)
 
     async def poll_buckets_for_todays_data(self, test_day: str = "") -> None:
-        time_total = 0.0
         while True:
             timer_start = time()
             try:
                 if self._current_day_obs != get_current_day_obs():
                     await self.check_for_empty_per_day_channels()
+                    handoff = self.make_day_handoff()
                     await self.clear_todays_data()
+                    if self.on_day_rollover is not None:
+                        await self.on_day_rollover(handoff)
                 day_obs = self._current_day_obs = get_current_day_obs()
 
-                for location in self.locations:
-                    client = self._s3clients[location.name]
-                    for camera in location.cameras:
-                        if not camera.online:
-                            continue
-
-                        prefix = f"{camera.name}/{day_obs}"
-                        if test_day:
-                            prefix = f"{camera.name}/{test_day}"
-
-                        objects = await client.async_list_objects(prefix)
-                        if objects:
-                            objects = await self.sieve_out_metadata(
-                                objects, prefix, location, camera
-                            )
-                            objects = await self.sieve_out_night_reports(
-                                objects, location, camera
-                            )
-                            await self.process_channel_objects(
-                                objects, location, camera
-                            )
-
-                    await self.poll_for_yesterdays_per_day(location)
+                await gather(
+                    *(
+                        self.poll_location(location, day_obs, test_day)
+                        for location in self.locations
+                    )
+                )
 
+                self._count_polls += 1
                 self.completed_first_poll = True
                 if (
                     self.completed_first_poll_event is not None
@@ -152,14 +274,16 @@ class CurrentPoller:
                         break
 
                 elapsed = time() - timer_start
-                time_total += elapsed
                 self._count_loops += 1
                 if self._count_loops % self.RUNNING_LOG_PERIOD == 0:
                     logger.info(
                         "CurrentPoller loop",
-                        average_time=time_total / self.RUNNING_LOG_PERIOD,
+                        camera_times={
+                            loc_cam: round(t / self.RUNNING_LOG_PERIOD, 3)
+                            for loc_cam, t in self._camera_times.items()
+                        },
                     )
-                    time_total = 0.0
+                    self._camera_times = {}
                     self._count_loops = 0
                     # Trigger garbage collection periodically to prevent
                     # memory accumulation
@@ -171,6 +295,273 @@ class CurrentPoller:
             except Exception:
                 logger.debug("Caught exception during poll for data", exc_info=True)
 
+    async def poll_location(
+        self, location: Location, day_obs: date, test_day: str = ""
+    ) -> None:
+        """Poll all of a location's online cameras concurrently, at most
+        ``location.poll_concurrency`` at a time, then look for yesterday's
+        late per-day data.
+
+        Parameters
+        ----------
+        location : `Location`
+            The location to poll.
+        day_obs : `date`
+            The current day obs.
+        test_day : `str`
+            A date string to poll for in place of ``day_obs``.
+        """
+        semaphore = self._poll_semaphores[location.name]
+
+        async def poll_with_limit(camera: Camera) -> None:
+            async with semaphore:
+                await self.poll_camera(location, camera, day_obs, test_day)
+
+        await gather(*(poll_with_limit(c) for c in location.cameras if c.online))
+        await self.poll_for_yesterdays_per_day(location)
+
+    async def poll_camera(
+        self, location: Location, camera: Camera, day_obs: date, test_day: str = ""
+    ) -> None:
+        """List and process one camera's objects for the day.
+
+        Errors are logged rather than raised so that one camera can't hold up
+        the others.
+        """
+        loc_cam = self._get_loc_cam(location.name, camera)
+        timer_start = time()
+        prefix = f"{camera.name}/{day_obs}"
+        if test_day:
+            prefix = f"{camera.name}/{test_day}"
+        try:
+            client = self._s3clients[location.name]
+            delta = await self.list_camera_objects(client, prefix, location, camera)
+            if delta:
+                objects = await self.sieve_out_metadata(
+                    delta.updated, prefix, location, camera
+                )
+                objects = await self.sieve_out_night_reports(objects, location, camera)
+                await self.process_channel_objects(
+                    objects, location, camera, delta.removed
+                )
+        except Exception:
+            logger.debug(
+                "Caught exception during poll for camera",
+                loc_cam=loc_cam,
+                exc_info=True,
+            )
+        self._camera_times[loc_cam] = (
+            self._camera_times.get(loc_cam, 0.0) + time() - timer_start
+        )
+
+    async def list_camera_objects(
+        self,
+        client: S3Client | AioS3Client,
+        prefix: str,
+        location: Location,
+        camera: Camera,
+    ) -> ListingDelta:
+        """List a camera's objects for the day, fetching only new keys where
+        possible, and return what changed since the last poll.
+
+        The objects are grouped by the sub-prefix below ``prefix``, i.e. by
+        channel directory, ``night_report/`` or single files such as
+        ``metadata.json``. Every `FULL_LISTING_PERIOD` polls, or when the
+        prefix changes, the whole prefix is listed. In between, one listing
+        of the whole prefix with ``StartAfter`` set to the last key seen
+        picks up new keys in the channel directory that sorts last and in
+        any after it. The channel directories that sort before it are listed
+        with ``StartAfter`` set to the last key seen in each: on every poll
+        for those that changed in the last `ACTIVE_PERIOD` polls, and
+        otherwise each once every `QUIET_LISTING_PERIOD` polls, so new keys
+        in a quiet channel can take that many polls to be picked up. Single
+        files and the night report, which are overwritten in place, are
+        listed in full on every poll.
+
+        The listing is kept between polls and only the sub-prefixes that
+        were listed are compared with it, so that between full listings the
+        time taken depends on the number of new keys rather than on the
+        number of keys for the day. As the night report is made from all of
+        its objects, they are all returned if any of them changed.
+
+        Parameters
+        ----------
+        client : `S3Client` | `AioS3Client`
+            The location's S3 client.
+        prefix : `str`
+            The ``"{camera}/{day_obs}"`` prefix to list.
+        location : `Location`
+            The location of the camera.
+        camera : `Camera`
+            The camera being polled.
+
+        Returns
+        -------
+        `ListingDelta`
+            The objects that are new or have a new ETag, and the keys that
+            are gone.
+        """
+        loc_cam = self._get_loc_cam(location.name, camera)
+        listing = self._listings.get(loc_cam)
+        delta = ListingDelta()
+        if (
+            listing is None
+            or self._listing_prefixes.get(loc_cam) != prefix
+            or self._count_polls % self.FULL_LISTING_PERIOD == 0
+        ):
+            if self._listing_prefixes.get(loc_cam) != prefix:
+                self._active_sub_prefixes[loc_cam] = {}
+            new_listing: dict[str, dict[str, str]] = {}
+            for obj in await client.async_list_objects(prefix):
+                sub_prefix = self._get_sub_prefix(prefix, obj["key"])
+                new_listing.setdefault(sub_prefix, {})[obj["key"]] = obj["hash"]
+            self._list_requests += 1
+            previous = listing or {}
+            changed = {
+                sub_prefix
+                for sub_prefix in new_listing.keys() | previous.keys()
+                if self._diff_sub_prefix(
+                    prefix,
+                    sub_prefix,
+                    previous.get(sub_prefix, {}),
+                    new_listing.get(sub_prefix, {}),
+                    delta,
+                )
+            }
+            if listing is not None:
+                self._mark_active(loc_cam, changed)
+            self._listings[loc_cam] = new_listing
+            self._listing_prefixes[loc_cam] = prefix
+            return self._finish_delta(loc_cam, prefix, changed, delta)
+
+        last_key = max(
+            (next(reversed(keys)) for keys in listing.values() if keys), default=None
+        )
+        sub_prefixes = set(listing)
+        sub_prefixes.update(f"{prefix}/{chan.name}/" for chan in camera.channels)
+        sub_prefixes.update((f"{prefix}/metadata.json", f"{prefix}/night_report/"))
+        active = self._active_sub_prefixes.setdefault(loc_cam, {})
+        in_place, to_list, quiet = [], [], []
+        for sub_prefix in sorted(sub_prefixes):
+            if self._is_overwritten_in_place(prefix, sub_prefix):
+                in_place.append(sub_prefix)
+            elif last_key is None or sub_prefix > last_key:
+                # only has keys after the last one seen
+                continue
+            elif last_key.startswith(sub_prefix):
+                # the directory the last key is in
+                continue
+            elif self._is_active(active.get(sub_prefix)):
+                to_list.append(sub_prefix)
+            else:
+                quiet.append(sub_prefix)
+        slot = self._count_polls % self.QUIET_LISTING_PERIOD
+        to_list.extend(
+            sub_prefix
+            for i, sub_prefix in enumerate(quiet)
+            if i % self.QUIET_LISTING_PERIOD == slot
+        )
+
+        async def list_sub_prefix(sub_prefix: str) -> list[dict[str, str]]:
+            keys = listing.get(sub_prefix)
+            start_after = next(reversed(keys)) if keys else None
+            return await client.async_list_objects(sub_prefix, start_after)
+
+        results = await gather(
+            *(client.async_list_objects(sp) for sp in in_place),
+            client.async_list_objects(prefix, last_key),
+            *(list_sub_prefix(sp) for sp in to_list),
+        )
+        self._list_requests += len(results)
+
+        changed = set()
+        for sub_prefix, objects in zip(in_place, results):
+            new_keys = {obj["key"]: obj["hash"] for obj in objects}
+            old_keys = listing.get(sub_prefix, {})
+            if self._diff_sub_prefix(prefix, sub_prefix, old_keys, new_keys, delta):
+                listing[sub_prefix] = new_keys
+                changed.add(sub_prefix)
+        new_objects = islice(results, len(in_place), None)
+        for obj in (obj for objects in new_objects for obj in objects):
+            sub_prefix = self._get_sub_prefix(prefix, obj["key"])
+            if self._is_overwritten_in_place(prefix, sub_prefix):
+                # those listed in full above are up to date
+                continue
+            keys = listing.setdefault(sub_prefix, {})
+            if keys.get(obj["key"]) != obj["hash"]:
+                keys[obj["key"]] = obj["hash"]
+                delta.updated.append(obj)
+                changed.add(sub_prefix)
+        self._mark_active(loc_cam, changed)
+        return self._finish_delta(loc_cam, prefix, changed, delta)
+
+    def _diff_sub_prefix(
+        self,
+        prefix: str,
+        sub_prefix: str,
+        old_keys: dict[str, str],
+        new_keys: dict[str, str],
+        delta: ListingDelta,
+    ) -> bool:
+        """Add the difference between two listings of a sub-prefix to
+        ``delta``, returning whether there was any.
+        """
+        updated = [
+            {"key": key, "hash": hash}
+            for key, hash in new_keys.items()
+            if old_keys.get(key) != hash
+        ]
+        removed = [key for key in old_keys if key not in new_keys]
+        if not (updated or removed):
+            return False
+        if sub_prefix == f"{prefix}/night_report/":
+            updated = [{"key": key, "hash": hash} for key, hash in new_keys.items()]
+        delta.updated.extend(updated)
+        delta.removed.extend(removed)
+        return True
+
+    def _finish_delta(
+        self, loc_cam: str, prefix: str, changed: set[str], delta: ListingDelta
+    ) -> ListingDelta:
+        md_key = f"{prefix}/metadata.json"
+        if md_key in self._listings[loc_cam] and md_key not in changed:
+            # listed with the same ETag, so there's no need to download it
+            self._metadata_skipped += 1
+        delta.updated.sort(key=lambda o: o["key"])
+        delta.removed.sort()
+        return delta
+
+    def _is_active(self, last_changed: int | None) -> bool:
+        return (
+            last_changed is not None
+            and self._count_polls - last_changed < self.ACTIVE_PERIOD
+        )
+
+    def _mark_active(self, loc_cam: str, sub_prefixes: Iterable[str]) -> None:
+        active = self._active_sub_prefixes.setdefault(loc_cam, {})
+        for sub_prefix in sub_prefixes:
+            active[sub_prefix] = self._count_polls
+
+    def _get_sub_prefix(self, prefix: str, key: str) -> str:
+        """Return the directory directly below ``prefix`` that ``key`` is in,
+        or the key itself if it's a file directly below ``prefix``.
+        """
+        head, sep, _ = key.removeprefix(prefix).lstrip("/").partition("/")
+        return f"{prefix}/{head}/" if sep else key
+
+    def _forget_listed_key(self, loc_cam: str, key: str) -> None:
+        """Drop a key from the listing kept between polls, so that it's
+        listed as new, and processed again, on the next poll.
+        """
+        prefix = self._listing_prefixes.get(loc_cam)
+        listing = self._listings.get(loc_cam)
+        if prefix is None or listing is None:
+            return
+        listing.get(self._get_sub_prefix(prefix, key), {}).pop(key, None)
+
+    def _is_overwritten_in_place(self, prefix: str, sub_prefix: str) -> bool:
+        return not sub_prefix.endswith("/") or sub_prefix == f"{prefix}/night_report/"
+
     async def poll_for_yesterdays_per_day(self, location: Location) -> None:
         """Uses the store of prefixes for yesterday's missing per-day data to
         poll for new objects that have maybe been delayed in processing (this
@@ -193,7 +584,7 @@ class CurrentPoller:
             if objects:
                 found.append(prefix)
                 events = await all_objects_to_events(objects)
-                pd_data = {e.channel_name: e.__dict__ for e in events}
+                pd_data = {e.channel_name: e.to_dict() for e in events}
                 cam_name = prefix.split("/")[0]
                 loc_cam = f"{location.name}/{cam_name}"
                 logger.info(
@@ -206,40 +597,43 @@ class CurrentPoller:
             self._yesterday_prefixes[location.name].remove(prefix)
 
     async def process_channel_objects(
-        self, objects: list[dict[str, str]], location: Location, camera: Camera
+        self,
+        objects: list[dict[str, str]],
+        location: Location,
+        camera: Camera,
+        removed: list[str] | None = None,
     ) -> None:
         loc_cam = self._get_loc_cam(location.name, camera)
-        if objects and (
-            loc_cam not in self._objects or objects != self._objects[loc_cam]
-        ):
-            self._objects[loc_cam] = objects
-            events = await all_objects_to_events(objects)
-            self._events[loc_cam] = events
-            await self.update_channel_events(events, location, camera)
-
-            pd_events = await self.filter_per_day_events(camera, events)
-            pd_data = await self.per_day_events_to_dicts(pd_events)
-            self._per_day[loc_cam] = pd_data
-            await notify_ws_clients(
-                Service.CAMERA, MessageType.CAMERA_PER_DAY, loc_cam, pd_data
-            )
-
-            last_pd_event = pd_events[-1] if pd_events else None
-            if last_pd_event:
-                chan_lookup = f"{loc_cam}/{last_pd_event.channel_name}"
-                self._most_recent_events[chan_lookup] = last_pd_event
-                await notify_ws_clients(
-                    Service.CALENDAR,
-                    MessageType.CAMERA_PER_DAY,
-                    chan_lookup,
-                    last_pd_event.__dict__,
-                )
-
-            table = await self.make_channel_table(camera, events)
-            self._table[loc_cam] = table
-            await notify_ws_clients(
-                Service.CAMERA, MessageType.CAMERA_TABLE, loc_cam, table
-            )
+        if objects or removed:
+            delta = await self.diff_objects(loc_cam, objects, removed or [])
+            if delta:
+                await self.apply_events_delta(loc_cam, delta)
+                await self.update_channel_events(delta.touched(), location, camera)
+
+                pd_events = await self.filter_per_day_events(camera, delta.touched())
+                if pd_events:
+                    await self.update_per_day_data(loc_cam, camera, pd_events)
+
+                had_table = bool(self._table.get(loc_cam))
+                await self.patch_channel_table(loc_cam, camera, delta)
+                if delta.table_rows:
+                    version = self._bump_version(loc_cam, MessageType.CAMERA_TABLE)
+                    if had_table:
+                        await notify_ws_clients(
+                            Service.CAMERA,
+                            MessageType.CAMERA_TABLE_PATCH,
+                            loc_cam,
+                            delta.table_rows,
+                            version,
+                        )
+                    else:
+                        await notify_ws_clients(
+                            Service.CAMERA,
+                            MessageType.CAMERA_TABLE,
+                            loc_cam,
+                            self._table[loc_cam],
+                            version,
+                        )
 
         # clear all relevant prefixes from the store looking for
         # yesterday's per day updates
@@ -251,9 +645,165 @@ class CurrentPoller:
         ]
         self._yesterday_prefixes[loc] = new_prefixes
 
+    async def diff_objects(
+        self,
+        loc_cam: str,
+        objects: list[dict[str, str]],
+        removed: Iterable[str] = (),
+    ) -> EventsDelta:
+        """Parse only the objects that are new or have a new ETag since the
+        last poll, and make events of the keys that are gone.
+
+        The camera's map of keys to ETags is updated in place, so this takes
+        time in proportion to the number of objects given rather than to the
+        number of keys for the day.
+
+        Parameters
+        ----------
+        loc_cam : `str`
+            The location/camera the objects are listed for.
+        objects : `list` [`dict` [`str`, `str`]]
+            The objects listed since the last poll. Any with the ETag they
+            had before are skipped.
+        removed : `Iterable` [`str`]
+            The keys that are no longer listed.
+
+        Returns
+        -------
+        `EventsDelta`
+            The added, changed and removed events.
+        """
+        hashes = self._object_hashes.setdefault(loc_cam, {})
+        new_objs = []
+        added_keys = set()
+        for obj in objects:
+            prev_hash = hashes.get(obj["key"])
+            if prev_hash != obj["hash"]:
+                if prev_hash is None:
+                    added_keys.add(obj["key"])
+                hashes[obj["key"]] = obj["hash"]
+                new_objs.append(obj)
+        new_events = await all_objects_to_events(new_objs) if new_objs else []
+        removed_events = []
+        for key in removed:
+            if hashes.pop(key, None) is None:
+                # not a channel object
+                continue
+            try:
+                removed_events.append(Event(key=key))
+            except ValueError:
+                # never parsed as an event in the first place
+                pass
+        removed_events.sort()
+        return EventsDelta(
+            added=[e for e in new_events if e.key in added_keys],
+            changed=[e for e in new_events if e.key not in added_keys],
+            removed=removed_events,
+        )
+
+    async def apply_events_delta(self, loc_cam: str, delta: EventsDelta) -> None:
+        """Update the camera's key-ordered event lists in place.
+
+        Parameters
+        ----------
+        loc_cam : `str`
+            The location/camera the delta applies to.
+        delta : `EventsDelta`
+            The change since the last poll.
+        """
+        events = self._events.setdefault(loc_cam, [])
+        by_channel = self._channel_events.setdefault(loc_cam, {})
+        for event in delta.removed:
+            _remove_sorted(events, event.key)
+            _remove_sorted(by_channel.get(event.channel_name, []), event.key)
+        for event in (*delta.added, *delta.changed):
+            _insert_sorted(events, event)
+            _insert_sorted(by_channel.setdefault(event.channel_name, []), event)
+
+    def _latest_channel_event(self, loc_cam: str, channel_name: str) -> Event | None:
+        chan_events = self._channel_events.get(loc_cam, {}).get(channel_name)
+        return chan_events[-1] if chan_events else None
+
+    async def update_per_day_data(
+        self, loc_cam: str, camera: Camera, pd_events: list[Event]
+    ) -> None:
+        """Bring the per-day data up to date for the per-day channels that
+        have new, changed or removed events, and notify clients.
+        """
+        pd_data = self._per_day.setdefault(loc_cam, {})
+        latest_events = []
+        for chan_name in dict.fromkeys(e.channel_name for e in pd_events):
+            if event := self._latest_channel_event(loc_cam, chan_name):
+                pd_data[chan_name] = event.to_dict()
+                latest_events.append(event)
+            else:
+                pd_data.pop(chan_name, None)
+        await notify_ws_clients(
+            Service.CAMERA, MessageType.CAMERA_PER_DAY, loc_cam, pd_data
+        )
+        for event in latest_events:
+            chan_lookup = f"{loc_cam}/{event.channel_name}"
+            self._most_recent_events[chan_lookup] = event
+            await notify_ws_clients(
+                Service.CALENDAR,
+                MessageType.CAMERA_PER_DAY,
+                chan_lookup,
+                event.to_dict(),
+            )
+
+    async def patch_channel_table(
+        self, loc_cam: str, camera: Camera, delta: EventsDelta
+    ) -> None:
+        """Apply a delta to the camera's table in place, recording the rows
+        that changed in ``delta.table_rows``.
+
+        Parameters
+        ----------
+        loc_cam : `str`
+            The location/camera the delta applies to.
+        camera : `Camera`
+            The camera, for its list of sequenced channels.
+        delta : `EventsDelta`
+            The change since the last poll.
+        """
+        seq_chans = {chan.name for chan in camera.seq_channels()}
+        table = self._table.get(loc_cam, {})
+        next_prev = self._next_prev.setdefault(loc_cam, NextPrevIndex())
+        for event in delta.removed:
+            if event.channel_name not in seq_chans or event.seq_num not in table:
+                continue
+            row = table[event.seq_num]
+            row.pop(event.channel_name, None)
+            next_prev.remove(event.channel_name, event.seq_num)
+            if not row:
+                del table[event.seq_num]
+            delta.table_rows[event.seq_num] = row or None
+        updated = [*delta.added, *delta.changed]
+        table, rows = add_events_to_table(table, updated, camera.seq_channels())
+        for event in updated:
+            seq_num = event.seq_num
+            if isinstance(seq_num, int) and event.channel_name in rows.get(seq_num, {}):
+                next_prev.add(
+                    event.channel_name, seq_num, rows[seq_num][event.channel_name]
+                )
+        delta.table_rows.update(rows)
+        self._table[loc_cam] = table
+
     async def update_channel_events(
         self, events: list[Event], location: Location, camera: Camera
     ) -> None:
+        """Notify channel clients of the most recent event of each channel
+        that ``events`` touch, if it has changed.
+
+        Parameters
+        ----------
+        events : `list` [`Event`]
+            Events that are new, changed or removed since the last poll.
+        location : `Location`
+            The location of the camera.
+        camera : `Camera`
+            The camera.
+        """
         if not events:
             return
         loc_cam = f"{location.name}/{camera.name}"
@@ -262,7 +812,13 @@ class CurrentPoller:
             if not ch_events:
                 continue
             # get most recent event for this channel
-            current_event = ch_events.pop()
+            if loc_cam in self._channel_events:
+                current_event = self._latest_channel_event(loc_cam, chan.name)
+                if current_event is None:
+                    # all of the channel's events were removed
+                    continue
+            else:
+                current_event = ch_events.pop()
             chan_lookup = f"{loc_cam}/{chan.name}"
             if (
                 chan_lookup not in self._most_recent_events
@@ -273,7 +829,7 @@ class CurrentPoller:
                     Service.CHANNEL,
                     MessageType.CHANNEL_EVENT,
                     chan_lookup,
-                    current_event.__dict__,
+                    current_event.to_dict(),
                 )
                 _, prev = await self.get_next_prev_event(location.name, current_event)
                 await notify_ws_clients(
@@ -345,12 +901,34 @@ class CurrentPoller:
         self, md_obj: dict[str, str], location: Location, camera: Camera
     ) -> None:
         loc_cam = self._get_loc_cam(location.name, camera)
+        # The listing gives the file's ETag, so only download and parse it
+        # when that has changed.
+        if self._metadata_objs.get(loc_cam) == md_obj:
+            self._metadata_skipped += 1
+            return
         md_key = md_obj["key"]
         client = self._s3clients[location.name]
-        data = await client.async_get_object(md_key)
-        if data and (loc_cam not in self._metadata or data != self._metadata[loc_cam]):
+        try:
+            data = await client.async_get_object(md_key)
+        except Exception:
+            self._forget_listed_key(loc_cam, md_key)
+            raise
+        self._metadata_fetched += 1
+        if not data:
+            self._forget_listed_key(loc_cam, md_key)
+            return
+        self._metadata_objs[loc_cam] = md_obj
+        if loc_cam not in self._metadata or data != self._metadata[loc_cam]:
+            prev_data = self._metadata.get(loc_cam)
             self._metadata[loc_cam] = data
+            version = self._bump_version(loc_cam, MessageType.CAMERA_METADATA)
             logger.info("Current - metadata file processed for:", loc_cam=loc_cam)
+            if prev_data:
+                message_type = MessageType.CAMERA_METADATA_PATCH
+                payload = make_dict_patch(prev_data, data)
+            else:
+                message_type = MessageType.CAMERA_METADATA
+                payload = data
             # some channels e.g. Star Trackers share the same metadata file.
             # If it changes, the websocket clients listening to those cameras
             # need to be notified too.
@@ -361,7 +939,7 @@ class CurrentPoller:
             for cam in to_notify:
                 loc_cam = self._get_loc_cam(location.name, cam)
                 await notify_ws_clients(
-                    Service.CAMERA, MessageType.CAMERA_METADATA, loc_cam, data
+                    Service.CAMERA, message_type, loc_cam, payload, version
                 )
                 await notify_ws_clients(
                     Service.CHANNEL,
@@ -445,7 +1023,7 @@ class CurrentPoller:
         return pd_events
 
     async def per_day_events_to_dicts(self, pd_events: list[Event]) -> dict[str, dict]:
-        pd_data = {e.channel_name: e.__dict__ for e in pd_events}
+        pd_data = {e.channel_name: e.to_dict() for e in pd_events}
         return pd_data
 
     async def make_channel_table(
@@ -458,7 +1036,8 @@ class CurrentPoller:
         self, location_name: str, camera: Camera
     ) -> list[dict[str, str]]:
         loc_cam = self._get_loc_cam(location_name, camera)
-        return self._objects.get(loc_cam, [])
+        hashes = self._object_hashes.get(loc_cam, {})
+        return [{"key": key, "hash": hashes[key]} for key in sorted(hashes)]
 
     async def get_current_events(
         self, location_name: str, camera: Camera
@@ -523,6 +1102,55 @@ class CurrentPoller:
         night_report = self._night_reports.get(loc_cam, NightReport())
         return night_report
 
+    def _bump_version(self, loc_cam: str, message_type: MessageType) -> int:
+        version_key = f"{loc_cam} {message_type.value}"
+        version = self._versions.get(version_key, 0) + 1
+        self._versions[version_key] = version
+        return version
+
+    def get_data_version(
+        self, location_name: str, camera: Camera, message_type: MessageType
+    ) -> int | None:
+        """Return the version of a camera's table or metadata.
+
+        Parameters
+        ----------
+        location_name : `str`
+            The name of the location.
+        camera : `Camera`
+            The camera.
+        message_type : `MessageType`
+            ``CAMERA_TABLE`` or ``CAMERA_METADATA``.
+
+        Returns
+        -------
+        `int` | `None`
+            The version, or None if the data isn't versioned or there's been
+            none yet.
+        """
+        name = camera.name
+        if message_type == MessageType.CAMERA_METADATA and camera.metadata_from:
+            name = camera.metadata_from
+        return self._versions.get(f"{location_name}/{name} {message_type.value}")
+
+    def get_stats(self) -> dict[str, int]:
+        """Return the poller's counters.
+
+        Returns
+        -------
+        `dict` [`str`, `int`]
+            ``"metadata_fetched"`` and ``"metadata_skipped"`` count the
+            downloads of the cameras' metadata files and the polls where the
+            download was skipped because the file's ETag was unchanged.
+            ``"list_requests"`` counts the LIST requests made to poll the
+            cameras' objects.
+        """
+        return {
+            "metadata_fetched": self._metadata_fetched,
+            "metadata_skipped": self._metadata_skipped,
+            "list_requests": self._list_requests,
+        }
+
     def _get_loc_cam(self, location_name: str, camera: Camera) -> str:
         """Return `f"{location_name}/{camera.name}"`
 
@@ -545,9 +1173,9 @@ class CurrentPoller:
         self, location_name: str, event: Event
     ) -> tuple[dict | None, ...]:
         loc_cam = f"{location_name}/{event.camera_name}"
-        table = self._table.get(loc_cam, {})
-        nxt_prv = await get_next_previous_from_table(table, event)
-        return nxt_prv
+        if loc_cam not in self._next_prev:
+            return (None, None)
+        return self._next_prev[loc_cam].next_prev(event)
 
     def night_report_exists(self, location_name: str, camera_name: str) -> bool:
         loc_cam = f"{location_name}/{camera_name}"
@@ -583,7 +1211,7 @@ class CurrentPoller:
                 event = await self.get_current_channel_event(
                     location.name, camera.name, channel_name
                 )
-                yield MessageType.CHANNEL_EVENT, event.__dict__ if event else None
+                yield MessageType.CHANNEL_EVENT, event.to_dict() if event else None
 
                 if event is not None:
                     _, prev = await self.get_next_prev_event(location.name, event)
@@ -0,0 +1,144 @@
+"""Bounded-concurrency downloads from the location buckets, with retries."""
+
+import asyncio
+import random
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+from lsst.ts.rubintv.config import rubintv_logger
+
+logger = rubintv_logger()
+
+__all__ = ["DownloadScheduler"]
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+class DownloadScheduler:
+    """Runs downloads with at most a set number in flight per location,
+    retrying those that fail after a jittered, exponentially growing delay.
+
+    Parameters
+    ----------
+    max_concurrency : `int`
+        The maximum number of downloads in flight per location.
+    retries : `int`
+        The number of times to retry a failed download before giving up.
+    backoff : `float`
+        The delay before the first retry, in seconds. Each retry waits up to
+        twice as long as the one before, with the delay chosen at random
+        between half and all of that so that retries don't arrive together.
+    """
+
+    def __init__(self, max_concurrency: int, retries: int, backoff: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: dict[str, int] = {}
+        self._retried = 0
+        self._failed = 0
+
+    def _semaphore(self, locname: str) -> asyncio.Semaphore:
+        if locname not in self._semaphores:
+            self._semaphores[locname] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[locname]
+
+    async def fetch(self, locname: str, download: Callable[[], Awaitable[T]]) -> T:
+        """Run a download for a location once there's a free slot.
+
+        Parameters
+        ----------
+        locname : `str`
+            The location the download is from.
+        download : `Callable` [[], `Awaitable`]
+            Starts the download. Called again for each retry.
+
+        Returns
+        -------
+        result
+            What the download returns.
+
+        Raises
+        ------
+        `Exception`
+            Whatever the last attempt raised, once the retries are used up.
+        """
+        async with self._semaphore(locname):
+            self._in_flight[locname] = self._in_flight.get(locname, 0) + 1
+            try:
+                for attempt in range(self.retries + 1):
+                    try:
+                        return await download()
+                    except Exception as e:
+                        if attempt == self.retries:
+                            self._failed += 1
+                            raise
+                        self._retried += 1
+                        delay = self.backoff * 2**attempt
+                        delay = random.uniform(delay / 2, delay)
+                        logger.info(
+                            "Retrying download:",
+                            locname=locname,
+                            attempt=attempt + 1,
+                            delay=delay,
+                            error=e,
+                        )
+                        await asyncio.sleep(delay)
+                raise AssertionError("unreachable")
+            finally:
+                self._in_flight[locname] -= 1
+
+    async def fetch_all(
+        self,
+        items: Iterable[U],
+        download: Callable[[U], Awaitable[T]],
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> list[T | BaseException]:
+        """Run a download for each of a number of items concurrently.
+
+        The downloads should go through `fetch` so that the number in flight
+        is bounded.
+
+        Parameters
+        ----------
+        items : `Iterable`
+            The items to download for.
+        download : `Callable` [[item], `Awaitable`]
+            Downloads for an item.
+        on_progress : `Callable` [[`int`, `int`], `None`] | `None`
+            Called with the number done and the total as each finishes.
+
+        Returns
+        -------
+        results : `list`
+            The result of each download, in the order of the items, or the
+            exception that it failed with.
+        """
+        item_list = list(items)
+        total = len(item_list)
+        done = 0
+
+        async def fetch_one(item: U) -> T:
+            nonlocal done
+            try:
+                return await download(item)
+            finally:
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, total)
+
+        return await asyncio.gather(
+            *(fetch_one(item) for item in item_list), return_exceptions=True
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of downloads in flight and the number retried
+        and failed.
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": sum(self._in_flight.values()),
+            "retried": self._retried,
+            "failed": self._failed,
+        }
@@ -0,0 +1,310 @@
+"""A persistent on-disk index of historical bucket listings and metadata.
+
+Listing every key in a bucket and fetching every ``metadata.json`` takes
+minutes on the production buckets. `HistoricalIndex` keeps the results in a
+local SQLite database so that, after a restart or a day rollover, the
+historical poller only needs to list keys from the most recent indexed day
+onwards and only fetch metadata whose ETag has changed. The parts of each
+event's key are stored too, so indexed events are loaded without parsing
+their keys again.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.models.models import Event
+
+logger = rubintv_logger()
+
+__all__ = ["HistoricalIndex"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    location TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    day_obs TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    -- the parts of an event's key, with a NULL channel for other objects
+    -- and a NULL seq for "final"
+    channel TEXT,
+    seq INTEGER,
+    filename TEXT,
+    PRIMARY KEY (location, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_by_day ON objects (location, camera, day_obs);
+CREATE TABLE IF NOT EXISTS metadata (
+    location TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (location, key)
+) WITHOUT ROWID;
+"""
+
+
+def _split_key(key: str) -> tuple[str, str]:
+    """Return the camera name and day_obs of a key, day_obs being empty if
+    the key isn't under a date.
+    """
+    camera, _, rest = key.partition("/")
+    day_obs = rest.partition("/")[0]
+    if len(day_obs) != 10 or day_obs[4] != "-" or day_obs[7] != "-":
+        day_obs = ""
+    return camera, day_obs
+
+
+def _object_rows(
+    location_name: str, objects: list[dict[str, str]], events: Iterable[Event]
+) -> list[tuple]:
+    """Return the rows for a listing's objects, with the key parts of those
+    that were parsed as events.
+    """
+    parts = {
+        e.key: (e.channel_name, None if e.seq_num == "final" else e.seq_num, e.filename)
+        for e in events
+    }
+    no_parts = (None, None, None)
+    return [
+        (
+            location_name,
+            *_split_key(o["key"]),
+            o["key"],
+            o["hash"],
+            *parts.get(o["key"], no_parts),
+        )
+        for o in objects
+    ]
+
+
+class HistoricalIndex:
+    """SQLite-backed index of bucket objects, per location and camera, and
+    of the metadata downloaded for them.
+
+    Keys under days before the most recent indexed day are assumed not to
+    change, so only the most recent day onwards is relisted. Queries run in
+    a worker thread so as not to block the event loop.
+
+    Parameters
+    ----------
+    path : `str` | `Path`
+        Path of the database file, created if it doesn't exist.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            if version:
+                logger.info("Rebuilding historical index:", old_version=version)
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS objects; DROP TABLE IF EXISTS metadata;"
+            )
+            self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        def locked() -> Any:
+            with self._lock:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    async def clear(self) -> None:
+        """Forget everything, so the next listing is a full one."""
+
+        def clear() -> None:
+            with self._conn:
+                self._conn.execute("DELETE FROM objects")
+                self._conn.execute("DELETE FROM metadata")
+
+        await self._run(clear)
+
+    async def resume_key(self, location_name: str, camera_name: str) -> str | None:
+        """Return the key to resume listing a camera's objects after.
+
+        Returns
+        -------
+        `str` | `None`
+            ``"{camera_name}/{day_obs}"`` for the most recent indexed day, so
+            that listing after it relists that whole day, or None if nothing
+            is indexed for the camera.
+        """
+
+        def query() -> str | None:
+            row = self._conn.execute(
+                "SELECT MAX(day_obs) FROM objects WHERE location = ? AND camera = ?",
+                (location_name, camera_name),
+            ).fetchone()
+            return row[0] or None
+
+        day_obs = await self._run(query)
+        return f"{camera_name}/{day_obs}" if day_obs else None
+
+    async def get_listing(
+        self, location_name: str, camera_name: str
+    ) -> tuple[list[Event], list[dict[str, str]]]:
+        """Return the indexed events for a camera, made from the stored parts
+        of their keys, and its other indexed objects.
+
+        Returns
+        -------
+        events : `list` [`Event`]
+            The camera's events, in key order.
+        objects : `list` [`dict` [`str`, `str`]]
+            Dicts with ``"key"`` and ``"hash"``, as from a bucket listing, of
+            the objects that aren't events, in key order.
+        """
+
+        def query() -> tuple[list[Event], list[dict[str, str]]]:
+            rows = self._conn.execute(
+                "SELECT day_obs, key, hash, channel, seq, filename FROM objects"
+                " WHERE location = ? AND camera = ? ORDER BY key",
+                (location_name, camera_name),
+            )
+            from_parts = Event.from_parts
+            events = []
+            objects = []
+            for day_obs, key, hash, channel, seq, filename in rows:
+                if channel is None:
+                    objects.append({"key": key, "hash": hash})
+                else:
+                    events.append(
+                        from_parts(
+                            hash,
+                            camera_name,
+                            day_obs,
+                            channel,
+                            "final" if seq is None else seq,
+                            filename,
+                        )
+                    )
+            return events, objects
+
+        return await self._run(query)
+
+    async def replace_objects(
+        self,
+        location_name: str,
+        camera_name: str,
+        objects: list[dict[str, str]],
+        after: str | None = None,
+        events: Iterable[Event] = (),
+    ) -> None:
+        """Replace a camera's indexed objects with those from a listing.
+
+        Parameters
+        ----------
+        location_name : `str`
+            The location name.
+        camera_name : `str`
+            The camera name.
+        objects : `list` [`dict` [`str`, `str`]]
+            The listed objects.
+        after : `str` | `None`
+            The key the listing started after. Indexed objects up to and
+            including it are kept. None replaces all the camera's objects.
+        events : `Iterable` [`Event`]
+            The events parsed from the objects, whose key parts are stored.
+        """
+        rows = _object_rows(location_name, objects, events)
+
+        def replace() -> None:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM objects WHERE location = ? AND camera = ?"
+                    " AND key > ?",
+                    (location_name, camera_name, after or ""),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO objects (location, camera, day_obs,"
+                    " key, hash, channel, seq, filename)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        await self._run(replace)
+
+    async def replace_day_objects(
+        self,
+        location_name: str,
+        camera_name: str,
+        day_obs: str,
+        objects: list[dict[str, str]],
+        events: Iterable[Event] = (),
+    ) -> None:
+        """Replace a camera's indexed objects for one day with those from a
+        listing of that day, and the events parsed from them.
+        """
+        rows = _object_rows(location_name, objects, events)
+
+        def replace() -> None:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM objects WHERE location = ? AND camera = ?"
+                    " AND day_obs = ?",
+                    (location_name, camera_name, day_obs),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO objects (location, camera, day_obs,"
+                    " key, hash, channel, seq, filename)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+        await self._run(replace)
+
+    async def get_metadata_item(
+        self, location_name: str, key: str
+    ) -> tuple[str, bytes] | None:
+        """Return the ETag and stored data of one metadata object, or None
+        if it isn't indexed.
+        """
+
+        def query() -> tuple[str, bytes] | None:
+            return self._conn.execute(
+                "SELECT hash, data FROM metadata WHERE location = ? AND key = ?",
+                (location_name, key),
+            ).fetchone()
+
+        return await self._run(query)
+
+    async def put_metadata(
+        self, location_name: str, items: list[tuple[str, str, bytes]]
+    ) -> None:
+        """Store metadata for a location.
+
+        Parameters
+        ----------
+        location_name : `str`
+            The location name.
+        items : `list` [`tuple` [`str`, `str`, `bytes`]]
+            The key, ETag and data of each metadata object.
+        """
+        rows = [(location_name, key, hash, data) for key, hash, data in items]
+
+        def insert() -> None:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO metadata (location, key, hash, data)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+        await self._run(insert)
@@ -1,16 +1,25 @@
 import asyncio
+import copy
 import gc
-import pickle
 import re
-import zlib
-from datetime import date
+from dataclasses import dataclass, field
+from datetime import date, timedelta
 from time import time
 from typing import TYPE_CHECKING, Any
 
-from lsst.ts.rubintv.background.background_helpers import get_next_previous_from_table
-from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.background.background_helpers import NextPrevIndex
+from lsst.ts.rubintv.background.blob_codecs import (
+    HistoricalCodec,
+    get_historical_codec,
+)
+from lsst.ts.rubintv.background.download_scheduler import DownloadScheduler
+from lsst.ts.rubintv.background.historical_index import HistoricalIndex
+from lsst.ts.rubintv.background.lru_cache import SizedLRUCache
+from lsst.ts.rubintv.config import config, rubintv_logger
 from lsst.ts.rubintv.handlers.websocket_notifiers import (
     notify_all_status_change,
+    notify_historical_progress,
+    notify_historical_readiness,
     notify_ws_clients,
 )
 from lsst.ts.rubintv.models.models import (
@@ -25,29 +34,315 @@ from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
 from lsst.ts.rubintv.models.models import ServiceTypes as Service
 from lsst.ts.rubintv.models.models import get_current_day_obs
 from lsst.ts.rubintv.models.models_helpers import (
+    all_objects_to_events,
     date_str_to_date,
     daterange,
     make_table_from_event_list,
-    objects_to_events,
     objects_to_ngt_report_data,
 )
 from lsst.ts.rubintv.s3_connection_pool import get_shared_s3_client
 
 if TYPE_CHECKING:
+    from lsst.ts.rubintv.aio_s3client import AioS3Client
+    from lsst.ts.rubintv.background.currentpoller import DayHandoff
     from lsst.ts.rubintv.s3client import S3Client
 
 logger = rubintv_logger()
 
 
+def _split_objects(
+    objects: list[dict[str, str]],
+) -> tuple[list[dict[str, str]], list[dict[str, str]], list[dict[str, str]]]:
+    """Split a listing into metadata files, night report objects and event
+    objects.
+    """
+    metadata_objs = [o for o in objects if "metadata.json" in o["key"]]
+    n_report_objs = [o for o in objects if "night_report" in o["key"]]
+    event_objs = [
+        o
+        for o in objects
+        if "metadata.json" not in o["key"] and "night_report" not in o["key"]
+    ]
+    return metadata_objs, n_report_objs, event_objs
+
+
+@dataclass
+class HistoricalStore:
+    """One complete generation of the historical data.
+
+    A new store is built on each reload while the previous one carries on
+    serving requests, and is swapped in once it's complete.
+
+    Events are kept in partitions of one camera's events for one day, each
+    compressed separately, so that reading a day only decompresses that
+    day's events. Only the location of each day's metadata is kept; its
+    contents are fetched when first asked for.
+
+    Each camera's most recent event in each channel, and the channels that
+    have an event for each seq_num, are indexed as the events are stored so
+    that they can be looked up without decompressing any events. The
+    indexes for a camera are replaced rather than changed once the store
+    has been copied, so a copy shares them with the original. A copy shares
+    each camera's calendar too, until the camera's calendar is changed.
+    """
+
+    # loc/cam/date -> (key, ETag) of the metadata object
+    metadata: dict[str, tuple[str, str]] = field(default_factory=dict)
+    # loc_cam -> day_obs -> list of events, encoded by the codec
+    compressed_events: dict[str, dict[str, bytes]] = field(default_factory=dict)
+    nr_metadata: dict[str, list[NightReportData]] = field(default_factory=dict)
+    calendar: dict[str, dict[int, dict[int, dict[int, int]]]] = field(
+        default_factory=dict
+    )
+    # loc_cam -> channel name -> the channel's most recent event
+    latest_events: dict[str, dict[str, Event]] = field(default_factory=dict)
+    # loc_cam -> day_obs -> seq_num -> names of the channels with an event
+    seq_channels: dict[str, dict[str, dict[int | str, tuple[str, ...]]]] = field(
+        default_factory=dict
+    )
+    codec: HistoricalCodec = field(default_factory=get_historical_codec, repr=False)
+    _temp_events: dict[str, dict[str, list[Event]]] = field(
+        default_factory=dict, repr=False
+    )
+    # loc_cams whose calendar is shared with a copy of the store
+    _shared_calendars: set[str] = field(default_factory=set, repr=False)
+
+    def store_events(self, events: list[Event], locname: str) -> None:
+        for event in events:
+            loc_cam = f"{locname}/{event.camera_name}"
+
+            days = self._temp_events.setdefault(loc_cam, {})
+            days.setdefault(event.day_obs, []).append(event)
+
+            latest = self.latest_events.setdefault(loc_cam, {})
+            current = latest.get(event.channel_name)
+            if current is None or current < event:
+                latest[event.channel_name] = event
+
+            seqs = self.seq_channels.setdefault(loc_cam, {}).setdefault(
+                event.day_obs, {}
+            )
+            seqs[event.seq_num] = seqs.get(event.seq_num, ()) + (event.channel_name,)
+
+            seq_num = event.seq_num
+            if isinstance(seq_num, str):
+                seq_num = 1
+            self.add_to_calendar(loc_cam, event.day_obs, seq_num)
+
+    def compress_events(self) -> None:
+        for loc_cam, days in self._temp_events.items():
+            partitions = self.compressed_events.setdefault(loc_cam, {})
+            for day_obs, events in days.items():
+                if day_obs in partitions:
+                    events = self.get_day_events(loc_cam, day_obs) + events
+                partitions[day_obs] = self.codec.encode_events(events)
+                _share_channel_tuples(self.seq_channels[loc_cam][day_obs])
+        self._temp_events = {}
+
+    def get_day_events(self, loc_cam: str, day_obs: str) -> list[Event]:
+        """Return a camera's events for one day."""
+        compressed = self.compressed_events.get(loc_cam, {}).get(day_obs)
+        if compressed is None:
+            return []
+        return self.codec.decode_events(compressed)
+
+    def get_days(self, loc_cam: str) -> list[str]:
+        """Return the days a camera has events for, in date order."""
+        return sorted(self.compressed_events.get(loc_cam, {}))
+
+    def copy(self) -> "HistoricalStore":
+        """Return a copy that can be updated without changing this store."""
+        self._shared_calendars = set(self.calendar)
+        return HistoricalStore(
+            metadata=dict(self.metadata),
+            compressed_events={
+                loc_cam: dict(partitions)
+                for loc_cam, partitions in self.compressed_events.items()
+            },
+            nr_metadata=dict(self.nr_metadata),
+            calendar=dict(self.calendar),
+            latest_events=dict(self.latest_events),
+            seq_channels=dict(self.seq_channels),
+            codec=self.codec,
+            _shared_calendars=set(self.calendar),
+        )
+
+    def _own_calendar(self, loc_cam: str) -> dict[int, dict[int, dict[int, int]]]:
+        """Return a camera's calendar to change, copying it first if it's
+        shared with another store.
+        """
+        if loc_cam in self._shared_calendars:
+            self._shared_calendars.discard(loc_cam)
+            if loc_cam in self.calendar:
+                self.calendar[loc_cam] = copy.deepcopy(self.calendar[loc_cam])
+        return self.calendar.setdefault(loc_cam, {})
+
+    def replace_day_events(
+        self, loc_cam: str, day_obs: str, events: list[Event]
+    ) -> None:
+        """Replace a camera's events for one day, and its calendar entry."""
+        partitions = self.compressed_events.setdefault(loc_cam, {})
+        if events:
+            partitions[day_obs] = self.codec.encode_events(events)
+        else:
+            partitions.pop(day_obs, None)
+
+        year, month, day = (int(part) for part in day_obs.split("-"))
+        self._own_calendar(loc_cam).get(year, {}).get(month, {}).pop(day, None)
+        for event in events:
+            seq_num = event.seq_num
+            if isinstance(seq_num, str):
+                seq_num = 1
+            self.add_to_calendar(loc_cam, event.day_obs, seq_num)
+
+        seq_days = dict(self.seq_channels.get(loc_cam, {}))
+        seq_days.pop(day_obs, None)
+        seqs: dict[int | str, tuple[str, ...]] = {}
+        for event in events:
+            seqs[event.seq_num] = seqs.get(event.seq_num, ()) + (event.channel_name,)
+        if seqs:
+            _share_channel_tuples(seqs)
+            seq_days[day_obs] = seqs
+        self.seq_channels[loc_cam] = seq_days
+
+        latest = dict(self.latest_events.get(loc_cam, {}))
+        replaced = {chan for chan, event in latest.items() if event.day_obs == day_obs}
+        for chan in replaced:
+            del latest[chan]
+        for event in events:
+            current = latest.get(event.channel_name)
+            if current is None or current < event:
+                latest[event.channel_name] = event
+        # channels whose most recent event was in the replaced day, and that
+        # have none in it now, are looked for in the days before it
+        missing = replaced - latest.keys()
+        for earlier in reversed(self.get_days(loc_cam)):
+            if not missing:
+                break
+            if earlier >= day_obs:
+                continue
+            for event in self.get_day_events(loc_cam, earlier):
+                if event.channel_name in missing:
+                    current = latest.get(event.channel_name)
+                    if current is None or current < event:
+                        latest[event.channel_name] = event
+            missing -= latest.keys()
+        self.latest_events[loc_cam] = latest
+
+    def replace_camera(self, loc_cam: str, source: "HistoricalStore") -> None:
+        """Replace all of a camera's data with its data from another store."""
+        locname, _, cam_name = loc_cam.partition("/")
+        self.compressed_events[loc_cam] = dict(
+            source.compressed_events.get(loc_cam, {})
+        )
+        if loc_cam in source.calendar:
+            self.calendar[loc_cam] = copy.deepcopy(source.calendar[loc_cam])
+        else:
+            self.calendar.pop(loc_cam, None)
+        self._shared_calendars.discard(loc_cam)
+        self.latest_events[loc_cam] = source.latest_events.get(loc_cam, {})
+        self.seq_channels[loc_cam] = source.seq_channels.get(loc_cam, {})
+
+        prefix = loc_cam + "/"
+        self.metadata = {
+            name: md_obj
+            for name, md_obj in self.metadata.items()
+            if not name.startswith(prefix)
+        }
+        self.metadata.update(
+            (name, md_obj)
+            for name, md_obj in source.metadata.items()
+            if name.startswith(prefix)
+        )
+
+        nr_data = [
+            nr for nr in self.nr_metadata.get(locname, []) if nr.camera_name != cam_name
+        ]
+        nr_data.extend(
+            nr
+            for nr in source.nr_metadata.get(locname, [])
+            if nr.camera_name == cam_name
+        )
+        self.nr_metadata[locname] = nr_data
+
+    def add_to_calendar(self, loc_cam: str, date_str: str, seq_num: int) -> None:
+        year_str, month_str, day_str = date_str.split("-")
+        year, month, day = (int(year_str), int(month_str), int(day_str))
+        calendar = self._own_calendar(loc_cam)
+        if year not in calendar:
+            calendar[year] = {}
+        if month not in calendar[year]:
+            calendar[year][month] = {}
+        if calendar[year][month].get(day, 0) <= seq_num:
+            calendar[year][month][day] = seq_num
+
+
+def _share_channel_tuples(seqs: dict[int | str, tuple[str, ...]]) -> None:
+    """Make the seq_nums of a day that have events in the same channels
+    share one tuple of their names, as most of a day's seq_nums do.
+    """
+    shared: dict[tuple[str, ...], tuple[str, ...]] = {}
+    for seq_num, channels in seqs.items():
+        seqs[seq_num] = shared.setdefault(channels, channels)
+
+
 class HistoricalPoller:
     """Provide a cache of the historical data.
 
     Provides a cache of the historical data which updates when the day rolls
-    over.
+    over. The data is held in a `HistoricalStore`; reloads build a new store
+    alongside the current one and swap it in when complete, so the poller is
+    only busy until its first load has finished.
+
+    The first load is done in tiers. Each camera's most recent
+    ``config.historical_recent_days`` days are listed and served first, then
+    each camera's whole history is loaded and swapped in one camera at a
+    time. Reloads after that also swap in one camera at a time. The
+    readiness of each camera, ``"loading"``, ``"recent"`` or ``"complete"``,
+    is sent to clients of the historical status service as it changes.
+
+    At rollover, the day that's ended is taken on from the `CurrentPoller`'s
+    `DayHandoff`, checked against a listing of just that day, rather than
+    reloading the whole bucket.
+
+    If an index path is given, bucket listings and metadata are kept in a
+    `HistoricalIndex` on disk, so that reloads only list each camera's keys
+    from its most recent indexed day onwards and only fetch metadata whose
+    ETag has changed.
+
+    The channel tables, per-day data and next/previous lookups built for a
+    day are kept in a `SizedLRUCache`, which is emptied whenever the store is
+    replaced.
+
+    Metadata isn't downloaded with the listings. Each day's metadata is
+    fetched the first time it's asked for and kept in a second
+    `SizedLRUCache`, keyed by its key and ETag so that it outlives reloads.
+    The metadata for each camera's most recent
+    ``config.historical_metadata_prefetch_days`` days is fetched in the
+    background after each reload. Night report text is cached in the same
+    way. Downloads go through a `DownloadScheduler`, which bounds how many
+    are in flight for each location and retries those that fail.
+
+    Parameters
+    ----------
+    locations : `list` [`Location`]
+        The locations to poll.
+    index_path : `str` | `None`
+        Path of the on-disk index. Defaults to
+        ``config.historical_index_path``; empty to not keep an index.
+    cache_bytes : `int` | `None`
+        The size limit of the day cache. Defaults to
+        ``config.historical_cache_bytes``.
     """
 
     # polling period in seconds
     CHECK_NEW_DAY_PERIOD = 5
+    # how long to wait at rollover for the current poller's hand-off before
+    # reloading everything instead, in seconds
+    HANDOFF_TIMEOUT = 120
+    # how long to wait before loading cameras whose history failed to load
+    # again, in seconds
+    RETRY_FAILED_PERIOD = 60
 
     def __init__(
         self,
@@ -59,22 +354,50 @@ class HistoricalPoller:
         # see DM-44273
         test_date_start: str | None = None,
         test_date_end: str | None = None,
+        index_path: str | None = None,
+        cache_bytes: int | None = None,
     ) -> None:
-        self._clients: dict[str, S3Client] = {}
-        self._metadata: dict[str, bytes] = {}
-        self._temp_events: dict[str, list[Event]] = {}
-        self._compressed_events: dict[str, bytes] = {}
-        self._nr_metadata: dict[str, list[NightReportData]] = {}
-        self._calendar: dict[str, dict[int, dict[int, dict[int, int]]]] = {}
+        self._clients: dict[str, S3Client | AioS3Client] = {}
+        self._store = HistoricalStore()
+        if cache_bytes is None:
+            cache_bytes = config.historical_cache_bytes
+        self._day_cache = SizedLRUCache(cache_bytes)
+        self._metadata_cache = SizedLRUCache(config.historical_metadata_cache_bytes)
+        self._metadata_loads: dict[tuple[str, str], asyncio.Task] = {}
+        self._downloads = DownloadScheduler(
+            config.historical_download_concurrency,
+            config.historical_download_retries,
+            config.historical_download_backoff,
+        )
+        self.metadata_prefetch_days = config.historical_metadata_prefetch_days
+        self._prefetch_task: asyncio.Task | None = None
+        self.recent_days = config.historical_recent_days
+        # the first day loaded in the first tier
+        self._recent_since: date | None = None
+        # when to try loading cameras that failed to load again
+        self._retry_failed_at = 0.0
+        # loc_cam -> "loading", "recent", "complete" or "failed"
+        self._readiness = {
+            f"{location.name}/{camera.name}": "loading"
+            for location in locations
+            for camera in location.cameras
+            if camera.online
+        }
         self._locations = locations
         self._clients = {
             location.name: get_shared_s3_client(
-                location.profile_name, location.bucket_name, location.endpoint_url
+                location.profile_name,
+                location.bucket_name,
+                location.endpoint_url,
+                location.s3_backend,
             )
             for location in locations
         }
 
         self._have_downloaded = False
+        self._reload_requested = False
+        self._handoff: DayHandoff | None = None
+        self._handoff_received = asyncio.Event()
         self._last_reload = get_current_day_obs()
 
         self.cam_year_rgx = re.compile(r"(\w+)\/([\d]{4})-[\d]{2}-[\d]{2}")
@@ -84,42 +407,179 @@ class HistoricalPoller:
         self.test_date_end = test_date_end and date_str_to_date(test_date_end)
         self.prefix_extra = prefix_extra
 
+        if index_path is None:
+            index_path = config.historical_index_path
+        self._index = HistoricalIndex(index_path) if index_path else None
+        self._clear_index = False
+
+    def close(self) -> None:
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        if self._index is not None:
+            self._index.close()
+
+    def _swap_store(self, store: HistoricalStore) -> None:
+        """Replace the store, dropping everything cached from the old one."""
+        self._store = store
+        self._day_cache.clear()
+
+    def get_download_stats(self) -> dict[str, int]:
+        """Return the download statistics, as `DownloadScheduler.stats`."""
+        return self._downloads.stats()
+
+    def get_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Return the day and metadata caches' statistics, as
+        `SizedLRUCache.stats`.
+        """
+        return {
+            "days": self._day_cache.stats(),
+            "metadata": self._metadata_cache.stats(),
+        }
+
     async def clear_all_data(self) -> None:
         self._have_downloaded = False
-        self._metadata = {}
-        self._compressed_events = {}
-        self._nr_metadata = {}
-        self._calendar = {}
+        self._swap_store(HistoricalStore())
         # Force garbage collection after clearing large data structures
         gc.collect()
         logger.debug("Cleared all historical data and triggered garbage collection")
 
     async def trigger_reload_everything(self) -> None:
-        self._have_downloaded = False
+        """Reload all the data from the bucket, including anything already
+        in the index. The current data is served until the reload is done.
+        """
+        self._reload_requested = True
+        self._clear_index = True
+
+    async def is_busy(
+        self,
+        location: Location | None = None,
+        camera: Camera | None = None,
+        day_obs: date | None = None,
+    ) -> bool:
+        """Return whether historical data isn't available yet.
+
+        Parameters
+        ----------
+        location : `Location` | `None`
+            The location of the camera to check, None to check whether any
+            historical data is available.
+        camera : `Camera` | `None`
+            The camera to check.
+        day_obs : `date` | `None`
+            The date to check for. If None, only whether the camera's most
+            recent days are available is checked.
+
+        Returns
+        -------
+        busy : `bool`
+            True if the data asked about hasn't been loaded yet.
+        """
+        if location is None or camera is None:
+            return not self._have_downloaded
+        readiness = self._readiness.get(f"{location.name}/{camera.name}")
+        if readiness is None:
+            return not self._have_downloaded
+        if readiness in ("recent", "failed"):
+            return (
+                day_obs is not None
+                and self._recent_since is not None
+                and day_obs < self._recent_since
+            )
+        return readiness == "loading"
 
-    async def is_busy(self) -> bool:
-        return not self._have_downloaded
+    def get_readiness(self) -> dict[str, str]:
+        """Return the readiness of each online camera's historical data.
+
+        Returns
+        -------
+        readiness : `dict` [`str`, `str`]
+            ``"loading"`` if none of the camera's data is available yet,
+            ``"recent"`` if only its most recent days are, ``"complete"``, or
+            ``"failed"`` if its whole history couldn't be loaded and is to be
+            tried again, keyed by ``"{location}/{camera}"``.
+        """
+        return dict(self._readiness)
+
+    async def _set_readiness(self, loc_cams: list[str], readiness: str) -> None:
+        changed = False
+        for loc_cam in loc_cams:
+            changed |= self._readiness.get(loc_cam) != readiness
+            self._readiness[loc_cam] = readiness
+        if changed:
+            await notify_historical_readiness(self.get_readiness())
+
+    async def receive_day_handoff(self, handoff: "DayHandoff") -> None:
+        """Take the data for the day that's just ended from the current
+        poller, to add to the store at rollover.
+        """
+        self._handoff = handoff
+        self._handoff_received.set()
+
+    async def _wait_for_day_handoff(self, day_obs: date) -> "DayHandoff | None":
+        try:
+            await asyncio.wait_for(
+                self._handoff_received.wait(), timeout=self.HANDOFF_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("No hand-off from current poller for:", day_obs=day_obs)
+            return None
+        handoff, self._handoff = self._handoff, None
+        self._handoff_received.clear()
+        if handoff is None or handoff.day_obs != day_obs:
+            return None
+        return handoff
 
     async def check_for_new_day(self) -> None:
         try:
             while True:
+                today = get_current_day_obs()
                 if (
                     not self._have_downloaded
-                    or self._last_reload < get_current_day_obs()
+                    or self._reload_requested
+                    or self._last_reload < today
                 ):
                     time_start = time()
+                    handoff = None
+                    if (
+                        self._have_downloaded
+                        and not self._reload_requested
+                        and (today - self._last_reload).days == 1
+                    ):
+                        handoff = await self._wait_for_day_handoff(self._last_reload)
+                    self._reload_requested = False
                     # Let the clients know the day has changed
                     await self.notify_clients_of_day_change()
 
-                    await self.clear_all_data()
-                    for location in self._locations:
-                        await self._refresh_location_store(location)
-
-                    self._last_reload = get_current_day_obs()
+                    if self._clear_index and self._index is not None:
+                        await self._index.clear()
+                    self._clear_index = False
+
+                    if handoff is not None:
+                        store = self._store.copy()
+                        num_locations = len(self._locations)
+                        for done, location in enumerate(self._locations, 1):
+                            await self._add_day_to_store(location, handoff, store)
+                            await notify_historical_progress(
+                                {"done": done, "total": num_locations}
+                            )
+                        # the old store carries on serving until it's replaced
+                        self._swap_store(store)
+                    else:
+                        if not self._have_downloaded and self._can_load_recent():
+                            await self._load_recent_days(today)
+                            self._have_downloaded = True
+                            await notify_all_status_change(historical_busy=False)
+                        await self._load_cameras()
+                    self._start_metadata_prefetch()
+                    self._last_reload = today
                     self._have_downloaded = True
 
                     time_taken = time() - time_start
-                    logger.info("Historical polling took:", time_taken=time_taken)
+                    logger.info(
+                        "Historical polling took:",
+                        time_taken=time_taken,
+                        from_handoff=handoff is not None,
+                    )
 
                     # Force garbage collection after completing data refresh
                     gc.collect()
@@ -129,6 +589,9 @@ class HistoricalPoller:
 
                     await notify_all_status_change(historical_busy=False)
                 else:
+                    failed = self._get_failed_loc_cams()
+                    if failed and time() >= self._retry_failed_at:
+                        await self._load_cameras(failed)
                     if self.test_mode:
                         break
                     await asyncio.sleep(self.CHECK_NEW_DAY_PERIOD)
@@ -148,49 +611,218 @@ class HistoricalPoller:
                         "from historical",
                     )
 
-    async def _refresh_location_store(self, location: Location) -> None:
-        try:
-            up_to_date_objects = await self._get_objects_for_location(location)
-            await self.filter_convert_store_objects(up_to_date_objects, location)
-        except Exception as e:
-            logger.error(e)
+    def _can_load_recent(self) -> bool:
+        return (
+            self.recent_days > 0
+            and not self.prefix_extra
+            and not (self.test_date_start and self.test_date_end)
+        )
 
-    async def _get_objects_for_location(
-        self, location: Location
-    ) -> list[dict[str, str]]:
-        """Downloads objects from the bucket for each online camera for the
-        location.
+    async def _load_recent_days(self, today: date) -> None:
+        """Load and serve each camera's most recent days."""
+        self._recent_since = today - timedelta(days=self.recent_days - 1)
+        since = self._recent_since.isoformat()
+        store = HistoricalStore()
+        loc_cams = []
+        for location in self._locations:
+            for camera in location.cameras:
+                if not camera.online:
+                    continue
+                try:
+                    # keys start with the date, so listing after the start
+                    # of the first day lists just the recent days
+                    objects = await self._get_objects_for_prefix(
+                        location,
+                        f"{camera.name}/",
+                        start_after=f"{camera.name}/{since}",
+                    )
+                    await self.filter_convert_store_objects(objects, location, store)
+                except Exception as e:
+                    logger.error(e)
+                    continue
+                loc_cams.append(f"{location.name}/{camera.name}")
+        self._swap_store(store)
+        await self._set_readiness(loc_cams, "recent")
+
+    async def _load_cameras(self, loc_cams: set[str] | None = None) -> None:
+        """Load each camera's whole history and swap it in, one camera at a
+        time, so each is available as soon as it's loaded.
+
+        Cameras whose history fails to load are marked as failed, and tried
+        again after `RETRY_FAILED_PERIOD` seconds.
+
+        Parameters
+        ----------
+        loc_cams : `set` [`str`] | `None`
+            The ``"{location}/{camera}"`` of the cameras to load, None for
+            all of them.
+        """
+        num_locations = len(self._locations)
+        for done, location in enumerate(self._locations, 1):
+            for camera in location.cameras:
+                loc_cam = f"{location.name}/{camera.name}"
+                if not camera.online or (
+                    loc_cams is not None and loc_cam not in loc_cams
+                ):
+                    continue
+                camera_store = HistoricalStore()
+                try:
+                    await self._refresh_camera_store(location, camera, camera_store)
+                except Exception as e:
+                    logger.error(
+                        "Error loading camera history:", loc_cam=loc_cam, error=e
+                    )
+                    self._retry_failed_at = time() + self.RETRY_FAILED_PERIOD
+                    await self._set_readiness([loc_cam], "failed")
+                    continue
+                # the old store carries on serving until it's replaced
+                store = self._store.copy()
+                store.replace_camera(loc_cam, camera_store)
+                self._swap_store(store)
+                await self._set_readiness([loc_cam], "complete")
+            if loc_cams is None:
+                await notify_historical_progress({"done": done, "total": num_locations})
+
+    def _get_failed_loc_cams(self) -> set[str]:
+        return {
+            loc_cam
+            for loc_cam, readiness in self._readiness.items()
+            if readiness == "failed"
+        }
+
+    async def _refresh_camera_store(
+        self, location: Location, camera: Camera, store: HistoricalStore
+    ) -> None:
+        events, objects = await self._get_listing_for_camera(location, camera)
+        await self.filter_convert_store_objects(objects, location, store, events)
+
+    async def _add_day_to_store(
+        self, location: Location, handoff: "DayHandoff", store: HistoricalStore
+    ) -> None:
+        """Replace the location's data for the handed-off day.
+
+        Each camera's prefix for the day is listed to pick up anything that
+        arrived after the current poller's last poll. Events and metadata
+        that the current poller had already parsed or downloaded, with the
+        same ETags, are used as they are.
+        """
+        day_str = handoff.day_obs.isoformat()
+        for camera in location.cameras:
+            if not camera.online:
+                continue
+            loc_cam = f"{location.name}/{camera.name}"
+            try:
+                objects = await self._get_objects_for_prefix(
+                    location, f"{camera.name}/{day_str}/"
+                )
+                metadata_objs, n_report_objs, event_objs = _split_objects(objects)
+
+                handed = {e.key: e for e in handoff.events.get(loc_cam, [])}
+                events: list[Event] = []
+                to_parse = []
+                for obj in event_objs:
+                    event = handed.get(obj["key"])
+                    if event is not None and event.hash == obj["hash"]:
+                        events.append(event)
+                    else:
+                        to_parse.append(obj)
+                if to_parse:
+                    events.extend(await all_objects_to_events(to_parse))
+                events.sort()
+                if self._index is not None:
+                    await self._index.replace_day_objects(
+                        location.name, camera.name, day_str, objects, events
+                    )
+                await asyncio.to_thread(
+                    store.replace_day_events, loc_cam, day_str, events
+                )
+
+                nr_data = [
+                    nr
+                    for nr in store.nr_metadata.get(location.name, [])
+                    if nr.camera_name != camera.name or nr.day_obs != day_str
+                ]
+                nr_data.extend(await objects_to_ngt_report_data(n_report_objs))
+                store.nr_metadata[location.name] = nr_data
+
+                if loc_cam in handoff.metadata:
+                    md_obj, data = handoff.metadata[loc_cam]
+                    self._metadata_cache.put((md_obj["key"], md_obj["hash"]), data)
+                    if self._index is not None:
+                        await self._index.put_metadata(
+                            location.name,
+                            [
+                                (
+                                    md_obj["key"],
+                                    md_obj["hash"],
+                                    get_historical_codec().encode_tagged(data),
+                                )
+                            ],
+                        )
+                self.store_metadata_objects(location.name, metadata_objs, store)
+            except Exception as e:
+                logger.error(e)
+
+    async def _get_listing_for_camera(
+        self, location: Location, cam: Camera
+    ) -> tuple[list[Event], list[dict[str, str]]]:
+        """Downloads objects from the bucket for a camera.
 
         Returns
         -------
+        events : `list` [`Event`]
+            Events already parsed from the objects, loaded from the index.
         objects :  `list` [`dict` [`str`, `str`]]
-            A list of dicts representing bucket objects.
+            A list of dicts representing the other bucket objects.
         """
-        objects = []
-        for cam in location.cameras:
-            if cam.online:
-                prefixes = []
-                if self.test_date_start and self.test_date_end:
-                    for aDate in daterange(
-                        self.test_date_start,
-                        self.test_date_end,
-                    ):
-                        date_str = aDate.isoformat()
-                        prefixes.append(f"{cam.name}/{date_str}/{self.prefix_extra}")
-                else:
-                    prefixes.append(cam.name + "/" + self.prefix_extra)
+        events: list[Event] = []
+        objects: list[dict[str, str]] = []
+        prefixes = []
+        if self.test_date_start and self.test_date_end:
+            for aDate in daterange(
+                self.test_date_start,
+                self.test_date_end,
+            ):
+                date_str = aDate.isoformat()
+                prefixes.append(f"{cam.name}/{date_str}/{self.prefix_extra}")
+        elif self._index is not None and not self.prefix_extra:
+            events, objects = await self._get_indexed_listing_for_camera(location, cam)
+        else:
+            prefixes.append(cam.name + "/" + self.prefix_extra)
 
-                for prefix in prefixes:
-                    try:
-                        objects.extend(
-                            await self._get_objects_for_prefix(location, prefix)
-                        )
-                    except Exception as e:
-                        logger.error(e)
-        return objects
+        # errors are raised so that the camera is marked as failed to load
+        for prefix in prefixes:
+            objects.extend(await self._get_objects_for_prefix(location, prefix))
+        return events, objects
+
+    async def _get_indexed_listing_for_camera(
+        self, location: Location, camera: Camera
+    ) -> tuple[list[Event], list[dict[str, str]]]:
+        """Lists the camera's objects from its most recent indexed day
+        onwards, updates the index and returns everything indexed for the
+        camera. Only the keys just listed are parsed.
+
+        Returns
+        -------
+        events : `list` [`Event`]
+            The camera's events.
+        objects :  `list` [`dict` [`str`, `str`]]
+            A list of dicts representing the other bucket objects.
+        """
+        assert self._index is not None
+        after = await self._index.resume_key(location.name, camera.name)
+        listed = await self._get_objects_for_prefix(
+            location, camera.name + "/", start_after=after
+        )
+        _, _, event_objs = _split_objects(listed)
+        events = await all_objects_to_events(event_objs)
+        await self._index.replace_objects(
+            location.name, camera.name, listed, after, events
+        )
+        return await self._index.get_listing(location.name, camera.name)
 
     async def _get_objects_for_prefix(
-        self, location: Location, prefix: str
+        self, location: Location, prefix: str, start_after: str | None = None
     ) -> list[dict[str, str]]:
         """Downloads objects from the bucket for the given prefix.
 
@@ -200,6 +832,8 @@ class HistoricalPoller:
             The location to get objects for.
         prefix : `str`
             The prefix to filter objects by.
+        start_after : `str` | `None`
+            Only list keys after this one.
 
         Returns
         -------
@@ -207,93 +841,138 @@ class HistoricalPoller:
             A list of dicts representing bucket objects.
         """
         logger.info(
-            "Fetching objects for prefix:", location=location.name, prefix=prefix
+            "Fetching objects for prefix:",
+            location=location.name,
+            prefix=prefix,
+            start_after=start_after,
         )
-        client: S3Client = self._clients[location.name]
-        objects = await client.async_list_objects(prefix=prefix)
+        client: S3Client | AioS3Client = self._clients[location.name]
+        objects = await client.async_list_objects(prefix, start_after)
         logger.info("Found:", num_objects=len(objects), prefix=prefix)
         return objects
 
     async def filter_convert_store_objects(
-        self, objects: list[dict[str, str]], location: Location
+        self,
+        objects: list[dict[str, str]],
+        location: Location,
+        store: HistoricalStore,
+        events: list[Event] | None = None,
     ) -> None:
         locname = location.name
 
-        metadata_objs = [o for o in objects if "metadata.json" in o["key"]]
-        n_report_objs = [o for o in objects if "night_report" in o["key"]]
-
-        event_objs = [
-            o
-            for o in objects
-            if "metadata.json" not in o["key"] and "night_report" not in o["key"]
-        ]
-
-        self._nr_metadata[locname] = await objects_to_ngt_report_data(n_report_objs)
-        async for events_batch in objects_to_events(event_objs):
-            await self.store_events(events_batch, locname)
-        await self.compress_events()
-        self._temp_events = {}
-
-        await self.download_and_store_metadata(locname, metadata_objs)
-
-    async def compress_events(self) -> None:
-        for storage_key, events in self._temp_events.items():
-            compressed = zlib.compress(pickle.dumps(events))
-            if storage_key in self._compressed_events:
-                self._compressed_events[storage_key] += compressed
-            else:
-                self._compressed_events[storage_key] = compressed
-
-    async def store_events(self, events: list[Event], locname: str) -> None:
-        for event in events:
-            loc_cam = f"{locname}/{event.camera_name}"
-
-            if loc_cam not in self._temp_events:
-                self._temp_events[loc_cam] = []
-            self._temp_events[loc_cam].append(event)
-
-            seq_num = event.seq_num
-            if isinstance(seq_num, str):
-                seq_num = 1
-            self.add_to_calendar(loc_cam, event.day_obs, seq_num)
+        metadata_objs, n_report_objs, event_objs = _split_objects(objects)
 
-    def add_to_calendar(self, loc_cam: str, date_str: str, seq_num: int) -> None:
-        year_str, month_str, day_str = date_str.split("-")
-        year, month, day = (int(year_str), int(month_str), int(day_str))
-        if loc_cam not in self._calendar:
-            self._calendar[loc_cam] = {}
-        if year not in self._calendar[loc_cam]:
-            self._calendar[loc_cam][year] = {}
-        if month not in self._calendar[loc_cam][year]:
-            self._calendar[loc_cam][year][month] = {}
-        if self._calendar[loc_cam][year][month].get(day, 0) <= seq_num:
-            self._calendar[loc_cam][year][month][day] = seq_num
-
-    async def download_and_store_metadata(
-        self, locname: str, metadata_objs: list[dict[str, str]]
+        store.nr_metadata.setdefault(locname, []).extend(
+            await objects_to_ngt_report_data(n_report_objs)
+        )
+        # whole camera histories are long enough to be parsed across processes
+        parsed = await all_objects_to_events(event_objs)
+        events = events + parsed if events else parsed
+        for i in range(0, len(events), 1000):
+            store.store_events(events[slice(i, i + 1000)], locname)
+            await asyncio.sleep(0)
+        store.compress_events()
+
+        self.store_metadata_objects(locname, metadata_objs, store)
+
+    def store_metadata_objects(
+        self, locname: str, metadata_objs: list[dict[str, str]], store: HistoricalStore
     ) -> None:
-        # metadata is downloaded and stored against its loc/cam/date
-        # for efficient retrieval
-        logger.info("Fetching metadata for:", locname=locname)
-        t = time()
+        """Record where each day's metadata is, to fetch it when it's first
+        asked for.
+        """
         for md_obj in metadata_objs:
             key = md_obj.get("key")
             if not key:
                 continue
             storage_name = locname + "/" + key.split("/metadata")[0]
             _, cam_name, date_str = storage_name.split("/")
-            loc_cam = f"{locname}/{cam_name}"
-            self.add_to_calendar(loc_cam, date_str, 0)
+            store.add_to_calendar(f"{locname}/{cam_name}", date_str, 0)
+            store.metadata[storage_name] = (key, md_obj.get("hash", ""))
 
-            client = self._clients[locname]
-            md = await client.async_get_object(key)
-            if not md:
-                logger.info("Missing metadata for:", md_obj=md_obj)
-                continue
-            compressed_md = zlib.compress(pickle.dumps(md))
-            self._metadata[storage_name] = compressed_md
-        dur = time() - t
-        logger.info("Metatdata fetch took", locname=locname, dur=dur)
+    async def _load_metadata(self, locname: str, key: str, etag: str) -> dict:
+        """Return the contents of a metadata or night report text object,
+        from the cache, the index or the bucket. Concurrent requests for the
+        same object share one download.
+        """
+        cache_key = (key, etag)
+        md = self._metadata_cache.get(cache_key)
+        if md is not None:
+            return md
+        load = self._metadata_loads.get(cache_key)
+        if load is None:
+            load = asyncio.create_task(self._fetch_metadata(locname, key, etag))
+            self._metadata_loads[cache_key] = load
+            load.add_done_callback(lambda _: self._metadata_loads.pop(cache_key, None))
+        return await asyncio.shield(load)
+
+    async def _fetch_metadata(self, locname: str, key: str, etag: str) -> dict:
+        if self._index is not None:
+            indexed = await self._index.get_metadata_item(locname, key)
+            if indexed is not None and indexed[0] == etag:
+                # metadata indexed with another codec is downloaded again
+                md = get_historical_codec().decode_tagged(indexed[1])
+                if md is not None:
+                    self._metadata_cache.put((key, etag), md)
+                    return md
+
+        client = self._clients[locname]
+        try:
+            md = await self._downloads.fetch(
+                locname, lambda: client.async_get_object_or_raise(key)
+            )
+        except Exception as e:
+            # not cached, so it's tried again when next asked for
+            logger.error("Error fetching metadata:", key=key, error=e)
+            return {}
+        if not md:
+            logger.info("Missing metadata for:", key=key)
+            return {}
+        self._metadata_cache.put((key, etag), md)
+        if self._index is not None:
+            await self._index.put_metadata(
+                locname, [(key, etag, get_historical_codec().encode_tagged(md))]
+            )
+        return md
+
+    def _start_metadata_prefetch(self) -> None:
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        if self.metadata_prefetch_days > 0:
+            self._prefetch_task = asyncio.create_task(
+                self._prefetch_recent_metadata(self._store)
+            )
+
+    async def _prefetch_recent_metadata(self, store: HistoricalStore) -> None:
+        """Fetch the metadata for each camera's most recent days."""
+        t = time()
+        by_location: dict[str, dict[str, list[str]]] = {}
+        for storage_name in store.metadata:
+            loc_cam = storage_name.rpartition("/")[0]
+            by_camera = by_location.setdefault(loc_cam.partition("/")[0], {})
+            by_camera.setdefault(loc_cam, []).append(storage_name)
+        num_days = self.metadata_prefetch_days
+        to_fetch = [
+            (locname, store.metadata[storage_name])
+            for locname, by_camera in by_location.items()
+            for storage_names in by_camera.values()
+            for storage_name in sorted(storage_names, reverse=True)[:num_days]
+        ]
+
+        async def fetch(item: tuple[str, tuple[str, str]]) -> dict:
+            locname, (key, etag) = item
+            return await self._load_metadata(locname, key, etag)
+
+        def report_progress(done: int, total: int) -> None:
+            if done == total or done % max(total // 10, 1) == 0:
+                logger.info("Metadata prefetch progress:", done=done, total=total)
+
+        results = await self._downloads.fetch_all(to_fetch, fetch, report_progress)
+        for (_, (key, _)), result in zip(to_fetch, results):
+            if isinstance(result, Exception):
+                logger.error("Error prefetching metadata:", key=key, error=result)
+        logger.info("Metadata prefetch took", dur=time() - t)
 
     async def get_night_report_payload(
         self, location: Location, camera: Camera, day_obs: date
@@ -318,10 +997,9 @@ class HistoricalPoller:
         report: NightReport = NightReport()
         if text_reports:
             text_report = text_reports[0]
-            key = text_report.key
-            client = self._clients[location.name]
-            text_obj = await client.async_get_object(key)
-            report.text = text_obj
+            report.text = await self._load_metadata(
+                location.name, text_report.key, text_report.hash
+            )
             nr_data.remove(text_report)
         if nr_data:
             report.plots = nr_data
@@ -332,10 +1010,11 @@ class HistoricalPoller:
     ) -> list[NightReportData]:
         date_str = day_obs.isoformat()
         report = []
-        if location.name in self._nr_metadata:
+        nr_metadata = self._store.nr_metadata
+        if location.name in nr_metadata:
             report = [
                 nr
-                for nr in self._nr_metadata[location.name]
+                for nr in nr_metadata[location.name]
                 if nr.camera_name == camera.name and nr.day_obs == date_str
             ]
         return report
@@ -354,48 +1033,70 @@ class HistoricalPoller:
     ) -> list[Event]:
         loc_cam = f"{location.name}/{camera.name}"
         date_str = a_date.isoformat()
-        to_decompress = self._compressed_events.get(loc_cam, None)
-        if to_decompress is None:
-            return []
-        events: list[Event] = pickle.loads(zlib.decompress(to_decompress))
-        events = [e for e in events if e.day_obs == date_str]
-        return events
+        return self._store.get_day_events(loc_cam, date_str)
+
+    def _cache_put(self, store: HistoricalStore, key: tuple, value: Any) -> None:
+        # Don't cache anything built from a store that's been swapped out
+        # while it was being built.
+        if store is self._store:
+            self._day_cache.put(key, value)
 
     async def get_channel_data_for_date(
         self, location: Location, camera: Camera, day_obs: date
     ) -> dict[int, dict[str, dict]]:
-        events = await self.get_events_for_date(location, camera, day_obs)
+        """Return the table of the day's events, keyed by seq_num and
+        channel name. The table is cached, so mustn't be modified.
+        """
+        loc_cam = f"{location.name}/{camera.name}"
+        key = (loc_cam, day_obs.isoformat(), "table")
+        channel_data = self._day_cache.get(key)
+        if channel_data is not None:
+            return channel_data
+        store = self._store
+        events = store.get_day_events(loc_cam, day_obs.isoformat())
         if not events:
             return {}
         channel_data = await make_table_from_event_list(events, camera.seq_channels())
+        self._cache_put(store, key, channel_data)
         return channel_data
 
     async def get_per_day_for_date(
         self, location: Location, camera: Camera, day_obs: date
     ) -> dict[str, dict[str, dict]]:
-        events = await self.get_events_for_date(location, camera, day_obs)
+        """Return the day's per-day channel events, keyed by channel name.
+        The dict is cached, so mustn't be modified.
+        """
+        loc_cam = f"{location.name}/{camera.name}"
+        key = (loc_cam, day_obs.isoformat(), "per_day")
+        per_day = self._day_cache.get(key)
+        if per_day is not None:
+            return per_day
+        store = self._store
+        events = store.get_day_events(loc_cam, day_obs.isoformat())
         if not events:
             return {}
         chan_names = [c.name for c in camera.pd_channels()]
         per_day_lists = [e for e in events if e.channel_name in chan_names]
-        if not per_day_lists:
-            return {}
         per_day = {}
         for event in per_day_lists:
-            per_day[event.channel_name] = event.__dict__
+            per_day[event.channel_name] = event.to_dict()
+        self._cache_put(store, key, per_day)
         return per_day
 
     async def get_metadata_for_date(
         self, location: Location, camera: Camera, day_obs: date
     ) -> dict[str, Any]:
+        """Return the camera's metadata for the date, fetching it if it
+        isn't cached. The metadata is cached, so mustn't be modified.
+        """
         cam_name = camera.name
         if camera.metadata_from:
             cam_name = camera.metadata_from
         loc_cam_date = f"{location.name}/{cam_name}/{day_obs}"
-        compressed = self._metadata.get(loc_cam_date, None)
-        if compressed is None:
+        md_obj = self._store.metadata.get(loc_cam_date, None)
+        if md_obj is None:
             return {}
-        return pickle.loads(zlib.decompress(compressed))
+        return await self._load_metadata(location.name, *md_obj)
 
     def flatten_calendar(self, location: Location, camera: Camera) -> dict[str, int]:
         """Flatten the calendar for a given location and camera.
@@ -404,7 +1105,7 @@ class HistoricalPoller:
         events for that date.
         """
         loc_cam = f"{location.name}/{camera.name}"
-        calendar = self._calendar.get(loc_cam, {})
+        calendar = self._store.calendar.get(loc_cam, {})
         flat_calendar = {}
         for year in calendar:
             for month in calendar[year]:
@@ -417,7 +1118,7 @@ class HistoricalPoller:
         self, location: Location, camera: Camera
     ) -> date | None:
         loc_cam = f"{location.name}/{camera.name}"
-        calendar = self._calendar.get(loc_cam)
+        calendar = self._store.calendar.get(loc_cam)
         if not calendar:
             return None
         year = max(calendar.keys())
@@ -442,33 +1143,33 @@ class HistoricalPoller:
         day_obs = await self.get_most_recent_day(location, camera)
         if not day_obs:
             return []
-        compressed = self._compressed_events.get(loc_cam, None)
-        if compressed is None:
-            return []
-        events = pickle.loads(zlib.decompress(compressed))
-        date_str = day_obs.isoformat()
-        return [e for e in events if e.day_obs == date_str]
+        return self._store.get_day_events(loc_cam, day_obs.isoformat())
 
     async def get_most_recent_event(
         self, location: Location, camera: Camera, channel: Channel
     ) -> Event | None:
         loc_cam = f"{location.name}/{camera.name}"
-        compressed = self._compressed_events.get(loc_cam, None)
-        if compressed is None:
-            return None
-        events = pickle.loads(zlib.decompress(compressed))
-        events = [event for event in events if event.channel_name == channel.name]
-        if not events:
-            return None
-        return max(events)
+        return self._store.latest_events.get(loc_cam, {}).get(channel.name)
 
     async def get_next_prev_event(
         self, location: Location, camera: Camera, event: Event
     ) -> tuple[dict | None, ...]:
-        day_obs = event.day_obs_date()
-        table = await self.get_channel_data_for_date(location, camera, day_obs)
-        nxt_prv = await get_next_previous_from_table(table, event)
-        return nxt_prv
+        """Return the next and previous events in the given event's channel
+        on the event's day, from an index of the day's table.
+        """
+        loc_cam = f"{location.name}/{camera.name}"
+        key = (loc_cam, event.day_obs, "next_prev")
+        index = self._day_cache.get(key)
+        if index is None:
+            store = self._store
+            table = await self.get_channel_data_for_date(
+                location, camera, event.day_obs_date()
+            )
+            if not table:
+                return (None, None)
+            index = NextPrevIndex.from_table(table)
+            self._cache_put(store, key, index)
+        return index.next_prev(event)
 
     async def get_most_recent_channel_data(
         self, location: Location, camera: Camera
@@ -500,7 +1201,7 @@ class HistoricalPoller:
 
         """
         loc_cam = f"{location.name}/{camera.name}"
-        return self._calendar.get(loc_cam, {})
+        return self._store.calendar.get(loc_cam, {})
 
     async def get_all_channel_names_for_date_and_seq_num(
         self, location: Location, camera: Camera, date: str, seq_num: int
@@ -522,12 +1223,5 @@ class HistoricalPoller:
             A list of channel names for the given date and seq_num.
         """
         loc_cam = f"{location.name}/{camera.name}"
-        compressed = self._compressed_events.get(loc_cam, None)
-        if compressed is None:
-            return []
-        events: list[Event] = pickle.loads(zlib.decompress(compressed))
-        relevant_events = [
-            e for e in events if e.day_obs == date and e.seq_num == seq_num
-        ]
-        chan_names = [e.channel_name for e in relevant_events]
-        return chan_names
+        seqs = self._store.seq_channels.get(loc_cam, {}).get(date, {})
+        return list(seqs.get(seq_num, ()))
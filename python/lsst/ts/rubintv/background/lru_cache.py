@@ -0,0 +1,113 @@
+"""A least-recently-used cache bounded by the size of its values."""
+
+import sys
+from collections import OrderedDict
+from typing import Any, Hashable
+
+__all__ = ["SizedLRUCache"]
+
+_SCALARS = (str, bytes, bytearray, int, float, bool, type(None))
+
+
+def estimate_size(value: Any) -> int:
+    """Return an estimate of the memory a value holds, in bytes.
+
+    Containers other than tuples are estimated from their length and the
+    size of their first entry, and other objects from their attributes, so
+    the cost depends on how deeply the value is nested rather than on how
+    many entries it has. Entries are taken to be of much the same size, as
+    those of the cached tables and metadata are, so the cache limit should
+    be taken as approximate.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, _SCALARS):
+        return size
+    if isinstance(value, dict):
+        if value:
+            key, item = next(iter(value.items()))
+            size += len(value) * (estimate_size(key) + estimate_size(item))
+        return size
+    if isinstance(value, tuple):
+        # tuples are short records of different things
+        return size + sum(estimate_size(item) for item in value)
+    if isinstance(value, (list, set, frozenset)):
+        if value:
+            size += len(value) * estimate_size(next(iter(value)))
+        return size
+    if hasattr(value, "__dict__"):
+        size += estimate_size(vars(value))
+    for name in getattr(type(value), "__slots__", ()):
+        size += estimate_size(getattr(value, name, None))
+    return size
+
+
+class SizedLRUCache:
+    """LRU cache that evicts the least recently used entries once the total
+    estimated size of the values exceeds a limit.
+
+    Values are returned as stored, not copied, so they mustn't be modified.
+
+    Parameters
+    ----------
+    max_bytes : `int`
+        The limit on the total estimated size of the cached values. Values
+        larger than this aren't cached. Zero disables the cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the value cached for a key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used values as needed
+        to keep within the limit.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if (old := self._entries.pop(key, None)) is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all the cached values."""
+        self._entries.clear()
+        self._bytes = 0
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache's size and hit, miss, eviction and invalidation
+        counts.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,7 +1,7 @@
 """Configuration definition."""
 
 import os
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -63,6 +63,146 @@ class Configuration(BaseSettings):
 
     s3_endpoint_url: str = Field(default="testing", alias="S3_ENDPOINT_URL")
 
+    s3_max_workers: int = Field(
+        default=10,
+        validation_alias="S3_MAX_WORKERS",
+        json_schema_extra={
+            "title": "Worker threads and pooled connections per S3 client"
+        },
+    )
+
+    s3_aio_max_connections: int = Field(
+        default=100,
+        validation_alias="S3_AIO_MAX_CONNECTIONS",
+        json_schema_extra={
+            "title": "Pooled connections per S3 client on the 'aio' backend"
+        },
+    )
+
+    historical_index_path: str = Field(
+        default="",
+        validation_alias="HISTORICAL_INDEX_PATH",
+        json_schema_extra={
+            "title": (
+                "Path of the on-disk index of historical bucket listings and"
+                " metadata, empty to list the whole bucket on every reload"
+            )
+        },
+    )
+
+    historical_recent_days: int = Field(
+        default=7,
+        validation_alias="HISTORICAL_RECENT_DAYS",
+        json_schema_extra={
+            "title": (
+                "Number of each camera's most recent days to load and serve"
+                " before the rest of its history, zero to load it all at once"
+            )
+        },
+    )
+
+    historical_cache_bytes: int = Field(
+        default=128 * 1024 * 1024,
+        validation_alias="HISTORICAL_CACHE_BYTES",
+        json_schema_extra={
+            "title": (
+                "Size limit, in bytes, of the cache of tables built for"
+                " historical days, zero to not cache them"
+            )
+        },
+    )
+
+    historical_metadata_cache_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        validation_alias="HISTORICAL_METADATA_CACHE_BYTES",
+        json_schema_extra={
+            "title": (
+                "Size limit, in bytes, of the cache of historical metadata"
+                " fetched on demand"
+            )
+        },
+    )
+
+    historical_metadata_prefetch_days: int = Field(
+        default=0,
+        validation_alias="HISTORICAL_METADATA_PREFETCH_DAYS",
+        json_schema_extra={
+            "title": (
+                "Number of each camera's most recent days to fetch historical"
+                " metadata for after each reload, zero to only fetch on demand"
+            )
+        },
+    )
+
+    historical_download_concurrency: int = Field(
+        default=16,
+        validation_alias="HISTORICAL_DOWNLOAD_CONCURRENCY",
+        json_schema_extra={
+            "title": "Max historical metadata downloads in flight per location"
+        },
+    )
+
+    historical_download_retries: int = Field(
+        default=3,
+        validation_alias="HISTORICAL_DOWNLOAD_RETRIES",
+        json_schema_extra={
+            "title": "Times to retry a failed historical metadata download"
+        },
+    )
+
+    historical_download_backoff: float = Field(
+        default=0.5,
+        validation_alias="HISTORICAL_DOWNLOAD_BACKOFF",
+        json_schema_extra={
+            "title": (
+                "Delay before the first retry of a failed historical download,"
+                " in seconds, doubling for each retry after"
+            )
+        },
+    )
+
+    historical_codec: str = Field(
+        default="pickle+zlib",
+        validation_alias="HISTORICAL_CODEC",
+        json_schema_extra={
+            "title": (
+                "Codec of the historical event partitions and indexed metadata,"
+                " as 'serializer+compressor': pickle, orjson or msgpack, and"
+                " zlib, zstd, lz4 or none"
+            )
+        },
+    )
+
+    key_parse_processes: int = Field(
+        default=0,
+        validation_alias="KEY_PARSE_PROCESSES",
+        json_schema_extra={
+            "title": (
+                "Number of processes to parse very large bucket listings"
+                " across, or 0 to parse them in the server process"
+            )
+        },
+    )
+
+    ws_client_queue_size: int = Field(
+        default=100,
+        validation_alias="WS_CLIENT_QUEUE_SIZE",
+        json_schema_extra={
+            "title": "Max messages queued for sending to each websocket client"
+        },
+    )
+
+    ws_full_queue_policy: Literal["coalesce", "disconnect"] = Field(
+        default="coalesce",
+        validation_alias="WS_FULL_QUEUE_POLICY",
+        json_schema_extra={
+            "title": (
+                "What to do when a websocket client's queue is full: 'coalesce'"
+                " to keep only the latest message per topic, or 'disconnect'"
+            )
+        },
+    )
+
     model_config = SettingsConfigDict(env_prefix="SAFIR_", case_sensitive=False)
 
 
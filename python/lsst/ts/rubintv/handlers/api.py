@@ -5,6 +5,7 @@ from typing import Annotated
 import redis.exceptions  # type: ignore
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
+from lsst.ts.rubintv.aio_s3client import AioS3Client
 from lsst.ts.rubintv.background.currentpoller import CurrentPoller
 from lsst.ts.rubintv.background.historicaldata import HistoricalPoller
 from lsst.ts.rubintv.config import REDIS_CONTROL_READBACK_SUFFIX as RC_SUFFIX
@@ -13,6 +14,7 @@ from lsst.ts.rubintv.handlers.handlers_helpers import (
     date_validation,
     get_camera_events_for_date,
     get_current_night_report_payload,
+    get_night_report_for_day,
 )
 from lsst.ts.rubintv.models.models import (
     Camera,
@@ -46,6 +48,18 @@ async def historical_reset(request: Request) -> None:
     await current.clear_todays_data()
 
 
+@api_router.get("/historical_status")
+async def get_historical_status(request: Request) -> dict:
+    """Return whether the historical data is still loading, and the
+    readiness of each camera's historical data.
+    """
+    historical: HistoricalPoller = request.app.state.historical
+    return {
+        "busy": await historical.is_busy(),
+        "cameras": historical.get_readiness(),
+    }
+
+
 @api_router.get("/redis/controlvalues")
 async def redis_get(request: Request) -> list[KeyValue]:
     redis_client: Redis = request.app.state.redis_client
@@ -189,7 +203,7 @@ async def get_current_channel_event(
         )
         if not event:
             historical: HistoricalPoller = request.app.state.historical
-            if await historical.is_busy():
+            if await historical.is_busy(location, camera):
                 raise HTTPException(423, "Historical data is being processed")
             event = await historical.get_most_recent_event(location, camera, channel)
     return event
@@ -243,7 +257,7 @@ async def get_specific_channel_event(
     if not has_ext:
         # There is no file extension given, so we need to establish it
         # by looking it up in the bucket
-        s3_client: S3Client = request.app.state.s3_clients[location_name]
+        s3_client: S3Client | AioS3Client = request.app.state.s3_clients[location_name]
         if not s3_client:
             raise HTTPException(status_code=404, detail="Location not found.")
         # Check if the key exists in the bucket
@@ -288,28 +302,22 @@ async def get_night_report_for_date(
 
     day_obs = date_validation(date_str)
 
-    historical: HistoricalPoller = request.app.state.historical
-    if await historical.is_busy():
-        raise HTTPException(423, "Historical data is being processed")
-
-    nr = await historical.get_night_report_payload(location, camera, day_obs)
-    return nr
+    return await get_night_report_for_day(location, camera, day_obs, request)
 
 
 @api_router.get("/{location_name}/{camera_name}/metadata/{date_str}")
 async def get_metadata_for_date(
     location_name: str, camera_name: str, date_str: str, request: Request
 ) -> dict:
-
-    historical: HistoricalPoller = request.app.state.historical
-    if await historical.is_busy():
-        raise HTTPException(423, "Historical data is being processed")
-
     location, camera = await get_location_camera(location_name, camera_name, request)
     if not camera.online:
         raise HTTPException(status_code=404, detail="Camera not found.")
 
     day_obs = date_validation(date_str)
 
+    historical: HistoricalPoller = request.app.state.historical
+    if await historical.is_busy(location, camera, day_obs):
+        raise HTTPException(423, "Historical data is being processed")
+
     metadata = await historical.get_metadata_for_date(location, camera, day_obs)
     return metadata
@@ -72,7 +72,7 @@ async def get_most_recent_historical_day(
 ) -> date | None:
     """Get the most recent historical day for a camera."""
     historical: HistoricalPoller = connection.app.state.historical
-    if await historical.is_busy():
+    if await historical.is_busy(location, camera):
         raise HTTPException(423, "Historical data is being processed")
     day_obs = await historical.get_most_recent_day(location, camera)
     if not day_obs:
@@ -88,7 +88,7 @@ async def get_camera_events_for_date(
 ) -> CameraPageData:
     """Get the camera events for a particular date."""
     historical: HistoricalPoller = connection.app.state.historical
-    if await historical.is_busy():
+    if await historical.is_busy(location, camera, day_obs):
         raise HTTPException(423, "Historical data is being processed")
     channel_data = await historical.get_channel_data_for_date(location, camera, day_obs)
     metadata = await historical.get_metadata_for_date(location, camera, day_obs)
@@ -103,6 +103,16 @@ async def get_camera_events_for_date(
     )
 
 
+async def get_night_report_for_day(
+    location: Location, camera: Camera, day_obs: date, connection: HTTPConnection
+) -> NightReport:
+    """Get the night report for a camera for a particular date."""
+    historical: HistoricalPoller = connection.app.state.historical
+    if await historical.is_busy(location, camera, day_obs):
+        raise HTTPException(423, "Historical data is being processed")
+    return await historical.get_night_report_payload(location, camera, day_obs)
+
+
 async def get_camera_calendar(
     location: Location, camera: Camera, request: Request
 ) -> dict[int, dict[int, dict[int, int]]]:
@@ -152,7 +162,7 @@ async def get_prev_next_event(
         nxt, prv = await cp.get_next_prev_event(location.name, event)
     else:
         hp: HistoricalPoller = request.app.state.historical
-        if await hp.is_busy():
+        if await hp.is_busy(location, camera, day_obs):
             raise HTTPException(423, "Historical data is being processed")
         nxt, prv = await hp.get_next_prev_event(location, camera, event)
     return {"next": nxt, "prev": prv}
@@ -170,7 +180,7 @@ def date_validation(date_str: str) -> date:
 async def get_all_channel_names_for_date_seq_num(
     location: Location,
     camera: Camera,
-    day_obs: date,
+    day_obs: str,
     seq_num: int,
     connection: HTTPConnection,
 ) -> list[str]:
@@ -182,12 +192,6 @@ async def get_all_channel_names_for_date_seq_num(
         )
         return channel_data
     historical: HistoricalPoller = connection.app.state.historical
-    channel_data, _ = await try_historical_call(
-        historical.get_all_channel_names_for_date_and_seq_num,
-        [],
-        location,
-        camera,
-        day_obs,
-        seq_num,
+    return await historical.get_all_channel_names_for_date_and_seq_num(
+        location, camera, day_obs, seq_num
     )
-    return channel_data
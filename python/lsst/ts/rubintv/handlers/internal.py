@@ -11,12 +11,23 @@ or other information that should not be visible outside the Kubernetes cluster.
 from datetime import datetime
 from json import JSONDecodeError
 
-from fastapi import APIRouter, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.handlers.websockets_clients import (
+    get_client_queue_stats,
+    subscriptions,
+)
+from lsst.ts.rubintv.s3_connection_pool import get_s3_pool_stats
 
 from ..models.models import Heartbeat, Metadata
 
-__all__ = ["get_index", "internal_router"]
+__all__ = ["get_index", "get_stats", "internal_router"]
 
 logger = rubintv_logger()
 internal_router = APIRouter()
@@ -45,6 +56,27 @@ async def get_index() -> Metadata:
     return Metadata()
 
 
+@internal_router.get(
+    "/stats",
+    description="Return counters from the app's pollers and S3 clients.",
+    include_in_schema=False,
+    summary="Application statistics",
+)
+async def get_stats(request: Request) -> dict[str, dict]:
+    """GET ``/stats``, internal counters for monitoring."""
+    stats: dict[str, dict] = {
+        "s3_pool": get_s3_pool_stats(),
+        "websocket_queues": get_client_queue_stats(),
+        "subscriptions": subscriptions.stats(),
+    }
+    if current_poller := getattr(request.app.state, "current_poller", None):
+        stats["current_poller"] = current_poller.get_stats()
+    if historical := getattr(request.app.state, "historical", None):
+        stats["historical_cache"] = historical.get_cache_stats()
+        stats["historical_downloads"] = historical.get_download_stats()
+    return stats
+
+
 """
 Structure of internal message json:
 {
@@ -9,7 +9,6 @@ from lsst.ts.rubintv.handlers.api import (
     get_current_channel_event,
     get_location,
     get_location_camera,
-    get_night_report_for_date,
     get_specific_channel_event,
 )
 from lsst.ts.rubintv.handlers.handlers_helpers import (
@@ -21,6 +20,7 @@ from lsst.ts.rubintv.handlers.handlers_helpers import (
     get_current_night_report_payload,
     get_latest_metadata,
     get_most_recent_historical_day,
+    get_night_report_for_day,
     get_prev_next_event,
     try_historical_call,
 )
@@ -359,11 +359,11 @@ async def get_historical_night_report_page(
 
     night_report: NightReport
     night_report, historical_busy = await try_historical_call(
-        get_night_report_for_date,
-        location_name=location_name,
-        camera_name=camera_name,
-        date_str=date_str,
-        request=request,
+        get_night_report_for_day,
+        location=location,
+        camera=camera,
+        day_obs=day_obs,
+        connection=request,
         # default return is empty night report
         is_busy_default=NightReport(),
     )
@@ -452,11 +452,13 @@ async def get_specific_channel_event_page(
     channel_title = ""
     event_detail = ""
     next_prev: dict[str, str] = {}
+    historical_busy = False
     if event:
         event_detail = f"{event.day_obs}/${event.seq_num}"
         channel = find_first(camera.channels, "name", event.channel_name)
     if channel:
         channel_title = channel.title
+        # busy only if the event's camera's data for its day isn't ready
         next_prev, historical_busy = await try_historical_call(
             get_prev_next_event,
             location=location,
@@ -3,6 +3,7 @@ from typing import Any
 from fastapi import Request
 
 from ..config import rubintv_logger
+from ..models.models import Event
 
 logger = rubintv_logger()
 
@@ -20,6 +21,8 @@ def build_title(*title_parts: str) -> str:
 def to_dict(object: Any | None) -> dict | None:
     if object is None:
         return None
+    if isinstance(object, Event):
+        return object.to_dict()
     return object.__dict__
 
 
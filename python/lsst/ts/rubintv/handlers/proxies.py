@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from lsst.ts.rubintv.aio_s3client import AioS3Client
 from lsst.ts.rubintv.config import rubintv_logger
 from lsst.ts.rubintv.s3client import S3Client
 
@@ -12,7 +13,7 @@ logger = rubintv_logger()
     response_class=StreamingResponse,
     name="event_image",
 )
-def proxy_image(
+async def proxy_image(
     location_name: str,
     camera_name: str,
     channel_name: str,
@@ -29,11 +30,11 @@ def proxy_image(
     key = f"{camera_name}/{date_str}/{channel_name}/{seq_str}/{filename}"
 
     try:
-        s3_client: S3Client = request.app.state.s3_clients[location_name]
+        s3_client: S3Client | AioS3Client = request.app.state.s3_clients[location_name]
     except KeyError:
         raise HTTPException(404, "Location not found")
 
-    data_stream = s3_client.get_raw_object(key)
+    data_stream = await s3_client.async_get_raw_object(key)
     return StreamingResponse(content=data_stream.iter_chunks())
 
 
@@ -42,7 +43,7 @@ def proxy_image(
     response_class=StreamingResponse,
     name="plot_image",
 )
-def proxy_plot_image(
+async def proxy_plot_image(
     location_name: str,
     camera_name: str,
     group_name: str,
@@ -60,10 +61,10 @@ def proxy_plot_image(
         raise HTTPException(404, "Filename not valid.")
     key = f"{camera_name}/{date_str}/night_report/{group_name}/{filename}"
     try:
-        s3_client: S3Client = request.app.state.s3_clients[location_name]
+        s3_client: S3Client | AioS3Client = request.app.state.s3_clients[location_name]
     except KeyError:
         raise HTTPException(404, "Location not found.")
-    data_stream = s3_client.get_raw_object(key)
+    data_stream = await s3_client.async_get_raw_object(key)
     return StreamingResponse(content=data_stream.iter_chunks())
 
 
@@ -72,7 +73,7 @@ def proxy_plot_image(
     response_class=StreamingResponse,
     name="event_video",
 )
-def proxy_video(
+async def proxy_video(
     location_name: str,
     camera_name: str,
     channel_name: str,
@@ -91,7 +92,7 @@ def proxy_video(
     key = f"{camera_name}/{date_str}/{channel_name}/{seq_str}/{filename}"
 
     try:
-        s3_client: S3Client = request.app.state.s3_clients[location_name]
+        s3_client: S3Client | AioS3Client = request.app.state.s3_clients[location_name]
     except KeyError:
         raise HTTPException(404, "Location not found.")
 
@@ -101,7 +102,7 @@ def proxy_video(
         byte_range = range.split("=")[1]
         s3_request_headers["Range"] = f"bytes={byte_range}"
 
-    data = s3_client.get_movie(key, s3_request_headers)
+    data = await s3_client.async_get_movie(key, s3_request_headers)
     if "Body" in data and "ResponseMetadata" in data:
         video = data["Body"]
         headers = data["ResponseMetadata"]["HTTPHeaders"]
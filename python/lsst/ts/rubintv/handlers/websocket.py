@@ -2,22 +2,27 @@ import json
 import re
 import traceback
 import uuid
+from datetime import date
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from lsst.ts.rubintv.background.currentpoller import CurrentPoller
 from lsst.ts.rubintv.config import rubintv_logger
-from lsst.ts.rubintv.handlers.websocket_notifiers import send_notification
+from lsst.ts.rubintv.handlers.websocket_notifiers import (
+    remove_client_from_services,
+    send_notification,
+)
 from lsst.ts.rubintv.handlers.websockets_clients import (
+    ClientSendQueue,
+    client_queues,
     clients,
     clients_lock,
-    services_clients,
-    services_lock,
+    subscriptions,
     websocket_to_client,
 )
 from lsst.ts.rubintv.models.models import Camera, Location
 from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
 from lsst.ts.rubintv.models.models import ServiceTypes as Service
-from lsst.ts.rubintv.models.models_helpers import find_first
+from lsst.ts.rubintv.models.models_helpers import date_str_to_date, find_first
 
 data_ws_router = APIRouter()
 logger = rubintv_logger()
@@ -29,14 +34,15 @@ valid_services = [Service.value for Service in Service]
 async def data_websocket(
     websocket: WebSocket,
 ) -> None:
+    client_id = uuid.uuid4()
     try:
         await websocket.accept()
-        client_id = uuid.uuid4()
         await websocket.send_text(str(client_id))
 
         async with clients_lock:
             clients[client_id] = websocket
             websocket_to_client[websocket] = client_id
+            client_queues[client_id] = ClientSendQueue(websocket)
             logger.info("Num clients:", num_clients=len(clients))
 
         while True:
@@ -51,18 +57,15 @@ async def data_websocket(
                 service_loc_cam = data["message"]
                 logger.info("Attaching:", id=r_client_id, service=service_loc_cam)
                 await attach_service(r_client_id, service_loc_cam, websocket)
+            elif "resync" in data:
+                service_loc_cam = data["resync"]
+                logger.info("Resyncing:", id=r_client_id, service=service_loc_cam)
+                await resync_service(r_client_id, service_loc_cam, websocket)
             else:
                 logger.warn("No message:", client_id=r_client_id, data=data)
 
     except WebSocketDisconnect:
-        async with clients_lock:
-            if websocket in websocket_to_client:
-                client_id = websocket_to_client[websocket]
-                logger.info("Unattaching:", client_id=client_id)
-                del clients[client_id]
-                del websocket_to_client[websocket]
-                logger.info("Num clients:", num_clients=len(clients))
-                await remove_client_from_services(client_id)
+        logger.info("Unattaching:", client_id=client_id)
     except Exception as e:
         # Catch all exceptions to prevent the websocket from crashing
         logger.error(
@@ -70,6 +73,9 @@ async def data_websocket(
             error=e,
             traceback=traceback.format_exc(),
         )
+    finally:
+        await remove_client_from_services(client_id)
+        logger.info("Num clients:", num_clients=len(clients))
 
 
 async def validate_raw_message(raw: str) -> tuple[uuid.UUID, dict] | None:
@@ -85,32 +91,14 @@ async def validate_raw_message(raw: str) -> tuple[uuid.UUID, dict] | None:
     return r_client_id, data
 
 
-async def remove_client_from_services(client_id: uuid.UUID) -> None:
-    logger.info("Removing client from services list...", client_id=client_id)
-    async with services_lock:
-        # First remove the client_id from all services
-        for _, client_ids in services_clients.items():
-            if client_id in client_ids:
-                client_ids.remove(client_id)
-
-        # Then collect the services that have no more associated client IDs
-        services_to_remove = [
-            service
-            for service, client_ids in services_clients.items()
-            if not client_ids
-        ]
-
-        # Finally, delete those services
-        for service in services_to_remove:
-            del services_clients[service]
-    logger.info("Removed client.")
-
-
 async def attach_simple_service(
     client_id: uuid.UUID,
     websocket: WebSocket,
     service: Service,
     message_type: MessageType,
+    location: Location | None = None,
+    camera: Camera | None = None,
+    day_obs: date | None = None,
 ) -> None:
     """Attach a client to a simple service that just needs initial state
     notification.
@@ -125,20 +113,21 @@ async def attach_simple_service(
         The service type (e.g. HISTORICALSTATUS, DETECTORS)
     message_type : MessageType
         The type of message to send
-    service_key : str
-        The key to use for storing in services_clients
+    location : Location | None
+        For historicalStatus, the location of the camera the client's page
+        is for, if any.
+    camera : Camera | None
+        For historicalStatus, the camera the client's page is for.
+    day_obs : date | None
+        For historicalStatus, the date the client's page is for.
     """
-    # Register client for this service
-    service_key = service.value
-    async with services_lock:
-        if service_key not in services_clients:
-            services_clients[service_key] = [client_id]
-        else:
-            services_clients[service_key].append(client_id)
+    subscriptions.attach(client_id, service.value)
 
     payload = None
     if service == Service.HISTORICALSTATUS:
-        payload = await websocket.app.state.historical.is_busy()
+        payload = await websocket.app.state.historical.is_busy(
+            location, camera, day_obs
+        )
     elif service == Service.DETECTORS:
         if hasattr(websocket.app.state, "redis_subscriber"):
             payload = await websocket.app.state.redis_subscriber.get_current_state()
@@ -149,6 +138,14 @@ async def attach_simple_service(
             message_type,
             payload,
         )
+    if service == Service.HISTORICALSTATUS:
+        # so that pages can tell straight away if their camera is ready
+        await send_notification(
+            websocket,
+            service,
+            MessageType.HISTORICAL_READINESS,
+            websocket.app.state.historical.get_readiness(),
+        )
 
 
 async def attach_service(
@@ -159,6 +156,8 @@ async def attach_service(
     "ServiceName Location/Camera[/Channel]".
     If the service is historicalStatus or detectors, it will attach
     to a simple service that just needs initial state notification.
+    historicalStatus may be followed by "Location/Camera[/Date]", for the
+    initial state to be for that camera and date.
 
     Parameters
     ----------
@@ -170,6 +169,11 @@ async def attach_service(
     websocket : WebSocket
         The websocket connection
     """
+    service_str, _, page_id = full_service_name.partition(" ")
+    if service_str == "historicalStatus" and page_id:
+        await attach_historical_status(client_id, page_id, websocket)
+        return
+
     match full_service_name:
         case "historicalStatus":
             await attach_simple_service(
@@ -235,11 +239,7 @@ async def attach_service(
 
     await notify_new_client(websocket, location, camera, channel_name, service)
 
-    async with services_lock:
-        if full_service_name in services_clients:
-            services_clients[full_service_name].append(client_id)
-        else:
-            services_clients[full_service_name] = [client_id]
+    subscriptions.attach(client_id, full_service_name)
 
     # If registering a service with location and camera and channel,
     # also register a service with just location and camera.
@@ -248,11 +248,83 @@ async def attach_service(
 
     loc_cam_service = f"{service_str} {location_name}/{camera_name}"
 
-    async with services_lock:
-        if loc_cam_service in services_clients:
-            services_clients[loc_cam_service].append(client_id)
-        else:
-            services_clients[loc_cam_service] = [client_id]
+    subscriptions.attach(client_id, loc_cam_service)
+
+
+async def attach_historical_status(
+    client_id: uuid.UUID, page_id: str, websocket: WebSocket
+) -> None:
+    """Attach a client to the historical status service, telling it first
+    whether the data for the camera and date its page is for is ready.
+
+    Parameters
+    ----------
+    client_id : uuid.UUID
+        The ID of the client to attach
+    page_id : str
+        The page's "Location/Camera[/Date]", with the date as YYYY-MM-DD.
+    websocket : WebSocket
+        The websocket connection
+    """
+    location_name, _, rest = page_id.partition("/")
+    camera_name, _, date_str = rest.partition("/")
+    locations = websocket.app.state.models.locations
+    camera = await is_valid_location_camera(location_name, camera_name, locations)
+    location = find_first(locations, "name", location_name)
+    if not camera or not location:
+        logger.error("No such camera:", client_id=client_id, camera=page_id)
+        return
+    day_obs = None
+    if date_str:
+        try:
+            day_obs = date_str_to_date(date_str)
+        except ValueError:
+            # tell the client about the camera's most recent days instead
+            logger.warn("Bad date:", client_id=client_id, date=date_str)
+    await attach_simple_service(
+        client_id,
+        websocket,
+        Service.HISTORICALSTATUS,
+        MessageType.HISTORICAL_STATUS,
+        location,
+        camera,
+        day_obs,
+    )
+
+
+async def resync_service(
+    client_id: uuid.UUID, full_service_name: str, websocket: WebSocket
+) -> None:
+    """Resend the current state of a service the client is attached to.
+
+    Clients ask for this when they receive a patch whose version doesn't
+    follow on from the data they hold.
+
+    Parameters
+    ----------
+    client_id : uuid.UUID
+        The ID of the client
+    full_service_name : str
+        The full service name in the format
+        "ServiceName Location/Camera[/Channel]"
+    websocket : WebSocket
+        The websocket connection
+    """
+    if not subscriptions.is_attached(client_id, full_service_name):
+        logger.warn(
+            "Resync for unattached service:",
+            service=full_service_name,
+            client_id=client_id,
+        )
+        return
+    # the service name was validated when the client attached
+    service_str, full_location = full_service_name.split(" ")
+    service = Service[service_str.upper()]
+    location_name, camera_name, *extra = full_location.split("/")
+    location = find_first(websocket.app.state.models.locations, "name", location_name)
+    camera = find_first(location.cameras, "name", camera_name)
+    channel_name = extra[0] if extra else ""
+    await notify_new_client(websocket, location, camera, channel_name, service)
 
 
 async def is_valid_client_request(data: dict) -> bool:
@@ -301,4 +373,9 @@ async def notify_new_client(
     async for message_type, data in current_poller.get_latest_data(
         location, camera, channel_name, service
     ):
-        await send_notification(websocket, service, message_type, data)
+        version = current_poller.get_data_version(location.name, camera, message_type)
+        loc_cam = "/".join(filter(None, (location.name, camera.name, channel_name)))
+        topic = f"{service.value} {loc_cam} {message_type.value}"
+        await send_notification(
+            websocket, service, message_type, data, version, topic, loc_cam
+        )
@@ -10,10 +10,10 @@ import structlog
 from fastapi import WebSocket
 from lsst.ts.rubintv.config import rubintv_logger
 from lsst.ts.rubintv.handlers.websockets_clients import (
+    client_queues,
     clients,
     clients_lock,
-    services_clients,
-    services_lock,
+    subscriptions,
     websocket_to_client,
 )
 from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
@@ -22,13 +22,23 @@ from lsst.ts.rubintv.models.models import get_current_day_obs
 
 logger: structlog.stdlib.BoundLogger = rubintv_logger()
 
+# Payloads larger than this, in bytes of JSON, are compressed off the loop.
+OFF_LOOP_COMPRESS_SIZE = 64 * 1024
+
 
 async def notify_ws_clients(
-    service: Service, message_type: MessageType, loc_cam: str, payload: Any
+    service: Service,
+    message_type: MessageType,
+    loc_cam: str,
+    payload: Any,
+    version: int | None = None,
 ) -> None:
     service_loc_cam_chan = " ".join([service.value, loc_cam])
     to_notify = await get_clients_to_notify(service_loc_cam_chan)
-    await notify_clients(to_notify, service, message_type, payload)
+    topic = f"{service_loc_cam_chan} {message_type.value}"
+    await notify_clients(
+        to_notify, service, message_type, payload, version, topic, loc_cam
+    )
 
 
 async def notify_clients(
@@ -36,71 +46,206 @@ async def notify_clients(
     service: Service,
     message_type: MessageType,
     payload: Mapping,
+    version: int | None = None,
+    topic: str | None = None,
+    loc_cam: str | None = None,
 ) -> None:
-    tasks = []
     async with clients_lock:
-        for client_id in clients_list:
-            if client_id in clients:
-                websocket = clients[client_id]
-                task = asyncio.create_task(
-                    send_notification(websocket, service, message_type, payload)
-                )
-                tasks.append(task)
+        websockets = [clients[c_id] for c_id in clients_list if c_id in clients]
+    await send_to_websockets(
+        websockets, service, message_type, payload, version, topic, loc_cam
+    )
+
+
+async def send_to_websockets(
+    websockets: list[WebSocket],
+    service: Service,
+    message_type: MessageType,
+    payload: Any,
+    version: int | None = None,
+    topic: str | None = None,
+    loc_cam: str | None = None,
+) -> None:
+    """Encode a message once and send it to each of the websockets.
+
+    Parameters
+    ----------
+    websockets : `list` [`WebSocket`]
+        The clients' websockets.
+    service : `Service`
+        The service the message is for.
+    message_type : `MessageType`
+        The type of the message.
+    payload : `Any`
+        JSON serializable data.
+    version : `int` | `None`
+        The version of the data, if it's versioned.
+    topic : `str` | `None`
+        Identifies the data the message is about, for coalescing queued
+        messages. Defaults to the service and message type.
+    loc_cam : `str` | `None`
+        The ``"{location}/{camera}[/{channel}]"`` the data is for, if any.
+    """
+    if not websockets:
+        return
+    if topic is None:
+        topic = f"{service.value} {message_type.value}"
+    frame = await encode_notification(service, message_type, payload, version, loc_cam)
+    tasks = [send_frame(websocket, frame, service, topic) for websocket in websockets]
     # `return_exceptions=True` prevents one failed task from affecting others
     await asyncio.gather(*tasks, return_exceptions=True)
 
 
-async def send_notification(
-    websocket: WebSocket,
+def _compress_and_encode(payload_string: str) -> str:
+    zipped = gzip.compress(bytes(payload_string, "utf-8"))
+    return base64.b64encode(zipped).decode("utf-8")
+
+
+async def encode_notification(
     service: Service,
     messageType: MessageType,
     payload: Any,
-) -> None:
+    version: int | None = None,
+    loc_cam: str | None = None,
+) -> str:
+    """Encode a message as the text frame sent to websocket clients.
+
+    The payload is sent as base64-encoded, gzipped JSON. Data that can be
+    patched, i.e. camera tables and metadata, carries a version number that
+    increases by one with each full message or patch, so that clients can
+    tell when they've missed a patch and need to ask for a resync. As a
+    client may hold the data of more than one camera for a service, the
+    message also says which location and camera it's for, so that versions
+    are followed, and resyncs asked for, per camera.
+
+    The payload is serialized on the event loop, as it may be modified once
+    control returns to it, but payloads larger than
+    ``OFF_LOOP_COMPRESS_SIZE`` are compressed in a worker thread.
+
+    Parameters
+    ----------
+    service : `Service`
+        The service the message is for.
+    messageType : `MessageType`
+        The type of the message.
+    payload : `Any`
+        JSON serializable data.
+    version : `int` | `None`
+        The version of the data, if it's versioned.
+    loc_cam : `str` | `None`
+        The ``"{location}/{camera}[/{channel}]"`` the data is for, if any.
+
+    Returns
+    -------
+    `str`
+        The JSON message.
+    """
     logger.debug(
-        "Sending websocket notification",
+        "Encoding websocket notification",
         service=service.value,
         messageType=messageType.value,
-        payload=payload,
     )
     start_time = time.time()
     datestamp = get_current_day_obs().isoformat()
 
-    try:
-        payload_string = json.dumps(payload)
-        zipped = gzip.compress(bytes(payload_string, "utf-8"))
-        encoded = base64.b64encode(zipped).decode("utf-8")
-
-        message = {
-            "service": service.value,
-            "dataType": messageType.value,
-            "payload": encoded,
-            "datestamp": datestamp,
-        }
-
-        await websocket.send_json(message)
-
-        process_time = time.time() - start_time
-        if process_time > 0.1:  # Log slow operations
-            logger.warning(
-                "Slow websocket notification",
-                process_time=process_time,
-                payload_size=len(payload_string),
-                service=service.value,
-            )
+    payload_string = json.dumps(payload)
+    if len(payload_string) > OFF_LOOP_COMPRESS_SIZE:
+        encoded = await asyncio.to_thread(_compress_and_encode, payload_string)
+    else:
+        encoded = _compress_and_encode(payload_string)
+
+    message: dict[str, str | int] = {
+        "service": service.value,
+        "dataType": messageType.value,
+        "payload": encoded,
+        "datestamp": datestamp,
+    }
+    if version is not None:
+        message["version"] = version
+    if loc_cam is not None:
+        message["locCam"] = loc_cam
+
+    process_time = time.time() - start_time
+    if process_time > 0.1:  # Log slow operations
+        logger.warning(
+            "Slow websocket notification",
+            process_time=process_time,
+            payload_size=len(payload_string),
+            service=service.value,
+        )
+    return json.dumps(message)
+
 
+async def send_frame(
+    websocket: WebSocket, frame: str, service: Service, topic: str
+) -> None:
+    """Queue an encoded message for a client or, if the client has no send
+    queue, send it directly, removing the client if the send fails.
+    """
+    client_id = websocket_to_client.get(websocket)
+    queue = client_queues.get(client_id) if client_id is not None else None
+    if queue is not None:
+        queue.put(topic, frame)
+        return
+    try:
+        await websocket.send_text(frame)
     except Exception as e:
         logger.warning(
             "Failed to send notification",
             error=str(e),
             service=service.value,
-            payload_size=len(str(payload)) if payload else 0,
+            payload_size=len(frame),
         )
         await remove_client_from_services(websocket_to_client.get(websocket, None))
 
 
+async def send_notification(
+    websocket: WebSocket,
+    service: Service,
+    messageType: MessageType,
+    payload: Any,
+    version: int | None = None,
+    topic: str | None = None,
+    loc_cam: str | None = None,
+) -> None:
+    """Send a message to a single websocket client.
+
+    Parameters
+    ----------
+    websocket : `WebSocket`
+        The client's websocket.
+    service : `Service`
+        The service the message is for.
+    messageType : `MessageType`
+        The type of the message.
+    payload : `Any`
+        JSON serializable data.
+    version : `int` | `None`
+        The version of the data, if it's versioned.
+    topic : `str` | `None`
+        Identifies the data the message is about, for coalescing queued
+        messages. Defaults to the service and message type.
+    loc_cam : `str` | `None`
+        The ``"{location}/{camera}[/{channel}]"`` the data is for, if any.
+    """
+    if topic is None:
+        topic = f"{service.value} {messageType.value}"
+    try:
+        frame = await encode_notification(
+            service, messageType, payload, version, loc_cam
+        )
+    except Exception as e:
+        logger.warning(
+            "Failed to encode notification", error=str(e), service=service.value
+        )
+        return
+    await send_frame(websocket, frame, service, topic)
+
+
 async def remove_client_from_services(client_id: UUID | None) -> None:
-    """Remove a client from all services it is subscribed to, clean up empty
-    services and remove the client from the clients dictionary.
+    """Remove a client from all services it is subscribed to, remove it from
+    the clients dictionary and close its send queue.
+
     Parameters
     ----------
     client_id : `UUID` | `None`
@@ -108,49 +253,27 @@ async def remove_client_from_services(client_id: UUID | None) -> None:
     """
     if client_id is None:
         return
-    async with services_lock:
-        for service, clients_set in services_clients.items():
-            if client_id in clients_set:
-                clients_set.remove(client_id)
-                logger.info(
-                    "Removed client from service",
-                    service=service,
-                    client_id=client_id,
-                )
-        # Remove empty services
-        services_clients.update(
-            {
-                service: clients_set
-                for service, clients_set in services_clients.items()
-                if clients_set
-            }
-        )
+    for topic in subscriptions.detach_client(client_id):
+        logger.info("Removed client from service", service=topic, client_id=client_id)
 
     async with clients_lock:
-        if client_id in clients:
-            websocket = clients[client_id]
-            del clients[client_id]
-            del websocket_to_client[websocket]
+        if (websocket := clients.pop(client_id, None)) is not None:
+            websocket_to_client.pop(websocket, None)
+    if (queue := client_queues.pop(client_id, None)) is not None:
+        await queue.close()
 
 
 async def get_clients_to_notify(service_cam_id: str) -> list[UUID]:
-    async with services_lock:
-        to_notify = []
-        if service_cam_id in services_clients:
-            for client_id in services_clients[service_cam_id]:
-                to_notify.append(client_id)
-    return to_notify
+    return list(subscriptions.clients_for(service_cam_id))
 
 
 async def notify_all_status_change(historical_busy: bool) -> None:
     service = Service.HISTORICALSTATUS
     messageType = MessageType.HISTORICAL_STATUS
     key = service.value
-    tasks = []
-    async with services_lock:
-        if key not in services_clients:
-            return
-        client_ids = services_clients[key]
+    client_ids = subscriptions.clients_for(key)
+    if not client_ids:
+        return
 
     # Gather websockets for the clients
     async with clients_lock:
@@ -158,13 +281,56 @@ async def notify_all_status_change(historical_busy: bool) -> None:
             clients[client_id] for client_id in client_ids if client_id in clients
         ]
 
-    # Prepare tasks for each websocket
-    for websocket in websockets:
-        task = send_notification(websocket, service, messageType, historical_busy)
-        tasks.append(task)
+    await send_to_websockets(websockets, service, messageType, historical_busy)
 
-    # Use asyncio.gather to handle all tasks concurrently
-    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def notify_historical_progress(progress: dict[str, int]) -> None:
+    """Notify clients subscribed to the historical status of the progress of
+    a reload. The current historical data is served until it completes.
+
+    Parameters
+    ----------
+    progress : `dict` [`str`, `int`]
+        The number of locations reloaded, ``"done"``, of ``"total"``.
+    """
+    service = Service.HISTORICALSTATUS
+    client_ids = subscriptions.clients_for(service.value)
+    if not client_ids:
+        return
+
+    async with clients_lock:
+        websockets = [
+            clients[client_id] for client_id in client_ids if client_id in clients
+        ]
+
+    await send_to_websockets(
+        websockets, service, MessageType.HISTORICAL_PROGRESS, progress
+    )
+
+
+async def notify_historical_readiness(readiness: dict[str, str]) -> None:
+    """Notify clients subscribed to the historical status of the readiness of
+    each camera's historical data.
+
+    Parameters
+    ----------
+    readiness : `dict` [`str`, `str`]
+        ``"loading"``, ``"recent"`` or ``"complete"``, keyed by
+        ``"{location}/{camera}"``.
+    """
+    service = Service.HISTORICALSTATUS
+    client_ids = subscriptions.clients_for(service.value)
+    if not client_ids:
+        return
+
+    async with clients_lock:
+        websockets = [
+            clients[client_id] for client_id in client_ids if client_id in clients
+        ]
+
+    await send_to_websockets(
+        websockets, service, MessageType.HISTORICAL_READINESS, readiness
+    )
 
 
 async def notify_redis_detector_status(data: dict) -> None:
@@ -182,12 +348,10 @@ async def notify_redis_detector_status(data: dict) -> None:
     service = Service.DETECTORS
     message_type = MessageType.DETECTOR_STATUS
     key = service.value
-    tasks = []
 
-    async with services_lock:
-        if key not in services_clients:
-            return
-        client_ids = services_clients[key]
+    client_ids = subscriptions.clients_for(key)
+    if not client_ids:
+        return
 
     # Gather websockets for the clients
     async with clients_lock:
@@ -195,13 +359,7 @@ async def notify_redis_detector_status(data: dict) -> None:
             clients[client_id] for client_id in client_ids if client_id in clients
         ]
 
-    # Prepare tasks for each websocket
-    for websocket in websockets:
-        task = send_notification(websocket, service, message_type, data)
-        tasks.append(task)
-
-    # Use asyncio.gather to handle all tasks concurrently
-    await asyncio.gather(*tasks, return_exceptions=True)
+    await send_to_websockets(websockets, service, message_type, data)
 
 
 async def notify_controls_readback_change(data: dict) -> None:
@@ -218,12 +376,10 @@ async def notify_controls_readback_change(data: dict) -> None:
     service = Service.ADMIN
     message_type = MessageType.CONTROL_READBACK_CHANGE
     key = service.value
-    tasks = []
 
-    async with services_lock:
-        if key not in services_clients:
-            return
-        client_ids = services_clients[key]
+    client_ids = subscriptions.clients_for(key)
+    if not client_ids:
+        return
 
     # Gather websockets for the clients
     async with clients_lock:
@@ -231,10 +387,4 @@ async def notify_controls_readback_change(data: dict) -> None:
             clients[client_id] for client_id in client_ids if client_id in clients
         ]
 
-    # Prepare tasks for each websocket
-    for websocket in websockets:
-        task = send_notification(websocket, service, message_type, data)
-        tasks.append(task)
-
-    # Use asyncio.gather to handle all tasks concurrently
-    await asyncio.gather(*tasks, return_exceptions=True)
+    await send_to_websockets(websockets, service, message_type, data)
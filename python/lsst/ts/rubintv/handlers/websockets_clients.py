@@ -1,15 +1,227 @@
 import asyncio
 import uuid
+from collections import deque
 
 from fastapi import WebSocket
+from lsst.ts.rubintv.config import config, rubintv_logger
+
+logger = rubintv_logger()
 
 # keyed by websocket
 clients: dict[uuid.UUID, WebSocket] = {}
 websocket_to_client: dict[WebSocket, uuid.UUID] = {}
-# keyed by service_id
-services_clients: dict[str, list[uuid.UUID]] = {}
 clients_lock = asyncio.Lock()
-services_lock = asyncio.Lock()
 
 heartbeat_clients: dict[WebSocket, uuid.UUID] = {}
 heartbeat_lock = asyncio.Lock()
+
+
+class SubscriptionRegistry:
+    """Which clients are subscribed to which topics.
+
+    A topic is a service name, optionally followed by a location/camera
+    [/channel], e.g. ``"camera summit/auxtel"``. Subscriptions are held as
+    sets per topic, with a reverse index of each client's topics, so that
+    attaching, detaching and looking up are all constant time and removing
+    a client only touches the topics it's subscribed to.
+
+    None of the methods await, so they're safe to call from coroutines
+    without a lock.
+    """
+
+    def __init__(self) -> None:
+        self._topic_clients: dict[str, set[uuid.UUID]] = {}
+        self._client_topics: dict[uuid.UUID, set[str]] = {}
+
+    def attach(self, client_id: uuid.UUID, topic: str) -> bool:
+        """Subscribe a client to a topic.
+
+        Returns
+        -------
+        `bool`
+            False if the client was already subscribed.
+        """
+        topic_clients = self._topic_clients.setdefault(topic, set())
+        if client_id in topic_clients:
+            return False
+        topic_clients.add(client_id)
+        self._client_topics.setdefault(client_id, set()).add(topic)
+        return True
+
+    def detach(self, client_id: uuid.UUID, topic: str) -> None:
+        """Unsubscribe a client from a topic, if it's subscribed."""
+        if (topic_clients := self._topic_clients.get(topic)) is not None:
+            topic_clients.discard(client_id)
+            if not topic_clients:
+                del self._topic_clients[topic]
+        if (client_topics := self._client_topics.get(client_id)) is not None:
+            client_topics.discard(topic)
+            if not client_topics:
+                del self._client_topics[client_id]
+
+    def detach_client(self, client_id: uuid.UUID) -> set[str]:
+        """Unsubscribe a client from all of its topics.
+
+        Returns
+        -------
+        `set` [`str`]
+            The topics the client was subscribed to.
+        """
+        topics = self._client_topics.pop(client_id, set())
+        for topic in topics:
+            topic_clients = self._topic_clients[topic]
+            topic_clients.discard(client_id)
+            if not topic_clients:
+                del self._topic_clients[topic]
+        return topics
+
+    def clients_for(self, topic: str) -> frozenset[uuid.UUID]:
+        """Return the clients subscribed to a topic.
+
+        A copy is returned, so it can be iterated over across awaits.
+        """
+        return frozenset(self._topic_clients.get(topic, ()))
+
+    def topics_for(self, client_id: uuid.UUID) -> frozenset[str]:
+        """Return the topics a client is subscribed to."""
+        return frozenset(self._client_topics.get(client_id, ()))
+
+    def is_attached(self, client_id: uuid.UUID, topic: str) -> bool:
+        return client_id in self._topic_clients.get(topic, ())
+
+    def clear(self) -> None:
+        self._topic_clients.clear()
+        self._client_topics.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the numbers of topics, subscribed clients and
+        subscriptions.
+        """
+        return {
+            "topics": len(self._topic_clients),
+            "clients": len(self._client_topics),
+            "subscriptions": sum(len(t) for t in self._client_topics.values()),
+        }
+
+
+subscriptions = SubscriptionRegistry()
+"""The data websocket clients' subscriptions."""
+
+
+class ClientSendQueue:
+    """A bounded queue of encoded messages for one websocket client, sent in
+    order by the queue's own writer task.
+
+    A slow client only fills its own queue rather than holding up sends to
+    other clients. When the queue is full, the ``"coalesce"`` policy drops
+    any queued messages on the same topic as the new one, or else the
+    oldest message, and the ``"disconnect"`` policy closes the websocket.
+
+    Parameters
+    ----------
+    websocket : `WebSocket`
+        The client's websocket.
+    max_size : `int` | `None`
+        The most messages to hold. Defaults to ``config.ws_client_queue_size``.
+    policy : `str` | `None`
+        ``"coalesce"`` or ``"disconnect"``. Defaults to
+        ``config.ws_full_queue_policy``.
+    """
+
+    # counts for queues that have since been closed
+    total_dropped = 0
+    total_disconnected = 0
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int | None = None,
+        policy: str | None = None,
+    ) -> None:
+        self.websocket = websocket
+        self.max_size = max_size or config.ws_client_queue_size
+        self.policy = policy or config.ws_full_queue_policy
+        self.dropped = 0
+        self._queue: deque[tuple[str, str]] = deque()
+        self._ready = asyncio.Event()
+        self._overflowed = False
+        self._task = asyncio.create_task(self._write())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, topic: str, frame: str) -> None:
+        """Queue a message to be sent.
+
+        Parameters
+        ----------
+        topic : `str`
+            Identifies the data the message is about, for coalescing.
+        frame : `str`
+            The encoded message.
+        """
+        if self._overflowed or self._task.done():
+            return
+        if len(self._queue) >= self.max_size:
+            if self.policy == "disconnect":
+                logger.warning("Disconnecting slow websocket client")
+                self._overflowed = True
+                self.dropped += len(self._queue) + 1
+                self._queue.clear()
+                self._ready.set()
+                return
+            kept = [(t, f) for t, f in self._queue if t != topic]
+            if len(kept) == len(self._queue):
+                kept.pop(0)
+            self.dropped += len(self._queue) - len(kept)
+            self._queue = deque(kept)
+        self._queue.append((topic, frame))
+        self._ready.set()
+
+    async def _write(self) -> None:
+        while True:
+            await self._ready.wait()
+            if self._overflowed:
+                ClientSendQueue.total_disconnected += 1
+                await self.websocket.close(code=1013)
+                return
+            if not self._queue:
+                self._ready.clear()
+                continue
+            _, frame = self._queue.popleft()
+            try:
+                await self.websocket.send_text(frame)
+            except Exception as e:
+                # the handler's receive loop cleans up after the client
+                logger.warning("Failed to send to websocket client", error=str(e))
+                return
+
+    async def close(self) -> None:
+        """Stop the writer task, discarding any unsent messages."""
+        ClientSendQueue.total_dropped += self.dropped + len(self._queue)
+        self._queue.clear()
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+# keyed by client id
+client_queues: dict[uuid.UUID, ClientSendQueue] = {}
+
+
+def get_client_queue_stats() -> dict[str, int]:
+    """Return the number of client queues, their combined and greatest depth,
+    the messages dropped from full queues and the number of clients
+    disconnected for being too slow.
+    """
+    depths = [len(queue) for queue in client_queues.values()]
+    return {
+        "clients": len(depths),
+        "queued": sum(depths),
+        "max_depth": max(depths, default=0),
+        "dropped": ClientSendQueue.total_dropped
+        + sum(queue.dropped for queue in client_queues.values()),
+        "disconnected": ClientSendQueue.total_disconnected,
+    }
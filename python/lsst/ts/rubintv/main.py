@@ -34,8 +34,9 @@ from .handlers.proxies import proxies_router
 from .handlers.websocket import data_ws_router
 from .handlers.websockets_clients import clients
 from .middleware.x_forwarded import XForwardedMiddleware
+from .models.models_helpers import shutdown_parse_pool
 from .models.models_init import ModelsInitiator
-from .s3_connection_pool import get_shared_s3_client
+from .s3_connection_pool import get_shared_s3_client, shutdown_s3_clients
 
 logger = rubintv_logger()
 
@@ -94,10 +95,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # inject app state
     app.state.models = models
     app.state.historical = hp
+    # the clients used to serve requests, e.g. to proxy images, have their
+    # own threads so that they don't queue behind the pollers' listings
     app.state.s3_clients = {}
     for location in models.locations:
         app.state.s3_clients[location.name] = get_shared_s3_client(
-            location.profile_name, location.bucket_name, location.endpoint_url
+            location.profile_name,
+            location.bucket_name,
+            location.endpoint_url,
+            location.s3_backend,
+            pool_name="requests",
         )
 
     # start polling buckets for data
@@ -115,6 +122,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     historical_polling.cancel()
     today_polling.cancel()
+    hp.close()
 
     if redis_client is not None:
         if detector_stream_task and detector_stream_reader is not None:
@@ -140,6 +148,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     for c in clients.values():
         await c.close()
 
+    await shutdown_s3_clients()
+    shutdown_parse_pool()
+
 
 async def startup_current_poller(models: ModelsInitiator, app: FastAPI) -> asyncio.Task:
     """Start the current poller.
@@ -151,7 +162,11 @@ async def startup_current_poller(models: ModelsInitiator, app: FastAPI) -> async
         The FastAPI application.
     """
     first_pass = asyncio.Event()
-    cp = CurrentPoller(models.locations, first_pass_event=first_pass)
+    cp = CurrentPoller(
+        models.locations,
+        first_pass_event=first_pass,
+        on_day_rollover=app.state.historical.receive_day_handoff,
+    )
     app.state.current_poller = cp
     # Create an event to signal the first pass is complete
     app.state.first_pass_event = first_pass
@@ -0,0 +1,188 @@
+"""Bulk conversion of bucket listings to `Event` objects.
+
+The keys of a whole listing are matched in one call to a precompiled
+pattern, accepting exactly the keys `parse_event_key` does, each day_obs is
+checked as a date just once, and the events are built from the matched
+parts without parsing their keys again. Failures are reported together
+rather than one log line per key. Very large listings can be parsed across a
+process pool.
+"""
+
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+
+from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.models.models import Event, parse_event_key
+
+__all__ = ["KeyParseFailures", "parse_event_objects", "parse_event_objects_pooled"]
+
+logger = rubintv_logger()
+
+# the number of failing keys to keep as examples
+MAX_EXAMPLES = 5
+
+# matches each line of a listing's keys joined by newlines, as the keys
+# parsed by `parse_event_key`, or else as a whole in the last group
+_LISTING_RE = re.compile(
+    r"^(?:(\w+)/([\d-]+)/(\w+)/(?:(\d{6})|final)/([\w-]+\.\w+)|(.*))$", re.M
+)
+
+
+@dataclass
+class KeyParseFailures:
+    """The keys that couldn't be parsed, reported together."""
+
+    count: int = 0
+    examples: list[str] = field(default_factory=list)
+
+    def add(self, key: str) -> None:
+        self.count += 1
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.append(key)
+
+    def merge(self, other: "KeyParseFailures") -> None:
+        self.count += other.count
+        room = MAX_EXAMPLES - len(self.examples)
+        self.examples.extend(other.examples[:room])
+
+    def log(self) -> None:
+        """Log the failures, if there were any, as one line."""
+        if self.count:
+            logger.warning(
+                "Unparseable keys:", count=self.count, examples=self.examples
+            )
+
+
+def parse_event_objects(
+    objects: list[dict[str, str]], failures: KeyParseFailures | None = None
+) -> list[Event]:
+    """Convert bucket listing entries to events in one pass.
+
+    Parameters
+    ----------
+    objects : `list` [`dict` [`str`, `str`]]
+        Dicts with the ``"key"`` and ``"hash"`` of each object.
+    failures : `KeyParseFailures` | `None`
+        Collects the keys that can't be parsed. If None, they are logged
+        together before returning.
+
+    Returns
+    -------
+    events : `list` [`Event`]
+        The events for the keys that could be parsed, in order.
+    """
+    report = failures is None
+    if failures is None:
+        failures = KeyParseFailures()
+    keys = "\n".join(obj["key"] for obj in objects)
+    if keys.count("\n") != len(objects) - 1:
+        # a key has a newline in it, so the keys can't be told apart
+        matches = [_match_key(obj["key"]) for obj in objects]
+    else:
+        matches = _LISTING_RE.findall(keys)
+    # day_obs -> whether it's a valid date, as checked once per day
+    valid_days: dict[str, bool] = {}
+    from_parts = Event.from_parts
+    events = []
+    for obj, (camera, day_obs, channel, seq, filename, unmatched) in zip(
+        objects, matches
+    ):
+        if unmatched or not camera:
+            failures.add(obj["key"])
+            continue
+        valid = valid_days.get(day_obs)
+        if valid is None:
+            valid = valid_days[day_obs] = _is_day_obs(day_obs)
+        if not valid:
+            failures.add(obj["key"])
+            continue
+        events.append(
+            from_parts(
+                obj.get("hash", ""),
+                camera,
+                day_obs,
+                channel,
+                int(seq) if seq else "final",
+                filename,
+            )
+        )
+    if report:
+        failures.log()
+    return events
+
+
+def _match_key(key: str) -> tuple[str, ...]:
+    """Return the groups of `_LISTING_RE` for a key on its own."""
+    try:
+        camera, day_obs, channel, seq, filename, _ = parse_event_key(key)
+    except ValueError:
+        return ("",) * 5 + (key,)
+    return (camera, day_obs, channel, "" if seq == "final" else str(seq), filename, "")
+
+
+def _is_day_obs(day_obs: str) -> bool:
+    """Return whether a day_obs is accepted by `parse_event_key`."""
+    try:
+        y, m, d = day_obs.split("-")
+        date(int(y), int(m), int(d))
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_chunk(
+    objects: list[dict[str, str]],
+) -> tuple[list[Event], KeyParseFailures]:
+    failures = KeyParseFailures()
+    return parse_event_objects(objects, failures), failures
+
+
+async def parse_event_objects_pooled(
+    objects: list[dict[str, str]],
+    pool: ProcessPoolExecutor,
+    chunk_size: int = 100_000,
+    failures: KeyParseFailures | None = None,
+) -> list[Event]:
+    """Convert bucket listing entries to events across a process pool.
+
+    Worth it only for listings of hundreds of thousands of keys or more, as
+    the events are pickled back from the worker processes.
+
+    Parameters
+    ----------
+    objects : `list` [`dict` [`str`, `str`]]
+        Dicts with the ``"key"`` and ``"hash"`` of each object.
+    pool : `ProcessPoolExecutor`
+        The pool to parse in.
+    chunk_size : `int`
+        The number of keys sent to a worker at a time.
+    failures : `KeyParseFailures` | `None`
+        Collects the keys that can't be parsed. If None, they are logged
+        together before returning.
+
+    Returns
+    -------
+    events : `list` [`Event`]
+        The events for the keys that could be parsed, in order.
+    """
+    loop = asyncio.get_running_loop()
+    starts = range(0, len(objects), chunk_size)
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _parse_chunk, objects[slice(i, i + chunk_size)])
+            for i in starts
+        )
+    )
+    all_failures = KeyParseFailures()
+    events = []
+    for chunk_events, chunk_failures in chunks:
+        events.extend(chunk_events)
+        all_failures.merge(chunk_failures)
+    if failures is None:
+        all_failures.log()
+    else:
+        failures.merge(all_failures)
+    return events
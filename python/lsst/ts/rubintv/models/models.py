@@ -3,14 +3,16 @@
 import asyncio
 import dataclasses
 import re
+import sys
 from datetime import date, datetime, timedelta, timezone
 from enum import Enum
 from typing import Any
 
 from lsst.ts.rubintv import __version__
 from lsst.ts.rubintv.config import config, rubintv_logger
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, GetCoreSchemaHandler
 from pydantic.dataclasses import dataclass
+from pydantic_core import core_schema
 
 logger = rubintv_logger()
 
@@ -196,12 +198,26 @@ class Camera(HasButton):
         return [c for c in self.channels if c.per_day]
 
 
+class S3Backend(str, Enum):
+    """The S3 client implementations a `Location` can be served by.
+
+    ``BOTO3`` runs blocking boto3 calls in a thread pool. ``AIO`` uses the
+    asyncio-native aiobotocore client, which must be installed separately.
+    """
+
+    BOTO3 = "boto3"
+    AIO = "aio"
+
+
 class Location(HasButton):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     bucket_name: str
     profile_name: str
     endpoint_url: str | None = None
+    s3_backend: S3Backend = S3Backend.BOTO3
+    # max number of cameras the CurrentPoller lists and processes at once
+    poll_concurrency: int = 4
     camera_groups: dict[str, list[str]]
     cameras: list[Camera] = []
     services: list[str] = []
@@ -209,17 +225,118 @@ class Location(HasButton):
     has_cluster_status: bool = False
 
 
-@dataclass
+_EVENT_KEY_RE = re.compile(r"(\w+)\/([\d-]+)\/(\w+)\/(\d{6}|final)\/([\w-]+)\.(\w+)$")
+
+
+def parse_event_key(key: str) -> tuple[str, str, str, int | str, str, str]:
+    """Parses a channel event object's key.
+
+    A key is as:
+    ``f"{camera}/{date_str}/{channel}/{seq:06}/{filename}.{ext}"``
+
+    Returns
+    -------
+    url_parts: `tuple`
+        The camera name, day_obs, channel name, seq_num (``"final"`` or an
+        `int`), filename (with its extension) and extension.
+    """
+    if match := _EVENT_KEY_RE.match(key):
+        parts = match.groups()
+    else:
+        raise ValueError(f"Key can't be parsed: {key}")
+
+    camera, day_obs_str, channel, seq_str, filename, ext = parts
+    filename = filename + "." + ext
+
+    try:
+        y, m, d = day_obs_str.split("-")
+        date(int(y), int(m), int(d))
+    except ValueError:
+        raise ValueError(f"Date can't be parsed: {key}")
+
+    seq_num: int | str = seq_str if seq_str == "final" else int(seq_str)
+    return (camera, day_obs_str, channel, seq_num, filename, ext)
+
+
 class Event:
-    key: str
-    hash: str = ""
-    # derived fields:
-    camera_name: str = ""
-    day_obs: str = ""
-    channel_name: str = ""
-    seq_num: int | str = ""
-    filename: str = ""
-    ext: str = ""
+    """A channel event, from the key and hash of its object in the bucket.
+
+    Millions of events are held for the historical data, so events are
+    compact. The parts of the key are kept rather than the key itself, which
+    is rebuilt when it's asked for, and the camera name, day_obs and channel
+    name, which are the same for many events, are interned.
+
+    Events serialize, with `to_dict` and in API responses, as a dict of the
+    key, hash and the parts of the key.
+
+    Parameters
+    ----------
+    key : `str`
+        The object's key, as
+        ``f"{camera}/{date_str}/{channel}/{seq:06}/{filename}.{ext}"``, the
+        seq being ``"final"`` for an event that's the last of its day.
+    hash : `str`
+        The object's ETag.
+
+    Raises
+    ------
+    ValueError
+        If the key can't be parsed.
+    """
+
+    __slots__ = ("hash", "camera_name", "day_obs", "channel_name", "_seq", "filename")
+
+    # stored in place of the seq_num of a "final" event
+    _FINAL = -1
+
+    def __init__(self, key: str, hash: str = "") -> None:
+        camera, day_obs, channel, seq_num, filename, _ = parse_event_key(key)
+        self.hash = hash
+        self.camera_name = sys.intern(camera)
+        self.day_obs = sys.intern(day_obs)
+        self.channel_name = sys.intern(channel)
+        self._seq = seq_num if isinstance(seq_num, int) else self._FINAL
+        self.filename = filename
+
+    @classmethod
+    def from_parts(
+        cls,
+        hash: str,
+        camera_name: str,
+        day_obs: str,
+        channel_name: str,
+        seq_num: int | str,
+        filename: str,
+    ) -> "Event":
+        """Return an event from the already parsed and validated parts of its
+        key, as from `parse_event_key`.
+        """
+        event = cls.__new__(cls)
+        event.hash = hash
+        event.camera_name = sys.intern(camera_name)
+        event.day_obs = sys.intern(day_obs)
+        event.channel_name = sys.intern(channel_name)
+        event._seq = seq_num if isinstance(seq_num, int) else cls._FINAL
+        event.filename = filename
+        return event
+
+    @property
+    def key(self) -> str:
+        return (
+            f"{self.camera_name}/{self.day_obs}/{self.channel_name}/"
+            f"{self._seq_str()}/{self.filename}"
+        )
+
+    @property
+    def seq_num(self) -> int | str:
+        return "final" if self._seq == self._FINAL else self._seq
+
+    @property
+    def ext(self) -> str:
+        return self.filename.rpartition(".")[2]
+
+    def _seq_str(self) -> str:
+        return "final" if self._seq == self._FINAL else f"{self._seq:06}"
 
     def __lt__(self, other: Any) -> bool:
         """Used by max()"""
@@ -227,45 +344,74 @@ class Event:
             raise TypeError
         return self.key < other.key
 
-    def __post_init__(self) -> None:
-        (
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Event(key={self.key!r}, hash={self.hash!r})"
+
+    def __getstate__(self) -> tuple:
+        return (
+            self.hash,
             self.camera_name,
             self.day_obs,
             self.channel_name,
-            self.seq_num,
+            self._seq,
             self.filename,
-            self.ext,
-        ) = self.parse_key()
-
-    def parse_key(self) -> tuple:
-        """Parses a channel event object's key.
-
-        A key is as:
-        ``f"{camera}/{date_str}/{channel}/{seq:06}/{filename}.{ext}"``
-
-        Returns
-        -------
-        url_parts: `tuple`
+        )
+
+    def __setstate__(self, state: tuple) -> None:
+        hash, camera, day_obs, channel, self._seq, self.filename = state
+        self.hash = hash
+        # pickled strings are unpickled as new strings, so are interned again
+        self.camera_name = sys.intern(camera)
+        self.day_obs = sys.intern(day_obs)
+        self.channel_name = sys.intern(channel)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the event as a dict of its key, hash and the parts of its
+        key, as sent to clients.
         """
-        key = self.key
-        name_re = re.compile(r"(\w+)\/([\d-]+)\/(\w+)\/(\d{6}|final)\/([\w-]+)\.(\w+)$")
-        if match := name_re.match(key):
-            parts = match.groups()
-        else:
-            raise ValueError(f"Key can't be parsed: {key}")
-
-        camera, day_obs_str, channel, seq_num, filename, ext = parts
-        filename = filename + "." + ext
-
-        try:
-            self.date_str_to_date(day_obs_str)
-        except ValueError:
-            raise ValueError(f"Date can't be parsed: {key}")
+        return {
+            "key": self.key,
+            "hash": self.hash,
+            "camera_name": self.camera_name,
+            "day_obs": self.day_obs,
+            "channel_name": self.channel_name,
+            "seq_num": self.seq_num,
+            "filename": self.filename,
+            "ext": self.ext,
+        }
 
-        if seq_num != "final":
-            seq_num = int(seq_num)
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        """Validate events from themselves or a dict with a key and hash, and
+        serialize them with `to_dict`.
+        """
 
-        return (camera, day_obs_str, channel, seq_num, filename, ext)
+        def from_dict(data: dict[str, Any]) -> "Event":
+            return cls(data["key"], data.get("hash", ""))
+
+        return core_schema.json_or_python_schema(
+            json_schema=core_schema.no_info_after_validator_function(
+                from_dict, core_schema.dict_schema()
+            ),
+            python_schema=core_schema.union_schema(
+                [
+                    core_schema.is_instance_schema(cls),
+                    core_schema.no_info_after_validator_function(
+                        from_dict, core_schema.dict_schema()
+                    ),
+                ]
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.to_dict),
+        )
 
     def date_str_to_date(self, date_str: str) -> date:
         y, m, d = date_str.split("-")
@@ -275,7 +421,13 @@ class Event:
         return self.date_str_to_date(self.day_obs)
 
     def seq_num_force_int(self) -> int:
-        return self.seq_num if isinstance(self.seq_num, int) else 99999
+        return 99999 if self._seq == self._FINAL else self._seq
+
+
+_NR_METADATA_KEY_RE = re.compile(r"(\w+)\/([\d-]+)\/night_report\/([\w-]+md)\.(\w+)$")
+_NR_PLOT_KEY_RE = re.compile(
+    r"(\w+)\/([\d-]+)\/night_report\/([\w-]+)\/([\w-]+)\.(\w+)$"
+)
 
 
 @dataclass
@@ -330,16 +482,12 @@ class NightReportData:
              Tuple of values used by `__post_init__` to fully init the object.
         """
         key = self.key
-        metadata_re = re.compile(r"(\w+)\/([\d-]+)\/night_report\/([\w-]+md)\.(\w+)$")
-        if match := metadata_re.match(key):
+        if match := _NR_METADATA_KEY_RE.match(key):
             parts = match.groups()
             camera_name, day_obs_str, filename, ext = parts
             group = "metadata"
         else:
-            plot_re = re.compile(
-                r"(\w+)\/([\d-]+)\/night_report\/([\w-]+)\/([\w-]+)\.(\w+)$"
-            )
-            if match := plot_re.match(key):
+            if match := _NR_PLOT_KEY_RE.match(key):
                 parts = match.groups()
                 camera_name, day_obs_str, group, filename, ext = parts
                 filename = filename + "." + ext
@@ -440,12 +588,16 @@ class ServiceMessageTypes(Enum):
     CHANNEL_EVENT = "event"
     LATEST_EVENT = "latestEvent"
     CAMERA_TABLE = "channelData"
+    CAMERA_TABLE_PATCH = "channelDataPatch"
     CAMERA_METADATA = "metadata"
+    CAMERA_METADATA_PATCH = "metadataPatch"
     LATEST_METADATA = "latestMetadata"
     CAMERA_PER_DAY = "perDay"
     CAMERA_PD_BACKDATED = "perDayBackdated"
     NIGHT_REPORT = "nightReport"
     HISTORICAL_STATUS = "historicalStatus"
+    HISTORICAL_PROGRESS = "historicalProgress"
+    HISTORICAL_READINESS = "historicalReadiness"
     DAY_CHANGE = "dayChange"
     PREV_NEXT = "prevNext"
     ALL_CHANNELS = "allChannels"
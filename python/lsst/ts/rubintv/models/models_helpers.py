@@ -1,8 +1,14 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
 from typing import Any, AsyncGenerator, Iterable, Iterator
 
-from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.config import config, rubintv_logger
+from lsst.ts.rubintv.models.key_parser import (
+    KeyParseFailures,
+    parse_event_objects,
+    parse_event_objects_pooled,
+)
 from lsst.ts.rubintv.models.models import Camera, Channel, Event, NightReportData
 
 __all__ = [
@@ -69,39 +75,73 @@ def string_int_to_date(date_string: str) -> date:
     return date(int(d[0:4]), int(d[4:6]), int(d[6:8]))
 
 
-def process_batch(batch: list[dict]) -> list[Event]:
+# listings at least this long are parsed across processes, if configured to
+POOLED_PARSE_THRESHOLD = 200_000
+
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor | None:
+    global _parse_pool
+    if _parse_pool is None and config.key_parse_processes > 0:
+        _parse_pool = ProcessPoolExecutor(config.key_parse_processes)
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the pool of key parsing processes, if one was started.
+
+    A pool is started afresh if keys are parsed afterwards.
+    """
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
+
+def process_batch(
+    batch: list[dict], failures: KeyParseFailures | None = None
+) -> list[Event]:
     """Convert a batch of event dicts to Event objects.
 
     Parameters
     ----------
     batch : list[dict]
         A batch list of event dicts.
+    failures : KeyParseFailures | None, optional
+        Collects the keys that can't be parsed. If None, they are logged
+        together once the batch is done.
 
     Returns
     -------
     list[Event]
         A batch list of `Event` objects.
     """
-    logger = rubintv_logger()
-    events = []
-    for obj in batch:
-        try:
-            event = Event(**obj)
-            events.append(event)
-        except ValueError as e:
-            logger.error(e)
-    return events
+    return parse_event_objects(batch, failures)
 
 
 async def all_objects_to_events(objects: list[dict]) -> list[Event]:
-    events = []
-    async for events_batch in objects_to_events(objects):
-        events.extend(events_batch)
+    """Convert a whole listing to Event objects, reporting the keys that
+    can't be parsed together.
+
+    Listings of at least `POOLED_PARSE_THRESHOLD` objects are parsed across
+    a process pool if ``key_parse_processes`` is configured.
+    """
+    failures = KeyParseFailures()
+    if len(objects) >= POOLED_PARSE_THRESHOLD and (pool := _get_parse_pool()):
+        events = await parse_event_objects_pooled(objects, pool, failures=failures)
+    else:
+        events = []
+        async for events_batch in objects_to_events(objects, failures=failures):
+            events.extend(events_batch)
+    failures.log()
     return events
 
 
 async def objects_to_events(
-    objects: list[dict], batch_size: int = 1000
+    objects: list[dict],
+    batch_size: int = 1000,
+    failures: KeyParseFailures | None = None,
 ) -> AsyncGenerator[list[Event], None]:
     """Asynchronously convert a list of dictionaries to a list of Event
     objects in batches.
@@ -112,6 +152,9 @@ async def objects_to_events(
         A list of dictionaries, each representing the data for an Event object.
     batch_size : int, optional
         The size of each batch to process asynchronously, by default 1000
+    failures : KeyParseFailures | None, optional
+        Collects the keys that can't be parsed. If None, they are logged
+        together for each batch.
 
     Yields
     ------
@@ -121,7 +164,7 @@ async def objects_to_events(
     # Split objects into batches and process them asynchronously
     for i in range(0, len(objects), batch_size):
         batch = objects[i : i + batch_size]
-        events = await asyncio.to_thread(process_batch, batch)
+        events = await asyncio.to_thread(process_batch, batch, failures)
         yield events
 
 
@@ -176,19 +219,90 @@ def get_image_viewer_link(camera: Camera, day_obs: date, seq_num: int) -> str:
 async def make_table_from_event_list(
     events: list[Event], channels: list[Channel]
 ) -> dict[int, dict[str, dict]]:
+    """Return a table of the events' dicts, keyed by seq_num and then
+    channel name, in descending seq_num order.
+
+    The events are grouped by channel in one pass, and each row has its
+    channels in the order of ``channels``. Events that aren't in one of the
+    channels, or whose seq_num isn't an `int`, are left out.
+
+    Parameters
+    ----------
+    events : `list` [`Event`]
+        The events to tabulate.
+    channels : `list` [`Channel`]
+        The channels to tabulate events for.
+
+    Returns
+    -------
+    table : `dict` [`int`, `dict` [`str`, `dict`]]
+        The table.
+    """
+    by_channel: dict[str, list[Event]] = {chan.name: [] for chan in channels}
+    for e in events:
+        chan_events = by_channel.get(e.channel_name)
+        if chan_events is not None:
+            chan_events.append(e)
     d: dict[int, dict[str, dict]] = {}
-    for chan in channels:
-        chan_events = [e for e in events if e.channel_name == chan.name]
-        if chan_events:
-            for e in chan_events:
-                if not isinstance(e.seq_num, int):
-                    continue
-                if e.seq_num in d:
-                    d[e.seq_num].update({chan.name: e.__dict__})
-                else:
-                    d.update({e.seq_num: {chan.name: e.__dict__}})
-    table = {k: v for k, v in sorted(d.items(), reverse=True)}
-    return table
+    for chan_name, chan_events in by_channel.items():
+        for e in chan_events:
+            seq_num = e.seq_num
+            if not isinstance(seq_num, int):
+                continue
+            row = d.get(seq_num)
+            if row is None:
+                d[seq_num] = row = {}
+            row[chan_name] = e.to_dict()
+    return dict(sorted(d.items(), reverse=True))
+
+
+def add_events_to_table(
+    table: dict[int, dict[str, dict]], events: list[Event], channels: list[Channel]
+) -> tuple[dict[int, dict[str, dict]], dict[int, dict[str, dict]]]:
+    """Add events to a table made by `make_table_from_event_list`, replacing
+    the dicts of any events already in it.
+
+    Rows are changed in place. New rows with higher seq_nums than the rest,
+    as new events usually have, are put in front of the existing rows
+    without sorting them again.
+
+    Parameters
+    ----------
+    table : `dict` [`int`, `dict` [`str`, `dict`]]
+        The table, in descending seq_num order.
+    events : `list` [`Event`]
+        The events to add.
+    channels : `list` [`Channel`]
+        The channels the table has events for.
+
+    Returns
+    -------
+    table : `dict` [`int`, `dict` [`str`, `dict`]]
+        The table, which is a new dict if rows were added.
+    rows : `dict` [`int`, `dict` [`str`, `dict`]]
+        The rows that were added or changed, keyed by seq_num.
+    """
+    chan_names = {chan.name for chan in channels}
+    first_seq = next(iter(table), -1)
+    rows: dict[int, dict[str, dict]] = {}
+    new_rows: dict[int, dict[str, dict]] = {}
+    for e in events:
+        seq_num = e.seq_num
+        if e.channel_name not in chan_names or not isinstance(seq_num, int):
+            continue
+        row = table.get(seq_num)
+        if row is None:
+            row = new_rows.get(seq_num)
+            if row is None:
+                new_rows[seq_num] = row = {}
+        row[e.channel_name] = e.to_dict()
+        rows[seq_num] = row
+    if not new_rows:
+        return table, rows
+    if min(new_rows) > first_seq:
+        # the usual case, new rows go at the top
+        return dict(sorted(new_rows.items(), reverse=True)) | table, rows
+    return dict(sorted((table | new_rows).items(), reverse=True)), rows
 
 
 def dict_from_list_of_named_objects(a_list: list[Any]) -> dict[str, Any]:
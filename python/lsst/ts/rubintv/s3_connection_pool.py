@@ -6,33 +6,61 @@ memory leaks from creating multiple boto3 clients with the same configuration.
 
 import gc
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from lsst.ts.rubintv.config import rubintv_logger
+from lsst.ts.rubintv.aio_s3client import AioS3Client
+from lsst.ts.rubintv.config import config, rubintv_logger
+from lsst.ts.rubintv.models.models import S3Backend
 from lsst.ts.rubintv.s3client import S3Client
 
 logger = rubintv_logger()
 
-__all__ = ["S3ConnectionPool", "get_shared_s3_client", "force_garbage_collection"]
+__all__ = [
+    "S3ConnectionPool",
+    "get_shared_s3_client",
+    "force_garbage_collection",
+    "shutdown_s3_clients",
+]
 
 
 class S3ConnectionPool:
     """A thread-safe connection pool for S3Client instances.
 
     This pool maintains a cache of S3Client instances based on their
-    configuration parameters (profile_name, bucket_name, endpoint_url).
+    configuration parameters (profile_name, bucket_name, endpoint_url,
+    backend) and the name of the pool they're for.
     Reusing clients prevents memory accumulation from boto3 library
     initialization overhead.
+
+    Each boto3 client is given a thread pool of ``max_workers`` threads when
+    it is created, sized to match its botocore connection pool. The pools
+    live until `shutdown` is called. Clients on the ``aio`` backend need no
+    threads and are sized by ``config.s3_aio_max_connections``. Clients for
+    different pool names have their own threads or connections, so that
+    e.g. requests served to users don't queue behind the pollers.
+
+    Parameters
+    ----------
+    max_workers : `int` | `None`
+        Threads (and pooled connections) per client. Defaults to
+        ``config.s3_max_workers``.
     """
 
-    def __init__(self) -> None:
-        self._clients: dict[tuple[str, str, str], S3Client] = {}
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._clients: dict[tuple[str, str, str, str, str], S3Client | AioS3Client] = {}
+        self._max_workers = max_workers or config.s3_max_workers
         self._lock = threading.Lock()
         self._access_count = 0
         self._gc_threshold = 100  # Trigger GC every 100 accesses
 
     def get_client(
-        self, profile_name: str, bucket_name: str, endpoint_url: str | None = None
-    ) -> S3Client:
+        self,
+        profile_name: str,
+        bucket_name: str,
+        endpoint_url: str | None = None,
+        backend: S3Backend = S3Backend.BOTO3,
+        pool_name: str = "",
+    ) -> S3Client | AioS3Client:
         """Get or create an S3Client with the specified configuration.
 
         Parameters
@@ -43,15 +71,20 @@ class S3ConnectionPool:
             S3 bucket name
         endpoint_url : `str` | `None`
             S3 endpoint URL, None for default
+        backend : `S3Backend`
+            Which client implementation to use, boto3 by default
+        pool_name : `str`
+            The pool of threads or connections to use. Clients with
+            different pool names don't share them.
 
         Returns
         -------
-        S3Client
-            Cached or newly created S3Client instance
+        S3Client | AioS3Client
+            Cached or newly created client instance
         """
         # Normalize endpoint_url for consistent key generation
         endpoint_key = endpoint_url or ""
-        cache_key = (profile_name, bucket_name, endpoint_key)
+        cache_key = (profile_name, bucket_name, endpoint_key, backend.value, pool_name)
 
         with self._lock:
             # Increment access counter and trigger GC if needed
@@ -64,12 +97,11 @@ class S3ConnectionPool:
             if cache_key not in self._clients:
                 logger.info(
                     f"Creating new S3Client for profile={profile_name}, "
-                    f"bucket={bucket_name}, endpoint={endpoint_url}"
+                    f"bucket={bucket_name}, endpoint={endpoint_url}, "
+                    f"backend={backend.value}, pool={pool_name}"
                 )
-                self._clients[cache_key] = S3Client(
-                    profile_name=profile_name,
-                    bucket_name=bucket_name,
-                    endpoint_url=endpoint_url,
+                self._clients[cache_key] = self._create_client(
+                    profile_name, bucket_name, endpoint_url, backend, pool_name
                 )
                 # Force GC after creating new client to clean up
                 # initialization overhead
@@ -82,14 +114,46 @@ class S3ConnectionPool:
 
         return self._clients[cache_key]
 
+    def _create_client(
+        self,
+        profile_name: str,
+        bucket_name: str,
+        endpoint_url: str | None,
+        backend: S3Backend,
+        pool_name: str,
+    ) -> S3Client | AioS3Client:
+        if backend == S3Backend.AIO:
+            return AioS3Client(
+                profile_name=profile_name,
+                bucket_name=bucket_name,
+                endpoint_url=endpoint_url,
+            )
+        thread_name_prefix = f"s3-{bucket_name}"
+        if pool_name:
+            thread_name_prefix += f"-{pool_name}"
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix=thread_name_prefix,
+        )
+        return S3Client(
+            profile_name=profile_name,
+            bucket_name=bucket_name,
+            endpoint_url=endpoint_url,
+            max_workers=self._max_workers,
+            executor=executor,
+        )
+
     def clear_cache(self) -> None:
         """Clear all cached S3Client instances.
 
         This method can be used for testing or to force recreation
-        of all clients.
+        of all clients. The thread pools of the cleared clients are shut
+        down.
         """
         with self._lock:
             logger.info(f"Clearing S3Client cache ({len(self._clients)} clients)")
+            for client in self._clients.values():
+                client.shutdown()
             self._clients.clear()
             self._access_count = 0
             # Force garbage collection after clearing cache
@@ -101,15 +165,35 @@ class S3ConnectionPool:
         Returns
         -------
         `dict` [`str`, `int`]
-            dictionary with 'cached_clients' count and access statistics
+            dictionary with 'cached_clients' count, access statistics and
+            the thread pool totals across all clients: 'executor_workers',
+            'executor_queued' and 'executor_in_flight'.
         """
         with self._lock:
+            executor_stats = [c.executor_stats() for c in self._clients.values()]
             return {
                 "cached_clients": len(self._clients),
                 "access_count": self._access_count,
                 "gc_threshold": self._gc_threshold,
+                "executor_workers": sum(s["max_workers"] for s in executor_stats),
+                "executor_queued": sum(s["queued"] for s in executor_stats),
+                "executor_in_flight": sum(s["in_flight"] for s in executor_stats),
             }
 
+    async def shutdown(self) -> None:
+        """Close all cached clients.
+
+        Called when the app stops. Thread pools are shut down, cancelling
+        calls still queued, and aio connection pools are closed. The clients
+        stay cached and start again when next used, so that an app
+        started after this one doesn't have to create its clients again.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+        logger.info(f"Shutting down {len(clients)} S3 clients")
+        for client in clients:
+            await client.close()
+
     def force_gc_and_reset(self) -> None:
         """Force garbage collection and reset access counter.
 
@@ -127,8 +211,12 @@ _global_pool = S3ConnectionPool()
 
 
 def get_shared_s3_client(
-    profile_name: str, bucket_name: str, endpoint_url: str | None = None
-) -> S3Client:
+    profile_name: str,
+    bucket_name: str,
+    endpoint_url: str | None = None,
+    backend: S3Backend = S3Backend.BOTO3,
+    pool_name: str = "",
+) -> S3Client | AioS3Client:
     """Get a shared S3Client instance from the global connection pool.
 
     This is the recommended way to obtain S3Client instances to prevent
@@ -142,13 +230,20 @@ def get_shared_s3_client(
         S3 bucket name
     endpoint_url : `str` | None
         S3 endpoint URL, None for default
+    backend : `S3Backend`
+        Which client implementation to use, boto3 by default
+    pool_name : `str`
+        The pool of threads or connections to use, shared only by clients
+        with the same pool name
 
     Returns
     -------
-    S3Client
-        Cached or newly created S3Client instance
+    S3Client | AioS3Client
+        Cached or newly created client instance
     """
-    return _global_pool.get_client(profile_name, bucket_name, endpoint_url)
+    return _global_pool.get_client(
+        profile_name, bucket_name, endpoint_url, backend, pool_name
+    )
 
 
 def clear_s3_client_cache() -> None:
@@ -170,6 +265,14 @@ def get_s3_pool_stats() -> dict[str, int]:
     return _global_pool.get_pool_stats()
 
 
+async def shutdown_s3_clients() -> None:
+    """Close all clients in the global pool.
+
+    Clients requested afterwards are created afresh.
+    """
+    await _global_pool.shutdown()
+
+
 def force_garbage_collection() -> None:
     """Force garbage collection and reset access counter.
 
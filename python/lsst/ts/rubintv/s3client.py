@@ -1,7 +1,8 @@
 import asyncio
 import json
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, Callable
 
 import boto3
 from botocore.config import Config as BotoConfig
@@ -18,34 +19,162 @@ __all__ = ["S3Client"]
 
 
 class S3Client:
+    """Wraps a boto3 S3 client for a single bucket.
+
+    Blocking boto3 calls are run in a thread pool that lives as long as the
+    client. The pool is sized together with botocore's connection pool so
+    that every worker thread can hold a connection.
+
+    Parameters
+    ----------
+    profile_name : `str`
+        AWS profile name for authentication.
+    bucket_name : `str`
+        S3 bucket name.
+    endpoint_url : `str` | `None`
+        S3 endpoint URL, None for the default from the app config.
+    max_workers : `int` | `None`
+        Size of the thread pool and of botocore's ``max_pool_connections``.
+        Defaults to ``config.s3_max_workers``.
+    executor : `ThreadPoolExecutor` | `None`
+        An executor to run blocking calls in. If None, one is created with
+        ``max_workers`` threads. Once shut down, the executor is replaced by
+        a new one on the next call.
+    """
+
     def __init__(
-        self, profile_name: str, bucket_name: str, endpoint_url: str | None = None
+        self,
+        profile_name: str,
+        bucket_name: str,
+        endpoint_url: str | None = None,
+        max_workers: int | None = None,
+        executor: ThreadPoolExecutor | None = None,
     ) -> None:
+        if max_workers is None:
+            max_workers = app_config.s3_max_workers
+        pool_config = BotoConfig(max_pool_connections=max_workers)
         session = boto3.Session(region_name="us-east-1", profile_name=profile_name)
         if app_config.s3_endpoint_url == "testing":
             endpoint_url = "testing"
-            self._client = session.client("s3")
+            self._client = session.client("s3", config=pool_config)
         else:
             if endpoint_url is None:
                 # Use the default endpoint URL from the config if not provided
                 # in the Location.
                 endpoint_url = app_config.s3_endpoint_url
             self._client = session.client(
-                "s3", endpoint_url=endpoint_url, config=config
+                "s3", endpoint_url=endpoint_url, config=config.merge(pool_config)
             )
         self._bucket_name = bucket_name
         self._endpoint_url = endpoint_url
 
-    async def async_list_objects(self, prefix: str) -> list[dict[str, str]]:
-        loop = asyncio.get_event_loop()
-        executor = ThreadPoolExecutor(max_workers=3)
-        return await loop.run_in_executor(executor, self.list_objects, prefix)
+        self._max_workers = max_workers
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"s3-{bucket_name}"
+        )
+        self._executor_shut_down = False
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+
+    def _live_executor(self) -> ThreadPoolExecutor:
+        """Return the executor, starting a new one if it was shut down."""
+        with self._stats_lock:
+            if self._executor_shut_down:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"s3-{self._bucket_name}",
+                )
+                self._executor_shut_down = False
+            return self._executor
+
+    async def _run_in_executor(self, func: Callable, *args: Any) -> Any:
+        """Run a blocking call in the client's executor, keeping count of
+        calls waiting for a worker and calls being worked on.
+        """
+
+        started = False
+
+        def tracked() -> Any:
+            nonlocal started
+            with self._stats_lock:
+                started = True
+                self._queued -= 1
+                self._in_flight += 1
+            try:
+                return func(*args)
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+
+        with self._stats_lock:
+            self._queued += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._live_executor(), tracked)
+        finally:
+            # The call never reached a worker, e.g. it was cancelled or the
+            # executor was shut down.
+            with self._stats_lock:
+                if not started:
+                    self._queued -= 1
+
+    def executor_stats(self) -> dict[str, int]:
+        """Return the size of the client's thread pool and the number of
+        calls queued for, or running on, it.
 
-    def list_objects(self, prefix: str) -> list[dict[str, str]]:
+        Returns
+        -------
+        `dict` [`str`, `int`]
+            Keys are ``"max_workers"``, ``"queued"`` and ``"in_flight"``.
+        """
+        with self._stats_lock:
+            return {
+                "max_workers": self._max_workers,
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the client's thread pool, cancelling any queued calls. A new
+        one is started if the client is used again.
+        """
+        with self._stats_lock:
+            self._executor_shut_down = True
+            executor = self._executor
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def close(self) -> None:
+        """Async counterpart of `shutdown`, matching `AioS3Client.close`."""
+        self.shutdown()
+
+    async def async_list_objects(
+        self, prefix: str, start_after: str | None = None
+    ) -> list[dict[str, str]]:
+        return await self._run_in_executor(self.list_objects, prefix, start_after)
+
+    def list_objects(
+        self, prefix: str, start_after: str | None = None
+    ) -> list[dict[str, str]]:
+        """List the objects under a prefix, in key order.
+
+        Parameters
+        ----------
+        prefix : `str`
+            Key prefix to list.
+        start_after : `str` | `None`
+            If given, only keys that sort after this one are listed.
+
+        Returns
+        -------
+        `list` [`dict` [`str`, `str`]]
+            Dicts of ``"key"`` and ``"hash"`` (the ETag) for each object.
+        """
         objects = []
+        kwargs = {"StartAfter": start_after} if start_after else {}
         try:
             response = self._client.list_objects_v2(
-                Bucket=self._bucket_name, Prefix=prefix
+                Bucket=self._bucket_name, Prefix=prefix, **kwargs
             )
             while True:
                 for content in response.get("Contents", []):
@@ -68,7 +197,7 @@ class S3Client:
             )
         return objects
 
-    def _get_object(self, key: str) -> dict[str, Any]:
+    def _get_object(self, key: str, raise_errors: bool = False) -> dict[str, Any]:
         try:
             obj = self._client.get_object(Bucket=self._bucket_name, Key=key)
             data = json.loads(obj["Body"].read())
@@ -79,12 +208,27 @@ class S3Client:
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 logger.info("Object for key: {key} not found.", key=key)
+            elif raise_errors:
+                raise
             return {}
 
     async def async_get_object(self, key: str) -> dict[str, Any]:
-        loop = asyncio.get_event_loop()
-        executor = ThreadPoolExecutor(max_workers=3)
-        return await loop.run_in_executor(executor, self._get_object, key)
+        return await self._run_in_executor(self._get_object, key)
+
+    async def async_get_object_or_raise(self, key: str) -> dict[str, Any]:
+        """Return the contents of a JSON object, or an empty dict if there's
+        no such key.
+
+        Unlike `async_get_object`, other errors are raised so that the
+        download can be retried.
+
+        Raises
+        ------
+        `ClientError`
+            If the object couldn't be fetched for any reason but that it
+            doesn't exist.
+        """
+        return await self._run_in_executor(self._get_object, key, True)
 
     def get_raw_object(self, key: str) -> StreamingBody:
         try:
@@ -95,6 +239,9 @@ class S3Client:
         except ClientError:
             raise HTTPException(status_code=404, detail=f"No such file for: {key}")
 
+    async def async_get_raw_object(self, key: str) -> StreamingBody:
+        return await self._run_in_executor(self.get_raw_object, key)
+
     def get_movie(self, key: str, headers: dict[str, str] | None = None) -> Any:
         try:
             data = self._client.get_object(
@@ -103,3 +250,8 @@ class S3Client:
             return data
         except ClientError:
             raise HTTPException(status_code=404, detail=f"No such file for: {key}")
+
+    async def async_get_movie(
+        self, key: str, headers: dict[str, str] | None = None
+    ) -> Any:
+        return await self._run_in_executor(self.get_movie, key, headers)
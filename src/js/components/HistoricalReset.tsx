@@ -35,7 +35,14 @@ export default function HistoricalReset() {
 
   useEffect(() => {
     const handleStatusUpdate = (message: CustomEvent) => {
-      const { data: isBusy } = message.detail || {}
+      const { dataType, data: isBusy } = message.detail || {}
+      // Progress and per-camera readiness are reported during a reload
+      if (
+        dataType === "historicalProgress" ||
+        dataType === "historicalReadiness"
+      ) {
+        return
+      }
       if (!isBusy) {
         setResetState("reset")
       }
@@ -250,6 +250,38 @@ describe("HistoricalReset Component", () => {
       expect(button).not.toBeDisabled()
     })
 
+    it("stays resetting on historicalProgress and historicalReadiness events", async () => {
+      simplePost.mockResolvedValue(true)
+
+      render(<HistoricalReset />)
+
+      const button = screen.getByRole("button")
+      fireEvent.click(button)
+
+      await waitFor(() => {
+        expect(button).toBeDisabled()
+      })
+
+      act(() => {
+        const event = new CustomEvent("historicalStatus", {
+          detail: { dataType: "historicalProgress", data: { done: 1, total: 2 } },
+        })
+        window.dispatchEvent(event)
+      })
+
+      act(() => {
+        const event = new CustomEvent("historicalStatus", {
+          detail: {
+            dataType: "historicalReadiness",
+            data: { "summit/auxtel": "complete" },
+          },
+        })
+        window.dispatchEvent(event)
+      })
+
+      expect(button).toBeDisabled()
+    })
+
     it("handles historicalStatus events with busy status", async () => {
       simplePost.mockResolvedValue(true)
 
@@ -4,17 +4,57 @@ import { WebsocketClient } from "./ws-service-client"
 Listens for the status of the historical poller via an event from the websocket
 client if the #historicalBusy element shows that historical data for the site
 is still loading. Reloads the page once notified that historical data is ready.
+
+On a camera's pages only that camera's readiness, for the page's date, is
+considered. A camera's most recent days are ready before the rest of its
+history, so the page is reloaded when they become ready, and if it's still
+waiting after that, once the camera's whole history is ready.
 */
 
 window.addEventListener("load", () => {
   if (!window.APP_DATA.historicalBusy) {
     return
   }
+  const { locationName, camera, date } = window.APP_DATA
+  const locCam = locationName && camera?.name && `${locationName}/${camera.name}`
+  let lastReadiness: string | undefined
+  let followReadiness = false
+
   const ws = new WebsocketClient()
-  ws.subscribe("historicalStatus")
+  // so that the status first sent is for the page's camera and date
+  if (locCam) {
+    const dayObs = /^\d{4}-\d{2}-\d{2}$/.test(date) ? date : null
+    ws.subscribe("historicalStatus", locationName, camera.name, dayObs)
+  } else {
+    ws.subscribe("historicalStatus")
+  }
   window.addEventListener("historicalStatus", (event: Event) => {
     const message = event as CustomEvent
-    const isBusy = message.detail.data
+    const { dataType, data } = message.detail
+    // Reload progress is reported while the current data is still served
+    if (dataType === "historicalProgress") {
+      return
+    }
+    if (dataType === "historicalReadiness") {
+      if (!locCam || !(locCam in data)) {
+        return
+      }
+      followReadiness = true
+      const readiness = data[locCam]
+      if (
+        readiness === "complete" ||
+        (readiness === "recent" && lastReadiness === "loading")
+      ) {
+        window.location.reload()
+      }
+      lastReadiness = readiness
+      return
+    }
+    // Pages for a camera wait for its readiness rather than for everything
+    if (followReadiness) {
+      return
+    }
+    const isBusy = data
     if (!isBusy) {
       window.location.reload()
     }
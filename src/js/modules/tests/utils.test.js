@@ -1,5 +1,5 @@
 import "@testing-library/jest-dom"
-import { isEmpty, sanitiseRedisValue } from "../utils"
+import { applyPatch, isEmpty, sanitiseRedisValue } from "../utils"
 
 /* global describe, it, expect */
 
@@ -91,3 +91,23 @@ describe("sanitiseRedisValue", () => {
     expect(sanitiseRedisValue("\x00\x1F\x7F")).toBe("_")
   })
 })
+
+describe("applyPatch", () => {
+  it("should add and replace entries", () => {
+    const data = { 1: { a: 1 }, 2: { a: 2 } }
+    const patched = applyPatch(data, { 2: { a: 3 }, 3: { a: 4 } })
+    expect(patched).toEqual({ 1: { a: 1 }, 2: { a: 3 }, 3: { a: 4 } })
+  })
+
+  it("should remove entries that are null in the patch", () => {
+    const patched = applyPatch({ 1: { a: 1 }, 2: { a: 2 } }, { 1: null })
+    expect(patched).toEqual({ 2: { a: 2 } })
+  })
+
+  it("should not modify the original data", () => {
+    const data = { 1: { a: 1 } }
+    const patched = applyPatch(data, { 1: null })
+    expect(data).toEqual({ 1: { a: 1 } })
+    expect(patched).not.toBe(data)
+  })
+})
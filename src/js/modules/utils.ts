@@ -257,6 +257,31 @@ export const decodeUnpackWSPayload = (compressed: string): string => {
   return data
 }
 
+/**
+ * Apply a patch of changed entries to a copy of a data object.
+ *
+ * Entries in the patch replace those in the data and entries that are
+ * `null` in the patch are removed.
+ *
+ * @param data - The data the patch applies to.
+ * @param patch - The changed entries.
+ * @returns A new object with the patch applied.
+ */
+export function applyPatch<T>(
+  data: Record<string, T>,
+  patch: Record<string, T | null>
+): Record<string, T> {
+  const patched = { ...data }
+  for (const [key, value] of Object.entries(patch)) {
+    if (value === null) {
+      delete patched[key]
+    } else {
+      patched[key] = value
+    }
+  }
+  return patched
+}
+
 export const toTimeString = (period: number): string => {
   /*  Takes a length of time in ms and converts to string `"HH:MM:SS"`.
       This allows for negative times to compensate for any bug that
@@ -1,6 +1,17 @@
 import ReconnectingWebSocket from "reconnecting-websocket"
 import { validate } from "uuid"
-import { decodeUnpackWSPayload, getWebSockURL } from "./utils"
+import { applyPatch, decodeUnpackWSPayload, getWebSockURL } from "./utils"
+
+// Patch message types and the full data type each one patches.
+const PATCH_TYPES: Record<string, string> = {
+  channelDataPatch: "channelData",
+  metadataPatch: "metadata",
+}
+
+interface VersionedData {
+  version: number
+  data: Record<string, unknown>
+}
 
 interface WebsocketClientInterface {
   connectionID: string | null
@@ -21,6 +32,10 @@ export class WebsocketClient implements WebsocketClientInterface {
   ws: ReconnectingWebSocket | null
   subscriptions: Array<Record<string, string>>
   online: boolean
+  // Latest versioned data, keyed by `${service} ${locCam} ${dataType}`
+  versionedData: Map<string, VersionedData>
+  // Subscriptions, as `${service} ${locCam}`, waiting for a resync
+  resyncsPending: Set<string>
 
   constructor() {
     this.connectionID = null
@@ -30,6 +45,8 @@ export class WebsocketClient implements WebsocketClientInterface {
     this.ws.onopen = this.handleOpen.bind(this)
     this.subscriptions = [] // To store multiple subscriptions
     this.online = false
+    this.versionedData = new Map()
+    this.resyncsPending = new Set()
   }
 
   subscribe(
@@ -60,6 +77,8 @@ export class WebsocketClient implements WebsocketClientInterface {
     this.connectionID = null
     this.subscriptions = []
     this.online = false
+    this.versionedData.clear()
+    this.resyncsPending.clear()
   }
 
   #getSubscriptionPayload(
@@ -68,7 +87,7 @@ export class WebsocketClient implements WebsocketClientInterface {
   ): Record<string, string> {
     // Create the payload based on the servicePageType and pageID
     let payload
-    if (servicePageType === "historicalStatus") {
+    if (servicePageType === "historicalStatus" && !pageID) {
       payload = { message: servicePageType }
     } else {
       const message = [servicePageType, pageID].join(" ").trim()
@@ -102,6 +121,8 @@ export class WebsocketClient implements WebsocketClientInterface {
     if (!this.connectionID) {
       const id = this.setConnectionID(messageEvent.data)
       if (id) {
+        this.versionedData.clear()
+        this.resyncsPending.clear()
         this.sendSubscriptionMessages()
         return
       }
@@ -113,6 +134,9 @@ export class WebsocketClient implements WebsocketClientInterface {
     } catch {
       const valid = this.setConnectionID(messageEvent.data)
       if (valid) {
+        // a new connection, so any versioned data will be resent in full
+        this.versionedData.clear()
+        this.resyncsPending.clear()
         this.sendSubscriptionMessages()
         return
       } else {
@@ -125,14 +149,60 @@ export class WebsocketClient implements WebsocketClientInterface {
       return
     }
 
+    let dataType = data.dataType
+    let payload = decodeUnpackWSPayload(data.payload) as unknown as Record<
+      string,
+      unknown
+    >
+    // The versions of one camera's data have nothing to do with another's
+    const serviceLocCam = [data.service, data.locCam].join(" ").trim()
+    if (dataType in PATCH_TYPES) {
+      dataType = PATCH_TYPES[dataType]
+      const stored = this.versionedData.get(`${serviceLocCam} ${dataType}`)
+      if (!stored || data.version !== stored.version + 1) {
+        // A patch has been missed so the full data is needed.
+        this.requestResync(serviceLocCam)
+        return
+      }
+      payload = applyPatch(stored.data, payload)
+    } else if (data.version !== undefined) {
+      this.resyncsPending.delete(serviceLocCam)
+    }
+    if (data.version !== undefined) {
+      this.versionedData.set(`${serviceLocCam} ${dataType}`, {
+        version: data.version,
+        data: payload,
+      })
+    }
+
     const detail = {
-      dataType: data.dataType,
-      data: decodeUnpackWSPayload(data.payload),
+      dataType,
+      data: payload,
       datestamp: data.datestamp,
     }
     window.dispatchEvent(new CustomEvent(data.service, { detail }))
   }
 
+  requestResync(serviceLocCam: string) {
+    const subscription = this.subscriptions.find(
+      (sub) => sub.message === serviceLocCam
+    )
+    if (
+      !this.ws ||
+      !this.connectionID ||
+      !subscription ||
+      this.resyncsPending.has(serviceLocCam)
+    ) {
+      return
+    }
+    this.resyncsPending.add(serviceLocCam)
+    const message = {
+      resync: subscription.message,
+      clientID: this.connectionID,
+    }
+    this.ws.send(JSON.stringify(message))
+  }
+
   setConnectionID(messageData: string): string | null {
     const id = messageData
     if (validate(id)) {
@@ -0,0 +1,116 @@
+import json
+from typing import Any, AsyncIterator, Iterator
+
+import boto3
+import pytest
+import pytest_asyncio
+from botocore.exceptions import ClientError
+from fastapi.exceptions import HTTPException
+from lsst.ts.rubintv.aio_s3client import AioS3Client
+from lsst.ts.rubintv.config import config
+
+pytest.importorskip("aiobotocore")
+# moto's server needs its "server" extra
+moto_server_module = pytest.importorskip("moto.server")
+
+PROFILE = "rubin-rubintv-data-bts"
+BUCKET = "test-bucket"
+
+
+@pytest.fixture(scope="module")
+def moto_server(aws_credentials: Any) -> Iterator[str]:
+    # moto's in-process mock doesn't patch aiobotocore's aiohttp requests,
+    # so the client is pointed at a moto server instead
+    server = moto_server_module.ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def bucket(moto_server: str, monkeypatch: Any) -> Iterator[Any]:
+    monkeypatch.setattr(config, "s3_endpoint_url", moto_server)
+    session = boto3.Session(profile_name=PROFILE)
+    s3 = session.client("s3", region_name="us-east-1", endpoint_url=moto_server)
+    s3.create_bucket(Bucket=BUCKET)
+    yield s3
+    for obj in s3.list_objects_v2(Bucket=BUCKET).get("Contents", []):
+        s3.delete_object(Bucket=BUCKET, Key=obj["Key"])
+    s3.delete_bucket(Bucket=BUCKET)
+
+
+@pytest_asyncio.fixture
+async def aio_client(bucket: Any) -> AsyncIterator[AioS3Client]:
+    client = AioS3Client(PROFILE, BUCKET)
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_list_objects_after_key(aio_client: AioS3Client, bucket: Any) -> None:
+    keys = [f"cam/2024-01-01/chan/{seq:06}/file.png" for seq in range(5)]
+    for key in keys:
+        bucket.put_object(Bucket=BUCKET, Key=key, Body=key.encode())
+    bucket.put_object(Bucket=BUCKET, Key="other/file.png", Body=b"")
+
+    objects = await aio_client.async_list_objects("cam/")
+    assert [o["key"] for o in objects] == keys
+    etag = bucket.head_object(Bucket=BUCKET, Key=keys[0])["ETag"].strip('"')
+    assert objects[0]["hash"] == etag
+
+    objects = await aio_client.async_list_objects("cam/", keys[2])
+    assert [o["key"] for o in objects] == keys[3:]
+    assert await aio_client.async_list_objects("cam/", keys[-1]) == []
+    assert aio_client.executor_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_object(aio_client: AioS3Client, bucket: Any) -> None:
+    data = {"1": {"exposure_time": 30.0}}
+    bucket.put_object(Bucket=BUCKET, Key="cam/metadata.json", Body=json.dumps(data))
+    assert await aio_client.async_get_object("cam/metadata.json") == data
+    assert await aio_client.async_get_object_or_raise("cam/metadata.json") == data
+
+
+@pytest.mark.asyncio
+async def test_missing_keys(aio_client: AioS3Client, bucket: Any) -> None:
+    assert await aio_client.async_get_object("cam/missing.json") == {}
+    assert await aio_client.async_get_object_or_raise("cam/missing.json") == {}
+    with pytest.raises(HTTPException) as e:
+        await aio_client.async_get_raw_object("cam/missing.png")
+    assert e.value.status_code == 404
+    with pytest.raises(HTTPException):
+        await aio_client.async_get_movie("cam/missing.mp4")
+
+    # other errors are only raised when asked for
+    missing_bucket = AioS3Client(PROFILE, "missing-bucket")
+    try:
+        assert await missing_bucket.async_get_object("cam/metadata.json") == {}
+        with pytest.raises(ClientError):
+            await missing_bucket.async_get_object_or_raise("cam/metadata.json")
+    finally:
+        await missing_bucket.close()
+
+
+@pytest.mark.asyncio
+async def test_raw_object_streamed_in_chunks(
+    aio_client: AioS3Client, bucket: Any
+) -> None:
+    body = bytes(range(256)) * 1024
+    bucket.put_object(Bucket=BUCKET, Key="cam/image.png", Body=body)
+
+    stream = await aio_client.async_get_raw_object("cam/image.png")
+    chunks = [chunk async for chunk in stream.iter_chunks(chunk_size=64 * 1024)]
+    assert len(chunks) > 1
+    assert b"".join(chunks) == body
+
+    movie = await aio_client.async_get_movie(
+        "cam/image.png", {"Range": "bytes=1024-2047"}
+    )
+    assert (
+        b"".join([c async for c in movie["Body"].iter_chunks()])
+        == body[slice(1024, 2048)]
+    )
@@ -0,0 +1,69 @@
+import importlib.util
+
+import pytest
+from lsst.ts.rubintv.background.blob_codecs import HistoricalCodec
+from lsst.ts.rubintv.background.historicaldata import HistoricalStore
+from lsst.ts.rubintv.models.models import Event
+
+CODECS = [
+    "pickle+zlib",
+    "pickle+none",
+    pytest.param(
+        "orjson+zlib",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("orjson") is None, reason="needs orjson"
+        ),
+    ),
+]
+
+EVENTS = [
+    Event("lsstcam/2025-01-01/calexp_mosaic/000012/lsstcam_calexp_mosaic_12.png", "a"),
+    Event("lsstcam/2025-01-01/movie/final/lsstcam_movie.mp4", "b"),
+]
+METADATA = {"12": {"Exposure time": 30.0, "Filter": "r", "Seeing": None}}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_round_trips(name: str) -> None:
+    codec = HistoricalCodec(name)
+    events = codec.decode_events(codec.encode_events(EVENTS))
+    assert events == EVENTS
+    assert [e.to_dict() for e in events] == [e.to_dict() for e in EVENTS]
+    assert events[0].camera_name is EVENTS[0].camera_name
+    assert codec.decode(codec.encode(METADATA)) == METADATA
+
+    store = HistoricalStore(codec=codec)
+    store.store_events(EVENTS, "summit")
+    store.compress_events()
+    assert store.copy().get_day_events("summit/lsstcam", "2025-01-01") == EVENTS
+
+
+@pytest.mark.parametrize(
+    "name, module",
+    [
+        ("pickle+zstd", "zstandard"),
+        ("pickle+lz4", "lz4.frame"),
+        ("msgpack+zlib", "msgpack"),
+        ("msgpack+zstd", "zstandard"),
+    ],
+)
+def test_optional_codec_round_trips(name: str, module: str) -> None:
+    pytest.importorskip(module)
+    test_codec_round_trips(name)
+
+
+def test_tagged_blobs_from_other_codecs_are_ignored() -> None:
+    zlib_codec = HistoricalCodec("pickle+zlib")
+    plain_codec = HistoricalCodec("pickle+none")
+    blob = zlib_codec.encode_tagged(METADATA)
+    assert zlib_codec.decode_tagged(blob) == METADATA
+    assert plain_codec.decode_tagged(blob) is None
+    # as are blobs from before they were tagged
+    assert zlib_codec.decode_tagged(zlib_codec.encode(METADATA)) is None
+
+
+def test_unknown_codec_rejected() -> None:
+    with pytest.raises(ValueError):
+        HistoricalCodec("pickle+snappy")
+    with pytest.raises(ValueError):
+        HistoricalCodec("yaml+zlib")
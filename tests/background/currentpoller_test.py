@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from typing import Any, Iterator
 from unittest.mock import AsyncMock, call, patch
@@ -9,11 +10,15 @@ from lsst.ts.rubintv.models.models import Camera, Location, NightReport
 from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
 from lsst.ts.rubintv.models.models import ServiceTypes as Service
 from lsst.ts.rubintv.models.models import get_current_day_obs
-from lsst.ts.rubintv.models.models_helpers import find_first
+from lsst.ts.rubintv.models.models_helpers import (
+    all_objects_to_events,
+    find_first,
+    make_table_from_event_list,
+)
 from lsst.ts.rubintv.models.models_init import ModelsInitiator
 
 from ..conftest import mock_s3_service
-from ..mockdata import RubinDataMocker
+from ..mockdata import RubinDataMocker, get_next_previous_from_table
 
 m = ModelsInitiator()
 
@@ -108,10 +113,10 @@ async def test_clear_todays_data(current_poller: CurrentPoller) -> None:
     await current_poller.poll_buckets_for_todays_data()
 
     assert current_poller.completed_first_poll is True
-    assert current_poller._objects != {}
+    assert current_poller._object_hashes != {}
 
     await current_poller.clear_todays_data()
-    assert current_poller._objects == {}
+    assert current_poller._object_hashes == {}
     assert current_poller._events == {}
     assert current_poller._metadata == {}
     assert current_poller._table == {}
@@ -193,10 +198,321 @@ async def test_make_per_day_data(
                         key=lambda ev: ev.seq_num_force_int(),
                     )
                     last_event = s_events.pop()
-                    expected[name] = last_event.__dict__
+                    expected[name] = last_event.to_dict()
                 assert pd_data == expected
 
 
+@pytest.mark.asyncio
+async def test_poll_lists_only_new_keys(rubin_data_mocker: RubinDataMocker) -> None:
+    camera, location = get_test_camera_and_location()
+    loc_cam = f"{location.name}/{camera.name}"
+    current_poller = CurrentPoller([location], test_mode=True)
+    # a channel that already has objects
+    empty_channel = rubin_data_mocker.empty_channel.get(loc_cam)
+    channel = [c for c in camera.seq_channels() if c.name != empty_channel][0]
+    await current_poller.poll_buckets_for_todays_data()
+
+    rubin_data_mocker.add_seq_objs_for_channel(location, camera, channel, 3)
+    # the channel has just changed, so is listed on every poll for a while
+    chan_prefix = f"{camera.name}/{get_current_day_obs()}/{channel.name}/"
+    current_poller._mark_active(loc_cam, [chan_prefix])
+    client = current_poller._s3clients[location.name]
+    requests = current_poller.get_stats()["list_requests"]
+    with (
+        patch.object(
+            client, "async_list_objects", wraps=client.async_list_objects
+        ) as mock_list,
+        patch.object(
+            current_poller, "diff_objects", wraps=current_poller.diff_objects
+        ) as mock_diff,
+    ):
+        await current_poller.poll_buckets_for_todays_data()
+    # only the new objects are compared with those seen before
+    diffed = [o["key"] for c in mock_diff.call_args_list for o in c.args[1]]
+    assert diffed and all(key.startswith(chan_prefix) for key in diffed)
+    # the three added and the last key, which the mocker writes again
+    assert len(diffed) <= 4
+    assert current_poller.get_stats()["list_requests"] - requests == len(
+        mock_list.call_args_list
+    )
+    # fewer requests than a listing of every channel directory, the
+    # metadata file and the night report
+    cam_calls = [
+        c for c in mock_list.call_args_list if c.args[0].startswith(camera.name)
+    ]
+    assert len(cam_calls) < len(camera.channels) + 2
+
+    polled_keys = {e.key for e in current_poller._events[loc_cam]}
+    assert polled_keys == {e.key for e in rubin_data_mocker.events[loc_cam]}
+    chan_calls = [c for c in mock_list.call_args_list if c.args[0] == chan_prefix]
+    assert len(chan_calls) == 1
+    assert chan_calls[0].args[1] is not None
+    # the whole day's prefix isn't relisted between full listings
+    day_prefix = f"{camera.name}/{get_current_day_obs()}"
+    assert call(day_prefix) not in mock_list.call_args_list
+
+    current_poller._count_polls = current_poller.FULL_LISTING_PERIOD
+    with patch.object(
+        client, "async_list_objects", wraps=client.async_list_objects
+    ) as mock_list:
+        await current_poller.poll_buckets_for_todays_data()
+    assert call(day_prefix) in mock_list.call_args_list
+
+
+@pytest.mark.asyncio
+async def test_quiet_channels_listed_within_period(
+    current_poller: CurrentPoller, rubin_data_mocker: RubinDataMocker
+) -> None:
+    camera, location = get_test_camera_and_location()
+    loc_cam = f"{location.name}/{camera.name}"
+    empty_channel = rubin_data_mocker.empty_channel.get(loc_cam)
+    channel = [c for c in camera.seq_channels() if c.name != empty_channel][0]
+    await current_poller.poll_buckets_for_todays_data()
+
+    rubin_data_mocker.add_seq_objs_for_channel(location, camera, channel, 3)
+    mocked_keys = {e.key for e in rubin_data_mocker.events[loc_cam]}
+    for _ in range(current_poller.QUIET_LISTING_PERIOD):
+        await current_poller.poll_buckets_for_todays_data()
+        if {e.key for e in current_poller._events[loc_cam]} == mocked_keys:
+            break
+    else:
+        pytest.fail("New keys in a quiet channel weren't picked up")
+    # and the channel is then listed on every poll
+    chan_prefix = f"{camera.name}/{get_current_day_obs()}/{channel.name}/"
+    assert current_poller._is_active(
+        current_poller._active_sub_prefixes[loc_cam].get(chan_prefix)
+    )
+
+
+@pytest.mark.asyncio
+async def test_late_keys_in_quiet_channel_before_last_key(
+    current_poller: CurrentPoller, rubin_data_mocker: RubinDataMocker
+) -> None:
+    camera, location = get_test_camera_and_location()
+    loc_cam = f"{location.name}/{camera.name}"
+    prefix = f"{camera.name}/{get_current_day_obs()}"
+    await current_poller.poll_buckets_for_todays_data()
+
+    listing = current_poller._listings[loc_cam]
+    last_key = max(key for keys in listing.values() for key in keys)
+    # the quiet channel directories before the one the last key is in are
+    # listed round-robin, the i-th on polls where the count is i modulo
+    # the period
+    quiet = sorted(
+        chan_prefix
+        for chan_prefix in (f"{prefix}/{c.name}/" for c in camera.channels)
+        if chan_prefix < last_key and not last_key.startswith(chan_prefix)
+    )
+    period = current_poller.QUIET_LISTING_PERIOD
+    next_slot = current_poller._count_polls % period
+    channel = next(
+        c
+        for c in camera.seq_channels()
+        if f"{prefix}/{c.name}/" in quiet
+        and quiet.index(f"{prefix}/{c.name}/") % period != next_slot
+    )
+    rubin_data_mocker.add_seq_objs_for_channel(location, camera, channel, 3)
+    mocked_keys = {e.key for e in rubin_data_mocker.events[loc_cam]}
+
+    # it's not listed on the next poll...
+    await current_poller.poll_buckets_for_todays_data()
+    assert {e.key for e in current_poller._events[loc_cam]} != mocked_keys
+    # ...but is within the period
+    for _ in range(period - 1):
+        await current_poller.poll_buckets_for_todays_data()
+        if {e.key for e in current_poller._events[loc_cam]} == mocked_keys:
+            break
+    else:
+        pytest.fail("Late keys in a quiet channel weren't picked up")
+
+
+@pytest.mark.asyncio
+async def test_process_only_new_objects(
+    current_poller: CurrentPoller, rubin_data_mocker: RubinDataMocker
+) -> None:
+    camera, location = get_test_camera_and_location()
+    loc_cam = f"{location.name}/{camera.name}"
+    await current_poller.poll_buckets_for_todays_data()
+
+    seq_chan, other_chan = camera.seq_channels()[:2]
+    rubin_data_mocker.delete_channel_events(location, camera, other_chan)
+    rubin_data_mocker.add_seq_objs_for_channel(location, camera, seq_chan, 3)
+    # pick up the deletion too
+    current_poller.FULL_LISTING_PERIOD = 1
+    with patch(
+        f"{rtv_root}.background.currentpoller.all_objects_to_events",
+        wraps=all_objects_to_events,
+    ) as mock_to_events:
+        await current_poller.poll_buckets_for_todays_data()
+    parsed = [o for c in mock_to_events.call_args_list for o in c.args[0]]
+    assert 0 < len(parsed) <= 3
+
+    events = current_poller._events[loc_cam]
+    # the mocker re-adds the channel's last key, so dedupe its events
+    mocked_keys = sorted({e.key for e in rubin_data_mocker.events[loc_cam]})
+    assert [e.key for e in events] == mocked_keys
+    assert not any(e.channel_name == other_chan.name for e in events)
+    # the patched table matches one built from scratch
+    table = await make_table_from_event_list(events, camera.seq_channels())
+    assert current_poller._table[loc_cam] == table
+    assert list(current_poller._table[loc_cam]) == list(table)
+    # as is the next/previous index, added to and removed from as it went
+    for event in events:
+        assert await current_poller.get_next_prev_event(
+            location.name, event
+        ) == get_next_previous_from_table(table, event)
+
+
+@patch(f"{rtv_root}.background.currentpoller.notify_ws_clients", new_callable=AsyncMock)
+@pytest.mark.asyncio
+async def test_table_and_metadata_patches(
+    mock_notify_ws_clients: AsyncMock, mock_s3_client: Any
+) -> None:
+    with mock_s3_service():
+        mocker = RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+        camera, location = get_test_camera_and_location()
+        loc_cam = f"{location.name}/{camera.name}"
+        current_poller = CurrentPoller([location], test_mode=True)
+        # list every channel on every poll, so the new keys are picked up
+        # whichever channel they're in
+        current_poller.QUIET_LISTING_PERIOD = 1
+
+        def camera_calls() -> dict:
+            return {
+                c.args[1]: c.args[3:]
+                for c in mock_notify_ws_clients.call_args_list
+                if c.args[0] == Service.CAMERA and c.args[2] == loc_cam
+            }
+
+        await current_poller.poll_buckets_for_todays_data()
+        calls = camera_calls()
+        assert calls[MessageType.CAMERA_TABLE] == (current_poller._table[loc_cam], 1)
+        metadata = current_poller._metadata[loc_cam]
+        assert calls[MessageType.CAMERA_METADATA] == (metadata, 1)
+
+        empty_channel = mocker.empty_channel.get(loc_cam)
+        channel = [c for c in camera.seq_channels() if c.name != empty_channel][0]
+        mocker.add_seq_objs_for_channel(location, camera, channel, 2)
+        md_key = f"{camera.name}/{mocker.day_obs}/metadata.json"
+        new_md = {k: v for k, v in metadata.items() if k != "0"}
+        new_md["1"] = {"exposure_time": 1.0}
+        mocker.upload_fileobj(new_md, location.bucket_name, md_key)
+        mock_notify_ws_clients.reset_mock()
+
+        await current_poller.poll_buckets_for_todays_data()
+        calls = camera_calls()
+        assert MessageType.CAMERA_TABLE not in calls
+        assert MessageType.CAMERA_METADATA not in calls
+        table_rows, version = calls[MessageType.CAMERA_TABLE_PATCH]
+        assert version == 2
+        new_seq = max(current_poller._table[loc_cam])
+        assert list(table_rows) == [new_seq]
+        assert table_rows[new_seq] == current_poller._table[loc_cam][new_seq]
+        assert calls[MessageType.CAMERA_METADATA_PATCH] == (
+            {"0": None, "1": {"exposure_time": 1.0}},
+            2,
+        )
+        assert (
+            current_poller.get_data_version(
+                location.name, camera, MessageType.CAMERA_TABLE
+            )
+            == 2
+        )
+
+
+@pytest.mark.asyncio
+async def test_poll_cameras_concurrently_within_limit(
+    rubin_data_mocker: RubinDataMocker,
+) -> None:
+    _, location = get_test_camera_and_location()
+    location = location.model_copy(update={"poll_concurrency": 2})
+    online = [c for c in location.cameras if c.online]
+    assert len(online) > 2
+    current_poller = CurrentPoller([location], test_mode=True)
+
+    running = 0
+    max_running = 0
+
+    async def slow_list(*args: Any) -> list:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return []
+
+    with patch.object(current_poller, "list_camera_objects", side_effect=slow_list):
+        await current_poller.poll_buckets_for_todays_data()
+
+    assert max_running == 2
+    loc_cams = {f"{location.name}/{c.name}" for c in online}
+    assert set(current_poller._camera_times) == loc_cams
+
+
+@pytest.mark.asyncio
+async def test_metadata_only_fetched_when_etag_changes(mock_s3_client: Any) -> None:
+    with mock_s3_service():
+        mocker = RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+        camera, location = get_test_camera_and_location()
+        loc_cam = f"{location.name}/{camera.name}"
+        current_poller = CurrentPoller([location], test_mode=True)
+
+        await current_poller.poll_buckets_for_todays_data()
+        fetched = current_poller.get_stats()["metadata_fetched"]
+        assert fetched > 0
+        assert current_poller._metadata[loc_cam]
+
+        await current_poller.poll_buckets_for_todays_data()
+        stats = current_poller.get_stats()
+        assert stats["metadata_fetched"] == fetched
+        assert stats["metadata_skipped"] == fetched
+
+        md_key = f"{camera.name}/{mocker.day_obs}/metadata.json"
+        new_md = {"1": {"exposure_time": 1.0}}
+        mocker.upload_fileobj(new_md, location.bucket_name, md_key)
+        await current_poller.poll_buckets_for_todays_data()
+        assert current_poller.get_stats()["metadata_fetched"] == fetched + 1
+        assert current_poller._metadata[loc_cam] == new_md
+
+
+@pytest.mark.asyncio
+async def test_failed_metadata_fetch_is_retried(
+    mock_s3_client: Any, monkeypatch: Any
+) -> None:
+    with mock_s3_service():
+        mocker = RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+        camera, location = get_test_camera_and_location()
+        loc_cam = f"{location.name}/{camera.name}"
+        md_key = f"{camera.name}/{mocker.day_obs}/metadata.json"
+        current_poller = CurrentPoller([location], test_mode=True)
+        client = current_poller._s3clients[location.name]
+        get_object = client.async_get_object
+        failures: list[Any] = [{}, ConnectionError("dropped")]
+        attempts = 0
+
+        async def failing_get_object(key: str) -> dict:
+            nonlocal attempts
+            if key == md_key:
+                attempts += 1
+                if failures:
+                    failure = failures.pop(0)
+                    if isinstance(failure, Exception):
+                        raise failure
+                    return failure
+            return await get_object(key)
+
+        monkeypatch.setattr(client, "async_get_object", failing_get_object)
+        # the file's ETag doesn't change, but it's fetched until it's got
+        await current_poller.poll_buckets_for_todays_data()
+        assert loc_cam not in current_poller._metadata
+        await current_poller.poll_buckets_for_todays_data()
+        assert loc_cam not in current_poller._metadata
+        await current_poller.poll_buckets_for_todays_data()
+        assert current_poller._metadata[loc_cam] == await get_object(md_key)
+        await current_poller.poll_buckets_for_todays_data()
+        assert attempts == 3
+
+
 @pytest.mark.asyncio
 @patch(f"{rtv_root}.background.currentpoller.get_current_day_obs", autospec=True)
 @patch(f"{cp_path}.clear_todays_data", new_callable=AsyncMock)
@@ -245,8 +561,9 @@ async def test_pick_up_yesterdays_movie(
     await current_poller.poll_buckets_for_todays_data()
     assert current_poller.completed_first_poll is True
 
-    # clear movie channel
+    # clear movie channel. Deletions are only seen by a full listing.
     mocked.delete_channel_events(location, camera, channel)
+    current_poller.FULL_LISTING_PERIOD = 1
     await current_poller.poll_buckets_for_todays_data()
 
     # rollover day obs
@@ -275,7 +592,7 @@ async def test_pick_up_yesterdays_movie(
     service_type = Service.CAMERA
     message_type = MessageType.CAMERA_PD_BACKDATED
     loc_cam = f"{location.name}/{camera.name}"
-    payload = {channel.name: last_event.__dict__}
+    payload = {channel.name: last_event.to_dict()}
     mock_notify_ws_clients.assert_called_once_with(
         service_type, message_type, loc_cam, payload
     )
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from lsst.ts.rubintv.background.download_scheduler import DownloadScheduler
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_per_location() -> None:
+    scheduler = DownloadScheduler(max_concurrency=2, retries=0, backoff=0)
+    in_flight = {"a": 0, "b": 0}
+    most_in_flight = {"a": 0, "b": 0}
+
+    async def download(locname: str) -> str:
+        in_flight[locname] += 1
+        most_in_flight[locname] = max(most_in_flight[locname], in_flight[locname])
+        await asyncio.sleep(0.01)
+        in_flight[locname] -= 1
+        return locname
+
+    progress: list[tuple[int, int]] = []
+    items = ["a", "b"] * 5
+    results = await scheduler.fetch_all(
+        items,
+        lambda loc: scheduler.fetch(loc, lambda: download(loc)),
+        lambda done, total: progress.append((done, total)),
+    )
+    assert results == items
+    assert most_in_flight == {"a": 2, "b": 2}
+    assert progress == [(n, 10) for n in range(1, 11)]
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_are_retried() -> None:
+    scheduler = DownloadScheduler(max_concurrency=1, retries=2, backoff=0.001)
+    attempts = 0
+
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError("dropped")
+        return "done"
+
+    assert await scheduler.fetch("a", flaky) == "done"
+    assert scheduler.stats()["retried"] == 2
+
+    async def broken() -> str:
+        raise ConnectionError("dropped")
+
+    with pytest.raises(ConnectionError):
+        await scheduler.fetch("a", broken)
+    assert scheduler.stats()["failed"] == 1
+    assert scheduler.stats()["in_flight"] == 0
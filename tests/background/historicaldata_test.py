@@ -1,11 +1,23 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
 from typing import Any, Iterator
+from unittest.mock import patch
 
 import pytest
-from lsst.ts.rubintv.background.historicaldata import HistoricalPoller
+from botocore.exceptions import ClientError
+from lsst.ts.rubintv.background import currentpoller, historicaldata
+from lsst.ts.rubintv.background.currentpoller import CurrentPoller
+from lsst.ts.rubintv.background.historicaldata import HistoricalPoller, HistoricalStore
+from lsst.ts.rubintv.config import config
+from lsst.ts.rubintv.models import models_helpers
+from lsst.ts.rubintv.models.key_parser import parse_event_objects_pooled
+from lsst.ts.rubintv.models.models import Event, get_current_day_obs
+from lsst.ts.rubintv.models.models_helpers import date_str_to_date
 from lsst.ts.rubintv.models.models_init import ModelsInitiator
 
 from ..conftest import mock_s3_service
-from ..mockdata import RubinDataMocker
+from ..mockdata import RubinDataMocker, get_next_previous_from_table
 
 m = ModelsInitiator()
 
@@ -28,5 +40,514 @@ def c_poller_no_mock_data(rubin_data_mocker: RubinDataMocker) -> Any:
         yield HistoricalPoller(m.locations)
 
 
+def all_events(store: HistoricalStore) -> dict[str, list[str]]:
+    """Return the keys of all the store's events, by loc_cam."""
+    return {
+        loc_cam: sorted(
+            e.key
+            for day_obs in store.get_days(loc_cam)
+            for e in store.get_day_events(loc_cam, day_obs)
+        )
+        for loc_cam in store.compressed_events
+    }
+
+
 # TODO : Write tests for the HistoricalData class.
 # see DM-44273
+
+
+@pytest.mark.asyncio
+async def test_reload_resumes_from_index(
+    mock_s3_client: Any, tmp_path: Path, monkeypatch: Any
+) -> None:
+    RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+    past = get_current_day_obs() - timedelta(days=1)
+    RubinDataMocker(m.locations, day_obs=past, s3_required=True)
+    index_path = str(tmp_path / "historical.sqlite3")
+    first = HistoricalPoller(m.locations, test_mode=True, index_path=index_path)
+    await first.check_for_new_day()
+    assert first._store.metadata
+    first_metadata = {
+        name: await first._load_metadata(name.partition("/")[0], *md_obj)
+        for name, md_obj in first._store.metadata.items()
+    }
+    assert all(first_metadata.values())
+    first.close()
+
+    second = HistoricalPoller(m.locations, test_mode=True, index_path=index_path)
+    second.recent_days = 0
+    listings: list[tuple[str, str | None]] = []
+    fetched: list[str] = []
+    for client in {id(c): c for c in second._clients.values()}.values():
+
+        async def list_objects(
+            prefix: str,
+            start_after: str | None = None,
+            _list: Any = client.async_list_objects,
+        ) -> list[dict[str, str]]:
+            listings.append((prefix, start_after))
+            return await _list(prefix, start_after)
+
+        async def get_object(
+            key: str, _get: Any = client.async_get_object_or_raise
+        ) -> dict:
+            fetched.append(key)
+            return await _get(key)
+
+        monkeypatch.setattr(client, "async_list_objects", list_objects)
+        monkeypatch.setattr(client, "async_get_object_or_raise", get_object)
+
+    with patch(
+        "lsst.ts.rubintv.background.historicaldata.all_objects_to_events",
+        wraps=historicaldata.all_objects_to_events,
+    ) as mock_to_events:
+        await second.check_for_new_day()
+    second_metadata = {
+        name: await second._load_metadata(name.partition("/")[0], *md_obj)
+        for name, md_obj in second._store.metadata.items()
+    }
+    second.close()
+
+    # only the most recent indexed day onwards is listed again...
+    today = get_current_day_obs().isoformat()
+    resumed = [(p, a) for p, a in listings if a is not None]
+    assert resumed
+    for prefix, start_after in resumed:
+        assert start_after == f"{prefix}{today}"
+    # ...and metadata with an unchanged ETag isn't downloaded again
+    assert fetched == []
+    # indexed events are loaded from their stored parts, so only the keys
+    # listed again are parsed
+    parsed = [o["key"] for c in mock_to_events.call_args_list for o in c.args[0]]
+    assert parsed
+    assert all(key.split("/")[1] == today for key in parsed)
+    assert any(
+        key.split("/")[1] == past.isoformat()
+        for keys in all_events(second._store).values()
+        for key in keys
+    )
+
+    assert second._store.calendar == first._store.calendar
+    assert second._store.metadata == first._store.metadata
+    assert second_metadata == first_metadata
+    assert all_events(second._store) == all_events(first._store)
+
+
+@pytest.mark.asyncio
+async def test_reload_serves_current_data_until_swapped(
+    rubin_data_mocker: RubinDataMocker, monkeypatch: Any
+) -> None:
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    await historical.check_for_new_day()
+    old_store = historical._store
+    assert old_store.calendar
+
+    release = asyncio.Event()
+    refresh = historical._refresh_camera_store
+
+    async def slow_refresh(location: Any, camera: Any, store: HistoricalStore) -> None:
+        await release.wait()
+        await refresh(location, camera, store)
+
+    progress: list[dict[str, int]] = []
+
+    async def record_progress(data: dict[str, int]) -> None:
+        progress.append(data)
+
+    monkeypatch.setattr(historical, "_refresh_camera_store", slow_refresh)
+    monkeypatch.setattr(historicaldata, "notify_historical_progress", record_progress)
+
+    await historical.trigger_reload_everything()
+    reload = asyncio.create_task(historical.check_for_new_day())
+    await asyncio.sleep(0.1)
+    # the reload is underway but the current data is still served
+    assert not await historical.is_busy()
+    assert historical._store is old_store
+
+    release.set()
+    await reload
+    assert historical._store is not old_store
+    assert historical._store.calendar == old_store.calendar
+    total = len(m.locations)
+    assert progress == [{"done": i, "total": total} for i in range(1, total + 1)]
+
+
+@pytest.mark.asyncio
+async def test_rollover_takes_day_from_current_poller(
+    mock_s3_client: Any, monkeypatch: Any
+) -> None:
+    RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    await historical.check_for_new_day()
+    full_store = historical._store
+
+    current_poller = CurrentPoller(
+        m.locations,
+        test_mode=True,
+        on_day_rollover=historical.receive_day_handoff,
+    )
+    await current_poller.poll_buckets_for_todays_data()
+
+    # roll both pollers over to tomorrow, the current poller first
+    today = get_current_day_obs()
+    tomorrow = today + timedelta(days=1)
+    for module in (historicaldata, currentpoller):
+        monkeypatch.setattr(module, "get_current_day_obs", lambda: tomorrow)
+    current_poller._test_iterations = 1
+    await current_poller.poll_buckets_for_todays_data()
+
+    listings: list[str] = []
+    fetched: list[str] = []
+    for client in {id(c): c for c in historical._clients.values()}.values():
+
+        async def list_objects(
+            prefix: str,
+            start_after: str | None = None,
+            _list: Any = client.async_list_objects,
+        ) -> list[dict[str, str]]:
+            listings.append(prefix)
+            return await _list(prefix, start_after)
+
+        async def get_object(
+            key: str, _get: Any = client.async_get_object_or_raise
+        ) -> dict:
+            fetched.append(key)
+            return await _get(key)
+
+        monkeypatch.setattr(client, "async_list_objects", list_objects)
+        monkeypatch.setattr(client, "async_get_object_or_raise", get_object)
+
+    await historical.check_for_new_day()
+
+    # only the day that's ended is listed, to check the hand-off...
+    assert listings
+    assert all(prefix.split("/")[1] == today.isoformat() for prefix in listings)
+    # ...and metadata the current poller had downloaded isn't fetched again
+    assert fetched == []
+    assert historical._last_reload == tomorrow
+
+    store = historical._store
+    assert store is not full_store
+    assert store.calendar == full_store.calendar
+    assert store.metadata.keys() == full_store.metadata.keys()
+    assert all_events(store) == all_events(full_store)
+    assert store.latest_events == full_store.latest_events
+    assert store.seq_channels == full_store.seq_channels
+
+
+def test_store_partitions_events_by_day() -> None:
+    def make_event(day_obs: str, seq_num: int) -> Event:
+        return Event(
+            key=f"auxtel/{day_obs}/monitor/{seq_num:06}/auxtel_monitor_{seq_num}.png"
+        )
+
+    store = HistoricalStore()
+    store.store_events(
+        [
+            make_event(day, seq)
+            for day in ("2024-01-02", "2024-01-01")
+            for seq in (1, 2)
+        ],
+        "summit",
+    )
+    store.compress_events()
+    loc_cam = "summit/auxtel"
+    assert store.get_days(loc_cam) == ["2024-01-01", "2024-01-02"]
+    assert [e.seq_num for e in store.get_day_events(loc_cam, "2024-01-01")] == [1, 2]
+    assert store.get_day_events(loc_cam, "2024-01-03") == []
+
+    # replacing a day leaves the other days' partitions as they were
+    first_day = store.compressed_events[loc_cam]["2024-01-01"]
+    store.replace_day_events(loc_cam, "2024-01-02", [make_event("2024-01-02", 5)])
+    assert store.compressed_events[loc_cam]["2024-01-01"] is first_day
+    assert [e.seq_num for e in store.get_day_events(loc_cam, "2024-01-02")] == [5]
+    assert store.calendar[loc_cam][2024][1] == {1: 2, 2: 5}
+
+    # a copy shares each camera's calendar until it's changed
+    store.store_events([make_event("2024-01-01", 1)], "other")
+    copied = store.copy()
+    assert copied.calendar["other/auxtel"] is store.calendar["other/auxtel"]
+    copied.replace_day_events(loc_cam, "2024-01-01", [make_event("2024-01-01", 7)])
+    copied.add_to_calendar(loc_cam, "2024-01-03", 1)
+    assert copied.calendar[loc_cam][2024][1] == {1: 7, 2: 5, 3: 1}
+    assert store.calendar[loc_cam][2024][1] == {1: 2, 2: 5}
+    assert copied.calendar["other/auxtel"] is store.calendar["other/auxtel"]
+    store.add_to_calendar("other/auxtel", "2024-01-05", 1)
+    assert 5 not in copied.calendar["other/auxtel"][2024][1]
+
+
+def test_store_indexes_latest_events_and_seq_channels() -> None:
+    def make_event(day_obs: str, channel: str, seq_num: int) -> Event:
+        return Event(
+            key=f"auxtel/{day_obs}/{channel}/{seq_num:06}/auxtel_{seq_num}.png"
+        )
+
+    store = HistoricalStore()
+    store.store_events(
+        [
+            make_event("2024-01-01", "monitor", 1),
+            make_event("2024-01-01", "monitor", 2),
+            make_event("2024-01-01", "mount", 1),
+            make_event("2024-01-02", "monitor", 1),
+        ],
+        "summit",
+    )
+    store.compress_events()
+    loc_cam = "summit/auxtel"
+    assert store.latest_events[loc_cam] == {
+        "monitor": make_event("2024-01-02", "monitor", 1),
+        "mount": make_event("2024-01-01", "mount", 1),
+    }
+    assert store.seq_channels[loc_cam]["2024-01-01"] == {
+        1: ("monitor", "mount"),
+        2: ("monitor",),
+    }
+
+    # replacing a day in a copy leaves the original's indexes as they were
+    copied = store.copy()
+    copied.replace_day_events(
+        loc_cam, "2024-01-02", [make_event("2024-01-02", "mount", 3)]
+    )
+    assert copied.latest_events[loc_cam] == {
+        "monitor": make_event("2024-01-01", "monitor", 2),
+        "mount": make_event("2024-01-02", "mount", 3),
+    }
+    assert copied.seq_channels[loc_cam]["2024-01-02"] == {3: ("mount",)}
+    assert store.latest_events[loc_cam]["monitor"].day_obs == "2024-01-02"
+    assert store.seq_channels[loc_cam]["2024-01-02"] == {1: ("monitor",)}
+
+
+@pytest.mark.asyncio
+async def test_day_tables_cached_until_store_swapped(
+    rubin_data_mocker: RubinDataMocker,
+) -> None:
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    await historical.check_for_new_day()
+    location = m.locations[0]
+    camera = next(
+        cam
+        for cam in location.cameras
+        if cam.online
+        and cam.seq_channels()
+        and historical.flatten_calendar(location, cam)
+    )
+    day_obs = date_str_to_date(max(historical.flatten_calendar(location, camera)))
+
+    table = await historical.get_channel_data_for_date(location, camera, day_obs)
+    assert table
+    assert await historical.get_channel_data_for_date(location, camera, day_obs) is (
+        table
+    )
+    assert historical.get_cache_stats()["days"]["hits"] == 1
+
+    # next/prev lookups from the cache agree with searching the table
+    events = await historical.get_events_for_date(location, camera, day_obs)
+    for event in events[:20]:
+        if event.channel_name in {c.name for c in camera.seq_channels()}:
+            assert await historical.get_next_prev_event(
+                location, camera, event
+            ) == get_next_previous_from_table(table, event)
+
+    await historical.trigger_reload_everything()
+    await historical.check_for_new_day()
+    assert historical.get_cache_stats()["days"]["entries"] == 0
+    assert await historical.get_channel_data_for_date(location, camera, day_obs) == (
+        table
+    )
+
+
+@pytest.mark.asyncio
+async def test_metadata_fetched_on_demand(
+    mock_s3_client: Any, monkeypatch: Any
+) -> None:
+    RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    fetched: list[str] = []
+    for client in {id(c): c for c in historical._clients.values()}.values():
+
+        async def get_object(
+            key: str, _get: Any = client.async_get_object_or_raise
+        ) -> dict:
+            fetched.append(key)
+            return await _get(key)
+
+        monkeypatch.setattr(client, "async_get_object_or_raise", get_object)
+
+    await historical.check_for_new_day()
+    assert historical._store.metadata
+    assert fetched == []
+
+    location, camera, day_obs = next(
+        (loc, cam, date_str_to_date(name.rpartition("/")[2]))
+        for name in sorted(historical._store.metadata)
+        for loc in m.locations
+        for cam in loc.cameras
+        if name.rpartition("/")[0] == f"{loc.name}/{cam.name}" and not cam.metadata_from
+    )
+    md = await historical.get_metadata_for_date(location, camera, day_obs)
+    assert md
+    assert len(fetched) == 1
+    assert await historical.get_metadata_for_date(location, camera, day_obs) is md
+    assert len(fetched) == 1
+
+    # the most recent days are prefetched after a reload
+    historical.metadata_prefetch_days = 1
+    await historical.trigger_reload_everything()
+    await historical.check_for_new_day()
+    assert historical._prefetch_task is not None
+    await historical._prefetch_task
+    # what was already fetched is cached by ETag, so survives the reload
+    assert fetched.count(fetched[0]) == 1
+    assert len(fetched) == len(
+        {name.rpartition("/")[0] for name in historical._store.metadata}
+    )
+    historical.close()
+
+
+@pytest.mark.asyncio
+async def test_first_load_serves_recent_days_first(
+    rubin_data_mocker: RubinDataMocker, monkeypatch: Any
+) -> None:
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    historical.recent_days = 1
+    release = asyncio.Event()
+    refresh = historical._refresh_camera_store
+
+    async def slow_refresh(location: Any, camera: Any, store: HistoricalStore) -> None:
+        await release.wait()
+        await refresh(location, camera, store)
+
+    readiness: list[dict[str, str]] = []
+
+    async def record_readiness(data: dict[str, str]) -> None:
+        readiness.append(data)
+
+    monkeypatch.setattr(historical, "_refresh_camera_store", slow_refresh)
+    monkeypatch.setattr(historicaldata, "notify_historical_readiness", record_readiness)
+    assert set(historical.get_readiness().values()) == {"loading"}
+
+    load = asyncio.create_task(historical.check_for_new_day())
+    await asyncio.sleep(0.5)
+    # today's data is served before the rest of the history is loaded
+    assert not await historical.is_busy()
+    assert set(historical.get_readiness().values()) == {"recent"}
+    today = get_current_day_obs().isoformat()
+    recent_events = all_events(historical._store)
+    assert any(recent_events.values())
+    for loc_cam, keys in recent_events.items():
+        assert all(key.split("/")[1] == today for key in keys)
+
+    release.set()
+    await load
+    assert set(historical.get_readiness().values()) == {"complete"}
+    assert readiness[-1] == historical.get_readiness()
+    # each camera's full history is swapped in, including the older days
+    for loc_cam, keys in all_events(historical._store).items():
+        assert set(recent_events.get(loc_cam, [])) <= set(keys)
+
+
+@pytest.mark.asyncio
+async def test_full_load_parses_large_listings_in_pool(
+    rubin_data_mocker: RubinDataMocker, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr(models_helpers, "POOLED_PARSE_THRESHOLD", 1)
+    monkeypatch.setattr(config, "key_parse_processes", 1)
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    try:
+        with patch(
+            "lsst.ts.rubintv.models.models_helpers.parse_event_objects_pooled",
+            wraps=parse_event_objects_pooled,
+        ) as mock_pooled:
+            await historical.check_for_new_day()
+    finally:
+        models_helpers.shutdown_parse_pool()
+        historical.close()
+
+    parsed = {o["key"] for c in mock_pooled.call_args_list for o in c.args[0]}
+    stored = all_events(historical._store)
+    assert any(stored.values())
+    for keys in stored.values():
+        assert set(keys) <= parsed
+
+
+@pytest.mark.asyncio
+async def test_metadata_download_retried_on_errors(
+    mock_s3_client: Any, monkeypatch: Any
+) -> None:
+    RubinDataMocker(m.locations, s3_required=True, include_metadata=True)
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    historical.metadata_prefetch_days = 0
+    historical._downloads.backoff = 0.001
+    attempts: list[str] = []
+    to_fail = [2]
+    for client in {id(c): c for c in historical._clients.values()}.values():
+
+        async def get_object(
+            key: str, _get: Any = client.async_get_object_or_raise
+        ) -> dict:
+            attempts.append(key)
+            if to_fail[0]:
+                to_fail[0] -= 1
+                raise ClientError(
+                    {"Error": {"Code": "SlowDown", "Message": "Slow down"}},
+                    "GetObject",
+                )
+            return await _get(key)
+
+        monkeypatch.setattr(client, "async_get_object_or_raise", get_object)
+
+    await historical.check_for_new_day()
+    location, camera, day_obs = next(
+        (loc, cam, date_str_to_date(name.rpartition("/")[2]))
+        for name in sorted(historical._store.metadata)
+        for loc in m.locations
+        for cam in loc.cameras
+        if name.rpartition("/")[0] == f"{loc.name}/{cam.name}" and not cam.metadata_from
+    )
+    assert await historical.get_metadata_for_date(location, camera, day_obs)
+    assert len(attempts) == 3
+    assert historical.get_download_stats()["retried"] == 2
+
+    # a failed download isn't cached, so is tried again
+    historical._metadata_cache.clear()
+    attempts.clear()
+    to_fail[0] = 1
+    historical._downloads.retries = 0
+    assert await historical.get_metadata_for_date(location, camera, day_obs) == {}
+    assert await historical.get_metadata_for_date(location, camera, day_obs)
+    assert len(attempts) == 2
+    historical.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_camera_loads_are_retried(
+    rubin_data_mocker: RubinDataMocker, monkeypatch: Any
+) -> None:
+    historical = HistoricalPoller(m.locations, test_mode=True)
+    failing = next(iter(historical.get_readiness()))
+    refresh = historical._refresh_camera_store
+
+    async def failing_refresh(
+        location: Any, camera: Any, store: HistoricalStore
+    ) -> None:
+        if f"{location.name}/{camera.name}" == failing:
+            raise ConnectionError("dropped")
+        await refresh(location, camera, store)
+
+    monkeypatch.setattr(historical, "_refresh_camera_store", failing_refresh)
+    await historical.check_for_new_day()
+    readiness = historical.get_readiness()
+    assert readiness.pop(failing) == "failed"
+    assert set(readiness.values()) == {"complete"}
+
+    # not tried again until it's due
+    monkeypatch.setattr(historical, "_refresh_camera_store", refresh)
+    await historical.check_for_new_day()
+    assert historical.get_readiness()[failing] == "failed"
+
+    historical._retry_failed_at = 0
+    await historical.check_for_new_day()
+    assert set(historical.get_readiness().values()) == {"complete"}
+    assert all_events(historical._store)[failing] == sorted(
+        e.key for e in rubin_data_mocker.events[failing]
+    )
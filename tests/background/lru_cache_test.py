@@ -0,0 +1,60 @@
+import sys
+from typing import Any
+
+from lsst.ts.rubintv.background.background_helpers import NextPrevIndex
+from lsst.ts.rubintv.background.lru_cache import SizedLRUCache, estimate_size
+
+
+def test_evicts_least_recently_used_to_stay_within_limit() -> None:
+    value_size = estimate_size("x" * 100)
+    cache = SizedLRUCache(max_bytes=value_size * 2)
+    cache.put("a", "a" * 100)
+    cache.put("b", "b" * 100)
+    assert cache.get("a") == "a" * 100
+    cache.put("c", "c" * 100)
+
+    # "b" was the least recently used when "c" was added
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 100
+    assert cache.get("c") == "c" * 100
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["entries"] == 2
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_does_not_cache_values_over_limit() -> None:
+    cache = SizedLRUCache(max_bytes=estimate_size("x" * 10))
+    cache.put("big", "x" * 1000)
+    assert cache.get("big") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_clear_counts_invalidation() -> None:
+    cache = SizedLRUCache(max_bytes=1024)
+    cache.put("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_estimate_scales_with_entries() -> None:
+    def deep_size(value: Any) -> int:
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+        elif isinstance(value, list):
+            size += sum(deep_size(v) for v in value)
+        return size
+
+    table = {
+        seq: {"chan": {"key": f"cam/2024-01-01/chan/{seq:06}.png", "hash": "abc"}}
+        for seq in range(1000)
+    }
+    estimate = estimate_size(table)
+    assert deep_size(table) / 2 < estimate < deep_size(table) * 2
+    assert estimate_size([table] * 10) > 10 * estimate
+    # objects are estimated from their attributes
+    index = NextPrevIndex.from_table(table)
+    assert estimate_size(index) > estimate_size(table) / 2
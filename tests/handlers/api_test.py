@@ -1,4 +1,5 @@
 import asyncio
+from datetime import timedelta
 
 import pytest
 from fastapi import FastAPI
@@ -116,3 +117,50 @@ async def test_get_api_camera_for_today(
     data = response.json()
     assert "channelData" in data
     assert data["channelData"] != {}
+
+
+@pytest.mark.asyncio
+async def test_get_api_historical_status(
+    mocked_client: tuple[AsyncClient, FastAPI, RubinDataMocker],
+) -> None:
+    """Test that the historical status gives each online camera's readiness,
+    and that one camera still loading doesn't block another's pages"""
+    client, app, _ = mocked_client
+
+    hp: HistoricalPoller = app.state.historical
+    while await hp.is_busy():
+        await asyncio.sleep(0.1)
+
+    response = await client.get("/rubintv/api/historical_status")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["busy"] is False
+    online = {
+        f"{loc.name}/{cam.name}"
+        for loc in m.locations
+        for cam in loc.cameras
+        if cam.online
+    }
+    assert set(data["cameras"]) == online
+
+    hp._readiness["usdf/lsstcam"] = "loading"
+    today = get_current_day_obs()
+    yesterday = today - timedelta(days=1)
+    response = await client.get(f"/rubintv/api/usdf/lsstcam/metadata/{yesterday}")
+    assert response.status_code == 423
+    other = next(
+        loc_cam.split("/")[1]
+        for loc_cam in online
+        if loc_cam.startswith("usdf/") and loc_cam != "usdf/lsstcam"
+    )
+    response = await client.get(f"/rubintv/api/usdf/{other}/metadata/{yesterday}")
+    assert response.status_code == 200
+
+    # only the recent days are available until the camera is complete
+    hp._readiness["usdf/lsstcam"] = "recent"
+    hp._recent_since = today
+    response = await client.get(f"/rubintv/api/usdf/lsstcam/metadata/{today}")
+    assert response.status_code == 200
+    response = await client.get(f"/rubintv/api/usdf/lsstcam/metadata/{yesterday}")
+    assert response.status_code == 423
+    hp._readiness["usdf/lsstcam"] = "complete"
@@ -24,3 +24,25 @@ async def test_get_index(
     assert isinstance(data["description"], str)
     assert isinstance(data["repository_url"], str)
     assert isinstance(data["documentation_url"], str)
+
+
+@pytest.mark.asyncio
+async def test_get_stats(
+    mocked_client: tuple[AsyncClient, FastAPI, RubinDataMocker],
+) -> None:
+    """Test ``GET /stats``"""
+    client, app, mocker = mocked_client
+    response = await client.get("/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["s3_pool"]["cached_clients"] > 0
+    assert set(data["current_poller"]) >= {
+        "metadata_fetched",
+        "metadata_skipped",
+        "list_requests",
+    }
+    assert data["websocket_queues"]["clients"] == 0
+    assert data["subscriptions"]["subscriptions"] == 0
+    for cache in ("days", "metadata"):
+        assert set(data["historical_cache"][cache]) >= {"hits", "misses", "evictions"}
+    assert data["historical_downloads"]["failed"] == 0
@@ -0,0 +1,77 @@
+import base64
+import gzip
+import json
+import uuid
+from typing import Iterator
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from lsst.ts.rubintv.handlers import websocket_notifiers
+from lsst.ts.rubintv.handlers.websockets_clients import clients, subscriptions
+from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
+from lsst.ts.rubintv.models.models import ServiceTypes as Service
+
+
+@pytest.fixture
+def websockets() -> Iterator[dict[uuid.UUID, AsyncMock]]:
+    websockets = {uuid.uuid4(): AsyncMock() for _ in range(3)}
+    clients.update(websockets)
+    yield websockets
+    for client_id in websockets:
+        clients.pop(client_id, None)
+
+
+@pytest.mark.asyncio
+async def test_notify_clients_encodes_once(
+    websockets: dict[uuid.UUID, AsyncMock],
+) -> None:
+    payload = {"1": {"chan": {"key": "a"}}}
+    with patch.object(
+        websocket_notifiers,
+        "encode_notification",
+        wraps=websocket_notifiers.encode_notification,
+    ) as mock_encode:
+        await websocket_notifiers.notify_clients(
+            list(websockets), Service.CAMERA, MessageType.CAMERA_TABLE, payload, 3
+        )
+    mock_encode.assert_called_once()
+
+    frames = [ws.send_text.call_args.args[0] for ws in websockets.values()]
+    assert len(set(frames)) == 1
+    message = json.loads(frames[0])
+    assert message["service"] == Service.CAMERA.value
+    assert message["dataType"] == MessageType.CAMERA_TABLE.value
+    assert message["version"] == 3
+    decoded = gzip.decompress(base64.b64decode(message["payload"]))
+    assert json.loads(decoded) == payload
+
+
+@pytest.mark.asyncio
+async def test_large_payload_compressed_off_loop() -> None:
+    payload = {"data": "x" * (websocket_notifiers.OFF_LOOP_COMPRESS_SIZE + 1)}
+    with patch("asyncio.to_thread", wraps=websocket_notifiers.asyncio.to_thread) as m:
+        frame = await websocket_notifiers.encode_notification(
+            Service.CAMERA, MessageType.CAMERA_METADATA, payload
+        )
+    m.assert_called_once()
+    assert "version" not in json.loads(frame)
+
+
+@pytest.mark.asyncio
+async def test_messages_say_which_camera_they_are_for(
+    websockets: dict[uuid.UUID, AsyncMock],
+) -> None:
+    client_id, other_id = list(websockets)[:2]
+    for c_id, loc_cam in ((client_id, "summit/auxtel"), (other_id, "summit/comcam")):
+        subscriptions.attach(c_id, f"{Service.CAMERA.value} {loc_cam}")
+    try:
+        await websocket_notifiers.notify_ws_clients(
+            Service.CAMERA, MessageType.CAMERA_TABLE, "summit/auxtel", {}, 2
+        )
+    finally:
+        subscriptions.detach_client(client_id)
+        subscriptions.detach_client(other_id)
+    websockets[other_id].send_text.assert_not_called()
+    message = json.loads(websockets[client_id].send_text.call_args.args[0])
+    assert message["locCam"] == "summit/auxtel"
+    assert message["version"] == 2
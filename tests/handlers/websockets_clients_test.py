@@ -0,0 +1,164 @@
+import asyncio
+import uuid
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from lsst.ts.rubintv.handlers.websocket import attach_service
+from lsst.ts.rubintv.handlers.websocket_notifiers import (
+    remove_client_from_services,
+    send_notification,
+)
+from lsst.ts.rubintv.handlers.websockets_clients import (
+    ClientSendQueue,
+    SubscriptionRegistry,
+    client_queues,
+    clients,
+    subscriptions,
+    websocket_to_client,
+)
+from lsst.ts.rubintv.models.models import ServiceMessageTypes as MessageType
+from lsst.ts.rubintv.models.models import ServiceTypes as Service
+from lsst.ts.rubintv.models.models_init import ModelsInitiator
+
+m = ModelsInitiator()
+websocket_path = "lsst.ts.rubintv.handlers.websocket"
+
+
+class SlowWebSocket:
+    """Records what it's sent, blocking each send until released."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.release = asyncio.Event()
+        self.close = AsyncMock()
+
+    async def send_text(self, frame: str) -> None:
+        await self.release.wait()
+        self.sent.append(frame)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_coalesces_by_topic() -> None:
+    websocket = SlowWebSocket()
+    queue = ClientSendQueue(websocket, max_size=3, policy="coalesce")  # type: ignore
+    queue.put("table", "t1")
+    await asyncio.sleep(0)  # "t1" is now being sent
+    for topic, frame in (("table", "t2"), ("metadata", "m1"), ("table", "t3")):
+        queue.put(topic, frame)
+    # full, so the queued "table" messages give way to the latest
+    queue.put("table", "t4")
+    assert len(queue) == 2
+    # full with no message on the topic, so the oldest is dropped
+    queue.put("other", "o1")
+    queue.put("other2", "o2")
+    assert queue.dropped == 3
+
+    websocket.release.set()
+    while len(queue):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert websocket.sent == ["t1", "t4", "o1", "o2"]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_disconnects() -> None:
+    websocket = SlowWebSocket()
+    queue = ClientSendQueue(websocket, max_size=2, policy="disconnect")  # type: ignore
+    for i in range(4):
+        queue.put("table", f"t{i}")
+    await asyncio.sleep(0)
+    websocket.close.assert_awaited_once()
+    # nothing more is queued once the client is being disconnected
+    queue.put("table", "t5")
+    assert len(queue) == 0
+    await queue.close()
+
+
+def test_subscription_registry_attach_detach() -> None:
+    registry = SubscriptionRegistry()
+    a, b = uuid.uuid4(), uuid.uuid4()
+    cam, chan = "camera summit/auxtel", "channel summit/auxtel/monitor"
+
+    assert registry.attach(a, cam)
+    # re-subscribing doesn't register the client twice
+    assert not registry.attach(a, cam)
+    registry.attach(a, chan)
+    registry.attach(b, cam)
+    assert registry.clients_for(cam) == {a, b}
+    assert registry.topics_for(a) == {cam, chan}
+    assert registry.stats() == {"topics": 2, "clients": 2, "subscriptions": 3}
+
+    registry.detach(b, cam)
+    assert registry.clients_for(cam) == {a}
+    assert not registry.is_attached(b, cam)
+    assert registry.topics_for(b) == set()
+
+    assert registry.detach_client(a) == {cam, chan}
+    assert registry.clients_for(cam) == set()
+    assert registry.stats() == {"topics": 0, "clients": 0, "subscriptions": 0}
+    # removing an unknown client is a no-op
+    assert registry.detach_client(a) == set()
+
+
+@pytest.mark.asyncio
+async def test_historical_status_for_camera_and_day() -> None:
+    location = m.locations[0]
+    camera = [c for c in location.cameras if c.online][0]
+    historical = SimpleNamespace(
+        is_busy=AsyncMock(return_value=True), get_readiness=lambda: {}
+    )
+    state = SimpleNamespace(
+        historical=historical, models=SimpleNamespace(locations=m.locations)
+    )
+    websocket = SimpleNamespace(app=SimpleNamespace(state=state))
+    client_id = uuid.uuid4()
+    page_id = f"{location.name}/{camera.name}/2025-01-02"
+    with patch(
+        f"{websocket_path}.send_notification", new_callable=AsyncMock
+    ) as mock_send:
+        await attach_service(client_id, f"historicalStatus {page_id}", websocket)
+    historical.is_busy.assert_awaited_once_with(location, camera, date(2025, 1, 2))
+    assert mock_send.call_args_list[0].args[1:] == (
+        Service.HISTORICALSTATUS,
+        MessageType.HISTORICAL_STATUS,
+        True,
+    )
+    # it's told of changes in status like any other client
+    assert subscriptions.is_attached(client_id, "historicalStatus")
+    subscriptions.detach(client_id, "historicalStatus")
+
+
+@pytest.mark.asyncio
+async def test_notifications_queued_and_queue_closed_with_client() -> None:
+    websocket = SlowWebSocket()
+    client_id = uuid.uuid4()
+    queue = ClientSendQueue(websocket)  # type: ignore
+    clients[client_id] = websocket  # type: ignore
+    websocket_to_client[websocket] = client_id  # type: ignore
+    client_queues[client_id] = queue
+    try:
+        # an idle queue is empty, and still used rather than sent past
+        assert len(queue) == 0
+        await asyncio.wait_for(
+            send_notification(
+                websocket,  # type: ignore
+                Service.CAMERA,
+                MessageType.CAMERA_TABLE,
+                {},
+            ),
+            timeout=1,
+        )
+        assert websocket.sent == []
+        websocket.release.set()
+        while len(queue):
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert len(websocket.sent) == 1
+    finally:
+        await remove_client_from_services(client_id)
+    # the idle queue's writer task is stopped with the client
+    assert client_id not in client_queues
+    assert queue._task.done()
@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from lsst.ts.rubintv.config import config
+from lsst.ts.rubintv.models import models_helpers
+from lsst.ts.rubintv.models.key_parser import (
+    KeyParseFailures,
+    parse_event_objects,
+    parse_event_objects_pooled,
+)
+from lsst.ts.rubintv.models.models import Event
+
+GOOD_KEYS = [
+    "lsstcam/2025-01-01/calexp_mosaic/000012/lsstcam_calexp_mosaic_12.png",
+    "auxtel/2024-12-31/movie/final/auxtel-movie.mp4",
+    # not zero padded, so only the full pattern accepts it
+    "allsky/2024-1-5/stills/000001/still.jpg",
+    "ströme/2024-01-05/stills/000001/still.jpg",
+]
+BAD_KEYS = [
+    "lsstcam/2025-02-30/calexp_mosaic/000012/bad_date.png",
+    "lsstcam/2025-01-01/calexp_mosaic/12/short_seq.png",
+    "lsstcam/2025-01-01/calexp_mosaic/000012/two.dots.png",
+    "lsstcam/2025-01-01/calexp_mosaic/000012/no_extension",
+    "lsstcam/2025-01-01/000012/too_few_parts.png",
+]
+
+
+def test_parse_matches_event_construction() -> None:
+    objects = [{"key": key, "hash": f"{n:032x}"} for n, key in enumerate(GOOD_KEYS)]
+    events = parse_event_objects(objects)
+    assert events == [Event(**o) for o in objects]
+    for event, obj in zip(events, objects):
+        assert event.key == obj["key"]
+
+
+def test_parse_failures_are_aggregated() -> None:
+    objects = [{"key": key} for key in BAD_KEYS + GOOD_KEYS]
+    for key in BAD_KEYS:
+        with pytest.raises(ValueError):
+            Event(key)
+
+    failures = KeyParseFailures()
+    events = parse_event_objects(objects, failures)
+    assert [e.key for e in events] == GOOD_KEYS
+    assert failures.count == len(BAD_KEYS)
+    assert failures.examples == BAD_KEYS
+
+
+@pytest.mark.asyncio
+async def test_pooled_parse_keeps_order() -> None:
+    objects = [{"key": key} for key in (GOOD_KEYS + BAD_KEYS) * 3]
+    failures = KeyParseFailures()
+    with ProcessPoolExecutor(2) as pool:
+        events = await parse_event_objects_pooled(
+            objects, pool, chunk_size=4, failures=failures
+        )
+    assert [e.key for e in events] == GOOD_KEYS * 3
+    assert failures.count == len(BAD_KEYS) * 3
+
+
+def test_parse_pool_shut_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "key_parse_processes", 1)
+    pool = models_helpers._get_parse_pool()
+    assert pool is not None
+    assert models_helpers._get_parse_pool() is pool
+
+    models_helpers.shutdown_parse_pool()
+    assert models_helpers._parse_pool is None
+    # it's started afresh when next needed
+    new_pool = models_helpers._get_parse_pool()
+    assert new_pool is not None and new_pool is not pool
+    models_helpers.shutdown_parse_pool()
@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+from lsst.ts.rubintv.models.models import Channel, Event
+from lsst.ts.rubintv.models.models_helpers import (
+    add_events_to_table,
+    make_table_from_event_list,
+)
+from pydantic import TypeAdapter
+
+KEY = "lsstcam/2025-01-01/calexp_mosaic/000012/lsstcam_calexp_mosaic_12.png"
+
+
+def test_event_serializes_as_dict_of_key_parts() -> None:
+    event = Event(KEY, "96795bc45767b5a35a82b4ca08a7b312")
+    expected = {
+        "key": KEY,
+        "hash": "96795bc45767b5a35a82b4ca08a7b312",
+        "camera_name": "lsstcam",
+        "day_obs": "2025-01-01",
+        "channel_name": "calexp_mosaic",
+        "seq_num": 12,
+        "filename": "lsstcam_calexp_mosaic_12.png",
+        "ext": "png",
+    }
+    assert event.to_dict() == expected
+    assert TypeAdapter(Event).dump_python(event, mode="json") == expected
+
+    final = Event("lsstcam/2025-01-01/movie/final/lsstcam_movie.mp4")
+    assert final.seq_num == "final"
+    assert final.key == "lsstcam/2025-01-01/movie/final/lsstcam_movie.mp4"
+    assert final.seq_num_force_int() == 99999
+
+
+def test_event_shares_strings_after_unpickling() -> None:
+    events = pickle.loads(pickle.dumps([Event(KEY), Event(KEY.replace("12", "13"))]))
+    other = pickle.loads(pickle.dumps(Event(KEY)))
+    assert events[0] == other
+    assert events[0].camera_name is other.camera_name
+    assert events[1].channel_name is other.channel_name
+    assert events[0] < events[1]
+
+
+def test_event_rejects_bad_keys() -> None:
+    with pytest.raises(ValueError):
+        Event("lsstcam/2025-13-01/calexp_mosaic/000012/lsstcam_12.png")
+    with pytest.raises(ValueError):
+        Event("not/a/key")
+
+
+@pytest.mark.asyncio
+async def test_table_built_whole_or_added_to() -> None:
+    channels = [Channel(name=name, title=name) for name in ("mount", "monitor")]
+    events = [
+        Event(f"lsstcam/2025-01-01/{chan}/{seq:06}/lsstcam_{chan}_{seq}.png")
+        for chan in ("monitor", "mount", "other")
+        for seq in (3, 1, 2)
+    ] + [Event("lsstcam/2025-01-01/mount/final/lsstcam_mount.png")]
+    table = await make_table_from_event_list(events, channels)
+    assert list(table) == [3, 2, 1]
+    assert list(table[1]) == ["mount", "monitor"]
+    assert table[2]["monitor"] == events[2].to_dict()
+
+    # adding to a partial table gives the same rows, in the same order
+    first = [e for e in events if e.seq_num != 3]
+    rest = [e for e in events if e.seq_num == 3]
+    partial = await make_table_from_event_list(first, channels)
+    added, rows = add_events_to_table(partial, rest, channels)
+    assert added == table
+    assert list(added) == list(table)
+    assert list(rows) == [3]
+
+    # rows below the first are put in order too
+    first = [e for e in events if e.seq_num != 2]
+    rest = [e for e in events if e.seq_num == 2]
+    partial = await make_table_from_event_list(first, channels)
+    added, _ = add_events_to_table(partial, rest, channels)
+    assert list(added) == list(table)
@@ -0,0 +1,56 @@
+from typing import Any
+
+import pytest
+from lsst.ts.rubintv.s3_connection_pool import S3ConnectionPool
+
+
+@pytest.mark.asyncio
+async def test_pool_clients_share_executor_for_lifetime(mock_s3_client: Any) -> None:
+    mock_s3_client.create_bucket(Bucket="test-bucket")
+    mock_s3_client.put_object(Bucket="test-bucket", Key="cam/a.json", Body=b"{}")
+
+    pool = S3ConnectionPool(max_workers=2)
+    client = pool.get_client("rubin-rubintv-data-bts", "test-bucket")
+    assert pool.get_client("rubin-rubintv-data-bts", "test-bucket") is client
+
+    executor = client._executor
+    for _ in range(5):
+        objects = await client.async_list_objects("cam/")
+        assert [o["key"] for o in objects] == ["cam/a.json"]
+    # the same executor serves every call
+    assert client._executor is executor
+
+    stats = pool.get_pool_stats()
+    assert stats["cached_clients"] == 1
+    assert stats["executor_workers"] == 2
+    assert stats["executor_queued"] == 0
+    assert stats["executor_in_flight"] == 0
+
+    # shutting down stops the executor but keeps the client, which starts a
+    # new executor when it's next used
+    await pool.shutdown()
+    assert executor._shutdown
+    assert pool.get_pool_stats()["cached_clients"] == 1
+    assert pool.get_client("rubin-rubintv-data-bts", "test-bucket") is client
+    objects = await client.async_list_objects("cam/")
+    assert [o["key"] for o in objects] == ["cam/a.json"]
+    assert client._executor is not executor
+    assert client.executor_stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_named_pools_have_their_own_executors(mock_s3_client: Any) -> None:
+    mock_s3_client.create_bucket(Bucket="test-bucket")
+    pool = S3ConnectionPool(max_workers=2)
+    polling = pool.get_client("rubin-rubintv-data-bts", "test-bucket")
+    requests = pool.get_client(
+        "rubin-rubintv-data-bts", "test-bucket", pool_name="requests"
+    )
+    assert requests is not polling
+    assert requests._executor is not polling._executor
+    assert (
+        pool.get_client("rubin-rubintv-data-bts", "test-bucket", pool_name="requests")
+        is requests
+    )
+    assert pool.get_pool_stats()["executor_workers"] == 4
+    await pool.shutdown()